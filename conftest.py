@@ -0,0 +1,2 @@
+# conftest.py
+# pytest 从仓库根目录收集：让 tests/ 里可以直接 import module.*
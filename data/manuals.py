@@ -5,10 +5,19 @@
 COMMAND_LIST = [
     ("help", "Display information about builtin commands"),
     ("train", "Start an interactive training session (Focus Mode)"),
+    ("replay", "Replay a recorded training session"),
+    ("jobs", "List running and queued training jobs"),
+    ("fg", "Bring a background training job to the foreground"),
+    ("kill", "Terminate a training job"),
     ("mail", "Check inbox for client missions"),
     ("accept", "Accept a mission from the inbox"),
     ("shop", "View available hardware upgrades"),
     ("buy", "Purchase hardware from the repository"),
+    ("calibrate", "Benchmark this machine and unlock it as a hardware tier"),
+    ("dataset", "Build and mount local tokenized datasets"),
+    ("sweep", "Simulate many sessions to find a good learning rate"),
+    ("stats", "Show focus hours and success rates from your history"),
+    ("scrollback", "Page through output that scrolled off the terminal"),
     ("ls", "List directory contents"),
     ("cd", "Change the shell working directory"),
     ("clear", "Clear the terminal screen"),
@@ -46,6 +55,15 @@ EXAMPLES
 
     Set focus time to 45 minutes:
       sysctl -w kernel.focus_duration=45
+
+    Estimate training times from the calibrated host (see 'calibrate'):
+      sysctl -w kernel.use_local_tier=1
+
+    Train a real NumPy self-attention model on the CPU (sim = simulated curve):
+      sysctl -w kernel.train_backend=numpy
+
+    Keep 20000 lines on screen before spilling to disk (default 5000):
+      sysctl -w kernel.scrollback=20000
 """,
     "train": """
 NAME
@@ -54,6 +72,16 @@ NAME
 SYNOPSIS
     train [options]
 
+OPTIONS
+    --bg            Run the job in the background and keep the shell usable.
+    --priority N    Scheduling weight (default 1, assignments 2). Running jobs
+                    share the GPU's TFLOPS in proportion to their priority.
+    --resume [ID]   Continue an interrupted session from its checkpoint
+                    (the most recent one by default).
+
+    Press Ctrl-Z during a foreground session to move it to the background,
+    or Ctrl-C to stop it early and settle on the progress made so far.
+
 DESCRIPTION
     Launches the TUI (Text User Interface) for selecting Deep Learning models.
     
@@ -62,8 +90,164 @@ DESCRIPTION
       - Credits (Coins)
       - Experience (Exp) for Level Up
     
+    The progress bar ends with a sparkline of the loss so far, and a braille
+    chart of the whole loss curve is drawn when the session ends (also in
+    'replay'). Both are downsampled (LTTB), so long runs draw as fast as
+    short ones.
+
+    Loss, it/s, focus violations and the final validation accuracy are
+    exported as TensorBoard scalars to save/runs/<session>:
+      tensorboard --logdir save/runs
+
     WARNING:
     High epoch counts on low-level accounts may lead to Overfitting risks.
+""",
+    "replay": """
+NAME
+    replay - Re-render a recorded training session
+
+SYNOPSIS
+    replay
+    replay <session|last> [--speed N]
+
+DESCRIPTION
+    Every training session is recorded to save/traces with its random seed.
+    Without arguments, lists the most recent sessions.
+    
+    --speed N   Playback speed relative to the original session (default 60).
+                Use 0 to print the result instantly.
+""",
+    "calibrate": """
+NAME
+    calibrate - Measure the host's real compute throughput
+
+SYNOPSIS
+    calibrate [--quick]
+
+DESCRIPTION
+    Runs a multi-threaded NumPy matrix-multiply benchmark over several
+    matrix sizes and dtypes (float32/float64) and records the measured
+    GFLOPS with a 95% confidence interval in your save.
+
+    The result appears in 'shop' as the Local Host tier (ID L). Select it
+    with 'buy local' or 'sysctl -w kernel.use_local_tier=1', and the
+    train menu will estimate epoch times from the measured speed.
+
+    --quick     Fewer sizes and repeats (float32 only).
+""",
+    "dataset": """
+NAME
+    dataset - Manage local tokenized datasets
+
+SYNOPSIS
+    dataset [list]
+    dataset build <name> <dir>
+    dataset mount <name>
+    dataset umount
+    dataset rm <name>
+
+DESCRIPTION
+    'build' tokenizes every text file (byte-level) and image (64x64
+    grayscale pixels) under <dir> into flat memory-mapped shards in
+    save/datasets/<name>, with an index.json. Files are streamed, so the
+    source can be much larger than RAM.
+
+    While a dataset is mounted, every training step consumes a batch that
+    a background thread prefetches from the shards. The progress bar then
+    shows data throughput in B/s and tok/s. With
+    'sysctl -w kernel.train_backend=numpy' the model actually trains on it.
+
+    The names declared in the model library (CommonCrawl, ImageNet-21k, ...)
+    are listed until you build them from your own files.
+""",
+    "sweep": """
+NAME
+    sweep - Learning-rate sweep over simulated sessions
+
+SYNOPSIS
+    sweep <model_id> [--lr LO:HI] [--n N] [--points P] [--epochs E]
+
+DESCRIPTION
+    Runs N headless sessions of the chosen model (IDs as in 'train') at each
+    of P log-spaced learning rates between LO and HI (default 1e-4:1e-2,
+    200 sessions, 8 points). Sessions run in a process pool on all cores.
+    Each LR's row is printed as soon as its sessions finish:
+
+      mean/p10/p50/p90   accuracy distribution
+      crash              share of diverged runs
+      pass               share of runs reaching 60% accuracy
+
+    The recommended LR has the best pass rate, with ties broken by median
+    accuracy. Press Ctrl-C to stop early. No rewards are granted.
+""",
+    "stats": """
+NAME
+    stats - Training history statistics
+
+SYNOPSIS
+    stats
+    stats models
+    stats days [N]
+
+DESCRIPTION
+    Every finished session is appended to save/history (one binary file
+    per column: time, model, epochs, LR, duration, accuracy, outcome,
+    violations). Daily and per-model totals are updated as sessions end,
+    so these queries stay instant however long the history grows.
+
+    stats           Focus hours and success rate today, this week,
+                    the last 30 days and all time.
+    stats models    Runs, pass rate, average/best accuracy per model.
+    stats days [N]  Focus hours per day for the last N days (default 14).
+""",
+    "scrollback": """
+NAME
+    scrollback - Read terminal output that no longer fits on screen
+
+SYNOPSIS
+    scrollback
+    scrollback <page>
+
+DESCRIPTION
+    The terminal keeps the last kernel.scrollback lines (default 5000).
+    Older lines are compressed and appended to save/transcripts, one
+    file per session, so long training logs do not slow the window down.
+
+    scrollback         Lines on screen, lines spilled and the file path.
+    scrollback <page>  Print 50 spilled lines; page 1 is the most recent.
+""",
+    "jobs": """
+NAME
+    jobs - Display status of training jobs
+
+DESCRIPTION
+    Lists running and queued jobs with their progress and GPU share.
+    The job marked '+' is attached to the terminal (foreground).
+    At most two jobs run at once; the rest wait in the queue ordered by
+    priority.
+""",
+    "fg": """
+NAME
+    fg - Move a job to the foreground
+
+SYNOPSIS
+    fg [%job]
+
+DESCRIPTION
+    Attaches the job's progress output to the terminal (Focus Mode).
+    Without an argument, the most recently started job is used.
+""",
+    "kill": """
+NAME
+    kill - Terminate a training job
+
+SYNOPSIS
+    kill %job
+
+DESCRIPTION
+    Stops a running or queued job. A running job is validated on the
+    progress it made so far; terminated jobs grant no rewards and an
+    accepted assignment stays active.
 """,
     "shop": """
 NAME
@@ -1,27 +1,37 @@
 import os
 import shlex
+import sys
 import time
 import random
-
-# 引入 TUI 核心
-from module.TUI import TerminalCore
+import threading
 
 # 引入业务逻辑
-from module.config import HARDWARE
-from module.storage import load_game_data, save_game_data
+from module.calibrate import run_calibration, local_tier, current_hardware
+import module.dataset_store as dataset_store
+from module.sweep import parse_lr_range, run_sweep, recommend
+from module.history_store import HistoryStore
+from module.storage import load_game_data, request_save, flush_saves, load_checkpoint
+from module.session_trace import is_session_id
 from module.file_manager import init_workspace
+from module.transcript import Transcript
+from module.config import SCROLLBACK_LINES, TRANSCRIPT_DIR
 import data.assets as assets
 from module.mail_system import MailSystem 
 import module.train as train_system
 from data.manuals import COMMAND_LIST, get_man_page
-from module.game_mechanics import RewardManager
+from module.game_mechanics import RewardManager, FREE_TRAIN_REWARDS, FAILURE_REWARDS
 # [新增] 引入分离出去的模块
 from module.shop import ShopHandler
 from module.shell_emulator import ShellHandler
 
-class CyberTerminal(TerminalCore):
+class CyberGame:
+    """
+    游戏本体 (命令、任务、训练)，不依赖具体前端：
+    和 TUI.TerminalCore 组合成窗口版，和 tty_frontend.TtyCore 组合成终端版 (见 create_app)
+    """
     def __init__(self):
-        super().__init__(title="Self-Attention-trainer_Terminal", width=960, height=480)
+        super().__init__(title="Self-Attention-trainer_Terminal", width=960, height=480,
+                         scrollback=SCROLLBACK_LINES, transcript=Transcript(TRANSCRIPT_DIR))
         self.attributes('-topmost', False)
         
         # 1. 基础数据加载
@@ -42,8 +52,21 @@ class CyberTerminal(TerminalCore):
         self.interaction_mode = None
         self.temp_train_options = {}
         self.temp_selected_model = None
+        self.train_flags = {}
+        self.sweep_cancel = None
+        self.history = HistoryStore()
+
+        # 存档有改动 -> 合并后台写盘；状态栏相关字段有改动 -> 刷新窗口标题
+        self.data.subscribe(lambda keys: request_save(self.data))
+        self.data.subscribe(lambda keys: self.post_latest("title", self._update_title),
+                            keys=('coins', 'level', 'gpu_level', 'use_local_tier', 'calibration'))
+        self._update_title()
+        self.scrollback = self.data.get('scrollback_lines', SCROLLBACK_LINES)
+        self.data.subscribe(lambda keys: setattr(self, 'scrollback', self.data.get('scrollback_lines', SCROLLBACK_LINES)),
+                            keys=('scrollback_lines',))
 
         # 3. 启动任务
+        self.protocol("WM_DELETE_WINDOW", self.shutdown)
         self.after(200, self.boot_sequence)
 
     def _auto_check_mail(self):
@@ -51,21 +74,13 @@ class CyberTerminal(TerminalCore):
         count = self.mail_sys.check_for_new_mail()
         if count > 0:
             self.write(f"\n[Notification] You have {count} new mail(s). Type 'mail' to view.\n", "success")
-            save_game_data(self.data)
 
     # ================= 窗口模式控制 =================
     
     def set_mini_mode(self, enable=True):
-        if enable:
-            screen_width = self.winfo_screenwidth()
-            screen_height = self.winfo_screenheight()
-            self.geometry(f"400x100+{screen_width-450}+{screen_height-200}")
-            self.attributes('-topmost', True)
-            self.console.configure(font=("Consolas", 10))
-        else:
-            self.geometry("960x480")
-            self.attributes('-topmost', False)
-            self.console.configure(font=("Consolas", 14))
+        """专注模式：进度显示在置顶小窗里 (由进度条刷新驱动)，主窗口大小和字体不变"""
+        if enable: self.overlay.show()
+        else: self.overlay.hide()
 
     # ================= 输入处理 =================
 
@@ -90,7 +105,7 @@ class CyberTerminal(TerminalCore):
 
         # --- 基础系统命令 (Exit, Clear, Help) ---
         if cmd == "exit":
-            self.quit()
+            self.shutdown()
         elif cmd in ["clear", "cls"]:
             self.clear_screen()
             self.print_motd()
@@ -125,9 +140,45 @@ class CyberTerminal(TerminalCore):
 
         # --- 训练命令 (Train) ---
         elif cmd == "train":
-            self._initiate_training_sequence()
+            self._handle_train(args)
             # 注意：这里不调用 new_prompt，因为进入了交互模式
 
+        # --- 任务控制 (Jobs, Fg, Kill) ---
+        elif cmd == "jobs":
+            self._handle_jobs()
+            self.new_prompt()
+        elif cmd == "fg":
+            self._handle_fg(args)
+        elif cmd == "kill":
+            self._handle_kill(args)
+            self.new_prompt()
+
+        # --- 本机算力标定 (Calibrate) ---
+        elif cmd == "calibrate":
+            self._handle_calibrate(args)
+
+        # --- 数据集 (Dataset) ---
+        elif cmd == "dataset":
+            self._handle_dataset(args)
+
+        # --- 超参扫描 (Sweep) ---
+        elif cmd == "sweep":
+            self._handle_sweep(args)
+
+        # --- 训练统计 (Stats) ---
+        elif cmd == "stats":
+            self._handle_stats(args)
+            self.new_prompt()
+
+        # --- 终端回滚记录 (Scrollback) ---
+        elif cmd == "scrollback":
+            self._handle_scrollback(args)
+            self.new_prompt()
+
+        # --- 复盘命令 (Replay) ---
+        elif cmd == "replay":
+            self._handle_replay(args)
+
         # --- 外部命令 ---
         else:
             self.shell_handler.run_external_cmd(cmd_str)
@@ -153,7 +204,6 @@ class CyberTerminal(TerminalCore):
                 count = self.mail_sys.check_for_new_mail()
                 if count > 0:
                     self.write(f"Synced {count} new message(s).\n", "success")
-                    save_game_data(self.data)
                 else: self.write("No new messages on server.\n", "dim")
             else:
                 inbox = self.mail_sys.get_inbox()
@@ -173,7 +223,6 @@ class CyberTerminal(TerminalCore):
             mail = self.mail_sys.get_mail(args[0])
             if mail:
                 self.mail_sys.mark_as_read(args[0])
-                save_game_data(self.data) 
                 self.write(f"\nFrom:    {mail['sender']}\nDate:    {mail['date']}\nSubject: {mail['subject']}\n")
                 self.write("-" * 60 + "\n" + mail['body'] + "\n" + "-" * 60 + "\n")
                 if 'attachment' in mail:
@@ -196,7 +245,6 @@ class CyberTerminal(TerminalCore):
             if att.get('instant_action', False):
                 self.reward_manager.apply_rewards(att.get('rewards', []))
                 self.mail_sys.delete_mail(args[0])
-                save_game_data(self.data)
                 return
 
             # 2. 如果不是立即执行，则是任务，放入 active_mission
@@ -205,13 +253,336 @@ class CyberTerminal(TerminalCore):
             
             self.active_mission = att
             self.active_mission['source_mail_id'] = args[0]
-            # ... 保存逻辑 ...
+            self.active_mission['source_type'] = mail.get('type')
+            # 任务需要落盘，断点续训时才能找回奖励定义
+            self.data['active_mission'] = self.active_mission
             self.write(f"Mission '{self.active_mission['name']}' downloaded.\n", "success")
         else: self.write("Cannot accept: Mail not found or no attachment.\n", "error")
 
+    def _handle_calibrate(self, args):
+        # calibrate [--quick]：基准在后台线程跑，结束后再给出提示符
+        quick = "--quick" in args
+        self.write("[CALIBRATE] Running GEMM microbenchmark, this may take a while...\n", "system")
+
+        def _task():
+            try:
+                report = lambda msg: self.post_write(msg + "\n")
+                if quick: cal = run_calibration(sizes=(256, 512), dtypes=("float32",), repeats=3, progress=report)
+                else: cal = run_calibration(progress=report)
+            except Exception as e:
+                self.post_write(f"calibrate: {e}\n", "error")
+                self.post_call(self.new_prompt)
+                return
+            self.post_call(self._on_calibration_complete, cal)
+
+        threading.Thread(target=_task, daemon=True).start()
+
+    def _on_calibration_complete(self, cal):
+        self.data['calibration'] = cal
+        tier = local_tier(self.data)
+        self.write(f"[CALIBRATE] {cal['host']}: {cal['gflops']:.1f} ±{cal['gflops_ci']:.1f} GFLOPS (95% CI, {cal['threads']} threads)\n", "success")
+        self.write(f"            Local tier: {tier['tflops']} TFLOPS, Lv.{tier['level']}. "
+                   f"Use 'buy local' or 'sysctl -w kernel.use_local_tier=1' to train on it.\n")
+        self.new_prompt()
+
+    def _handle_dataset(self, args):
+        # dataset [list] | build <name> <dir> | mount <name> | umount | rm <name>
+        sub = args[0] if args else "list"
+        mounted = self.data.get('dataset')
+        if sub in ("build", "mount", "rm") and len(args) >= 2:
+            try: dataset_store.check_name(args[1])
+            except ValueError as e:
+                self.write(f"dataset: {e}\n", "error")
+                return self.new_prompt()
+
+        if sub == "list":
+            self.write(f"\n{'NAME':<16} {'DOCS':>7} {'TOKENS':>14} {'SHARDS':>6}  SOURCE\n")
+            for name, index in dataset_store.list_datasets():
+                mark = "*" if name == mounted else " "
+                if index:
+                    self.write(f"{mark}{name:<15} {index['documents']:>7} {index['total_tokens']:>14,} "
+                               f"{len(index['shards']):>6}  {index['source']}\n", "system" if mark == "*" else None)
+                else:
+                    self.write(f"{mark}{name:<15} {'-':>7} {'(not built)':>14} {'-':>6}\n", "dim")
+            self.write("\n")
+        elif sub == "build" and len(args) >= 3:
+            name, source = args[1], args[2]
+            self.write(f"[DATA] Tokenizing {source} -> {name} ...\n", "system")
+
+            def _task():
+                last = [0.0]
+                def report(docs, tokens):
+                    if time.time() - last[0] < 0.5: return
+                    last[0] = time.time()
+                    self.post_write(f"  {docs} files, {tokens:,} tokens\n", "dim")
+                try:
+                    index = dataset_store.build_dataset(name, source, progress=report)
+                    msg, tag = (f"[DATA] {name}: {index['documents']} files, {index['total_tokens']:,} tokens "
+                                f"in {len(index['shards'])} shard(s). Use 'dataset mount {name}'.\n"), "success"
+                except Exception as e:
+                    msg, tag = f"dataset: {e}\n", "error"
+                self.post_write(msg, tag)
+                self.post_call(self.new_prompt)
+
+            threading.Thread(target=_task, daemon=True).start()
+            return
+        elif sub == "mount" and len(args) >= 2:
+            if dataset_store.load_index(args[1]) is None:
+                self.write(f"dataset: '{args[1]}' is not built. Use 'dataset build {args[1]} <dir>'.\n", "error")
+            else:
+                self.data['dataset'] = args[1]
+                self.write(f"Mounted {args[1]}. Training steps now stream batches from it.\n", "success")
+        elif sub == "umount":
+            self.data['dataset'] = None
+            self.write("Dataset unmounted.\n")
+        elif sub == "rm" and len(args) >= 2:
+            if args[1] == mounted:
+                self.data['dataset'] = None
+            if dataset_store.remove_dataset(args[1]): self.write(f"Removed {args[1]}.\n")
+            else: self.write(f"dataset: '{args[1]}' is not built.\n", "error")
+        else:
+            self.write("Usage: dataset [list] | build <name> <dir> | mount <name> | umount | rm <name>\n", "error")
+        self.new_prompt()
+
+    def _handle_sweep(self, args):
+        # sweep <id> [--lr a:b] [--n N] [--points P] [--epochs E]
+        usage = "Usage: sweep <model_id> [--lr 1e-4:1e-2] [--n 200] [--points 8] [--epochs E]\n"
+        _, options = train_system.get_menu_data(self.data)
+        if not args or args[0] not in options:
+            self.write(usage, "error")
+            return self.new_prompt()
+
+        def opt(flag, default, cast):
+            if flag not in args: return default
+            return cast(args[args.index(flag) + 1])
+        try:
+            lo, hi = opt("--lr", (1e-4, 1e-2), parse_lr_range)
+            n = max(1, opt("--n", 200, int))
+            points = max(1, opt("--points", 8, int))
+            epochs = opt("--epochs", None, int)
+        except (IndexError, ValueError):
+            self.write(usage, "error")
+            return self.new_prompt()
+
+        selected = options[args[0]]
+        self.write(f"\n[SWEEP] {selected['model']['name']} | LR {lo:g}..{hi:g} x{points} | {n} sessions each (Ctrl-C to stop)\n", "system")
+        self.write(f"  {'LR':<10} {'mean':>6} {'p10':>6} {'p50':>6} {'p90':>6} {'crash':>6} {'pass':>6}\n")
+        self.lock_input(True)
+        self.sweep_cancel = threading.Event()
+
+        def show(stat):
+            crash_tag = "error" if stat['crash_rate'] > 0.2 else None
+            self.write(f"  {stat['lr']:<10.2e} {stat['mean']:>6.1f} {stat['p10']:>6.1f} {stat['p50']:>6.1f} {stat['p90']:>6.1f} "
+                       f"{stat['crash_rate'] * 100:>5.1f}% {stat['success_rate'] * 100:>5.1f}%\n", crash_tag)
+
+        def done(stats, error=None):
+            self.sweep_cancel = None
+            if error: self.write(f"sweep: {error}\n", "error")
+            best = recommend(stats)
+            if best:
+                self.write(f"[SWEEP] Recommended LR: {best['lr']:.2e} "
+                           f"(pass {best['success_rate'] * 100:.0f}%, median acc {best['p50']:.1f}%)\n", "success")
+            self.lock_input(False)
+            self.new_prompt()
+
+        def _task():
+            try:
+                stats = run_sweep(self.data, selected, lo, hi, n, points=points, epochs=epochs,
+                                  on_result=lambda st: self.post_call(show, st),
+                                  cancel_event=self.sweep_cancel)
+                self.post_call(done, stats)
+            except Exception as e:
+                self.post_call(done, [], e)
+
+        threading.Thread(target=_task, daemon=True).start()
+
+    def _handle_stats(self, args):
+        # stats | stats models | stats days [N]
+        h = self.history
+        if not len(h):
+            return self.write("No training history yet.\n", "dim")
+        sub = args[0] if args else "summary"
+
+        if sub == "models":
+            self.write(f"\n{'MODEL':<28} {'RUNS':>5} {'PASS':>7} {'AVG ACC':>8} {'BEST':>6} {'HOURS':>7}\n")
+            for name, st in sorted(h.per_model().items(), key=lambda kv: -kv[1]['sessions']):
+                rate = st['successes'] / st['sessions'] * 100
+                self.write(f"{name[:28]:<28} {st['sessions']:>5} {rate:>6.1f}% {st['accuracy_sum'] / st['sessions']:>7.1f}% "
+                           f"{st['best']:>5.1f}% {st['minutes'] / 60:>7.1f}\n")
+        elif sub == "days":
+            try: n = int(args[1]) if len(args) > 1 else 14
+            except ValueError: return self.write("Usage: stats days [N]\n", "error")
+            series = h.daily_series(max(1, min(n, 366)))
+            peak = max(series) or 1
+            today = time.time()
+            for i, minutes in enumerate(series):
+                day = time.strftime("%m-%d %a", time.localtime(today - (len(series) - 1 - i) * 86400))
+                self.write(f"{day}  {'█' * int(minutes / peak * 30):<30} {minutes / 60:5.1f}h\n")
+        else:
+            self.write("\n")
+            for label, agg in (("Today", h.last_days(1)), ("This week", h.this_week()),
+                               ("Last 30 days", h.last_days(30))):
+                rate = f"{agg['successes'] / agg['sessions'] * 100:.0f}%" if agg['sessions'] else "-"
+                self.write(f"{label:<14} {agg['minutes'] / 60:6.1f} focus hours  {agg['sessions']:>4} sessions  "
+                           f"success {rate}\n")
+            total = sum(st['minutes'] for st in h.per_model().values())
+            wins = sum(st['successes'] for st in h.per_model().values())
+            self.write(f"{'All time':<14} {total / 60:6.1f} focus hours  {len(h):>4} sessions  "
+                       f"success {wins / len(h) * 100:.0f}%\n", "system")
+
+    def _handle_scrollback(self, args):
+        # scrollback | scrollback <page>
+        t = self.transcript
+        if t is None:
+            return self.write("scrollback: output is kept by your terminal's own scrollback\n", "dim")
+        if not args:
+            on_screen = self.screen_lines()
+            self.write(f"\nOn screen: {on_screen} lines (limit {self.scrollback})\n")
+            self.write(f"Spilled:   {t.lines} lines -> {t.path}\n")
+            if t.lines: self.write("Use 'scrollback <page>' to read older output (1 = most recent).\n", "dim")
+            return
+        try: page = int(args[0])
+        except ValueError: return self.write("Usage: scrollback [page]\n", "error")
+        pages = (t.lines + 49) // 50
+        if not 1 <= page <= pages:
+            return self.write(f"scrollback: page {page} out of range (1-{pages})\n" if pages
+                              else "scrollback: nothing spilled yet\n", "error")
+        start, lines = t.page(page)
+        self.write(f"\n--- SCROLLBACK page {page}/{pages} (lines {start + 1}-{start + len(lines)}) ---\n", "system")
+        self.write_many([(line + "\n", "dim") for line in lines])
+
+    def _handle_replay(self, args):
+        sessions = train_system.session_trace.list_traces()
+        if not args:
+            self.write("\n--- RECORDED SESSIONS ---\n", "system")
+            if not sessions: self.write("  (No sessions recorded)\n", "dim")
+            for sid in sessions[:10]: self.write(f"  {sid}\n")
+            self.write("\nUse 'replay <session> [--speed N]' to review a session.\n")
+            return self.new_prompt()
+
+        session_id = args[0]
+        if session_id == "last":
+            session_id = (self.data.get('last_session') or {}).get('id') or (sessions[0] if sessions else "")
+        speed = 60.0
+        if "--speed" in args:
+            try: speed = float(args[args.index("--speed") + 1])
+            except (IndexError, ValueError):
+                self.write("Usage: replay <session> [--speed N]\n", "error")
+                return self.new_prompt()
+
+        def on_replay_complete(_):
+            self.lock_input(False)
+            self.new_prompt()
+
+        self.lock_input(True)
+        try:
+            started = train_system.start_replay(session_id, speed, self._make_ui_callbacks(on_replay_complete))
+        except ValueError as e:
+            started = False
+            self.write(f"replay: {session_id}: {e}\n", "error")
+        else:
+            if not started: self.write(f"replay: {session_id}: no such session\n", "error")
+        if not started:
+            self.lock_input(False)
+            self.new_prompt()
+
+    def _handle_train(self, args):
+        # train [--bg] [--priority N] [--resume [session]]
+        self.train_flags = {"background": "--bg" in args, "priority": None}
+        if "--priority" in args:
+            try: self.train_flags["priority"] = int(args[args.index("--priority") + 1])
+            except (IndexError, ValueError):
+                self.write("Usage: train [--bg] [--priority N] [--resume [session]]\n", "error")
+                return self.new_prompt()
+
+        if "--resume" in args:
+            idx = args.index("--resume")
+            session_id = args[idx + 1] if idx + 1 < len(args) and not args[idx + 1].startswith("--") else None
+            if session_id is not None and not is_session_id(session_id):
+                self.write(f"train: {session_id}: invalid session id\n", "error")
+                self.write("Usage: train [--bg] [--priority N] [--resume [session]]\n", "error")
+                return self.new_prompt()
+            self._resume_training(session_id)
+        else:
+            self._initiate_training_sequence()
+
+    def _handle_jobs(self):
+        jobs = train_system.scheduler.active_jobs()
+        if not jobs:
+            return self.write("No running jobs.\n", "dim")
+        for job in jobs:
+            if job.state == "running" and job.progress:
+                epoch, epochs, done, total, loss = job.progress
+                detail = f"{done / total * 100:5.1f}%  ep {epoch}/{epochs}  loss={loss:.4f}  gpu={job.share * 100:.0f}%"
+            else:
+                detail = "waiting for GPU"
+            marker = "+" if job.foreground else " "
+            self.write(f"[{job.job_id}]{marker} {job.state.capitalize():<8} {job.name:<24} p{job.priority}  {detail}\n",
+                       "system" if job.foreground else None)
+
+    def _handle_fg(self, args):
+        jobs = train_system.scheduler.active_jobs()
+        job = train_system.scheduler.get(args[0]) if args else (jobs[-1] if jobs else None)
+        if not job or job not in jobs:
+            self.write(f"bash: fg: {args[0] if args else 'current'}: no such job\n", "error")
+            return self.new_prompt()
+
+        train_system.scheduler.set_foreground(job)
+        self.lock_input(True)
+        self.write(f"[{job.job_id}] {job.name}\n")
+        for text, style in job.log: self.write(text + "\n", style)
+        self.set_mini_mode(True)
+
+    def _handle_kill(self, args):
+        if not args:
+            return self.write("kill: usage: kill %job\n", "error")
+        job = train_system.scheduler.kill(args[0])
+        if not job:
+            self.write(f"bash: kill: {args[0]}: no such job\n", "error")
+
+    def shutdown(self):
+        """退出前让运行中的训练写好断点，下次可 train --resume"""
+        train_system.scheduler.shutdown()
+        flush_saves(self.data)
+        self.quit()
+
+    def on_interrupt(self):
+        """Ctrl-C：终止前台训练任务，按已完成的进度结算；扫描进行中则取消扫描"""
+        if self.sweep_cancel is not None:
+            self.write("^C\n", "dim")
+            self.sweep_cancel.set()
+            return True
+        job = train_system.scheduler.foreground_job()
+        if not job or job.state != "running": return False
+        self.write("^C\n", "dim")
+        train_system.scheduler.kill(job.job_id)
+        return True
+
+    def on_suspend(self):
+        """Ctrl-Z：把前台训练任务转入后台继续运行，交还命令行；停在 train 的选择提示时放弃这次选择"""
+        pending_choice = self.interaction_mode is not None
+        self._clear_train_selection()
+        job = train_system.scheduler.foreground_job()
+        if not job:
+            if pending_choice:
+                self.write("^Z\n", "dim")
+                self.new_prompt()
+            return
+        train_system.scheduler.set_foreground(None)
+        self.set_mini_mode(False)
+        self.write(f"\n^Z\n[{job.job_id}]+ Running in background    {job.name}\n", "dim")
+        self.lock_input(False)
+        self.new_prompt()
+
     def _initiate_training_sequence(self):
         menu_lines, options = train_system.get_menu_data(self.data)
         self.write("\n")
+
+        pending = train_system.pending_checkpoints()
+        ckpt = load_checkpoint(pending[0]) if pending else None
+        if ckpt:
+            self.write(f"[!] Interrupted session found: {ckpt['model']['name']} "
+                       f"(step {ckpt['global_step']}/{ckpt['epochs'] * 100}). Use 'train --resume' to continue.\n", "warn")
         
         # 注入活跃任务
         if self.active_mission:
@@ -219,18 +590,7 @@ class CyberTerminal(TerminalCore):
             self.write(">>> ACTIVE ASSIGNMENT <<<\n", "warn")
             self.write(f" [0] {m['name']} (Req: {m['requirements']})\n")
             self.write("-" * 40 + "\n")
-            
-            current_hw = HARDWARE[min(self.data.get('gpu_level', 0), len(HARDWARE)-1)]
-            tflops = max(0.1, current_hw['tflops'])
-            
-            options['0'] = {
-                "model": {
-                    "name": m['name'], "base_ops": m['base_ops'], "difficulty": m['difficulty'],
-                    "__mission_reqs": m['requirements'], "__rewards": m['rewards'], "max_loss": 2.5
-                },
-                "mins_per_epoch": (m['base_ops'] / tflops) * 0.05,
-                "auto_epochs": m['requirements'].get('min_epochs') or 10
-            }
+            options['0'] = train_system.mission_option(self.data, m)
 
         for line in menu_lines: self.write(line + "\n")
         self.write("\n")
@@ -242,7 +602,11 @@ class CyberTerminal(TerminalCore):
 
     def handle_train_model_selection(self, user_input):
         if not user_input: user_input = "1"
-        if user_input in self.temp_train_options:
+        if user_input == "0" and any(j.is_mission for j in train_system.scheduler.active_jobs()):
+            self.write("Error: The assignment is already running. See 'jobs'.\n", "error")
+            self.interaction_mode = None
+            self.new_prompt()
+        elif user_input in self.temp_train_options:
             self.temp_selected_model = self.temp_train_options[user_input]
             default_eps = self.temp_selected_model['auto_epochs']
             self.interaction_mode = 'train_epochs'
@@ -253,64 +617,141 @@ class CyberTerminal(TerminalCore):
             self.new_prompt()
 
     def handle_train_epochs_input(self, user_input):
-        def on_training_complete(result):
-            """
-            result 结构示例: 
-            {'success': True, 'accuracy': 95.5, 'rank_mult': 1.5, 'fail_reason': None}
-            """
+        if user_input and not (user_input.isdigit() and int(user_input) > 0):
+            self.write(f"bash: {user_input}: invalid epoch count\n", "error")
+            return self.new_prompt(custom_text=f"Epochs [default: {self.temp_selected_model['auto_epochs']}]: ")
+        flags = self.train_flags
+        background = flags.get("background", False)
+        callbacks = self._make_ui_callbacks(self._on_training_complete)
+        if not background: self.lock_input(True)
+        selected = self.temp_selected_model
+        # 任务已提交，之后的输入都是普通命令
+        self._clear_train_selection()
+        job = train_system.start_training_session(self.data, selected, user_input, None, callbacks,
+                                                  priority=flags.get("priority"), foreground=not background)
+        self._announce_job(job)
+
+    def _clear_train_selection(self):
+        self.interaction_mode = None
+        self.temp_train_options = {}
+        self.temp_selected_model = None
+
+    def _announce_job(self, job):
+        if job.foreground: return
+        self.interaction_mode = None
+        state = "queued" if job.state == "queued" else "started"
+        self.write(f"[{job.job_id}] {job.name} ({state} in background)\n", "dim")
+        self.new_prompt()
+
+    def _on_training_complete(self, result):
+        """
+        result 结构示例: 
+        {'success': True, 'accuracy': 95.5, 'rank_mult': 1.5, 'fail_reason': None, 'job_id': 1, 'foreground': True}
+        """
+        if result.get('foreground', True):
             self.lock_input(False)
             self.interaction_mode = None
+        elif not result.get('killed'):
+            self.write(f"\n[{result.get('job_id')}]  Done    {result.get('session_id')}\n", "dim")
+
+        # 1. 显示结果
+        if result.get('killed'):
+            # 被终止的任务不发奖励，任务合同保持激活
+            self.write(f"\n[{result.get('job_id')}]  Terminated    {result.get('session_id')} "
+                       f"({result.get('progress', 0) * 100:.1f}% done, est. acc {result['accuracy']:.2f}%)\n", "error")
+        elif result['success']:
+            self.write(f"\n[RESULT] Training Success! Acc: {result['accuracy']:.2f}%\n", "success")
             
-            # 1. 显示结果
-            if result['success']:
-                self.write(f"\n[RESULT] Training Success! Acc: {result['accuracy']:.2f}%\n", "success")
+            # 2. 如果是任务，从 active_mission 获取奖励定义
+            if result.get('is_mission') and self.active_mission:
+                rewards = self.active_mission.get('rewards', [])
+                # 调用通用管理器发奖
+                self.reward_manager.apply_rewards(rewards, multiplier=result.get('rank_mult', 1.0))
+                mission_id = self.active_mission.get('source_mail_id')
+                if self.active_mission.get('source_type') == 'random':
+                    # 随机委托只计数，不逐个记录 ID
+                    self.data['random_missions_completed'] = self.data.get('random_missions_completed', 0) + 1
+                elif mission_id:
+                    self.data['completed_mission_ids'].add(mission_id)
+                    self.data.touch('completed_mission_ids')
+                # 清理任务
+                self.active_mission = None
+                self.data['active_mission'] = None
                 
-                # 2. 如果是任务，从 active_mission 获取奖励定义
-                if self.active_mission:
-                    rewards = self.active_mission.get('rewards', [])
-                    # 调用通用管理器发奖
-                    self.reward_manager.apply_rewards(rewards, multiplier=result.get('rank_mult', 1.0))
-                    mission_id = self.active_mission.get('source_mail_id')
-                    if mission_id:
-                        completed_list = self.data.get('completed_mission_ids', [])
-                        if mission_id not in completed_list:
-                            completed_list.append(mission_id)
-                            self.data['completed_mission_ids'] = completed_list
-                    # 清理任务
-                    self.active_mission = None
-                    self.data['active_mission'] = None
-                    
-                    self.write("[SYSTEM] Mission closed.\n", "dim")
-                
-                # 3. 如果是自由训练 (没有 active_mission)，生成通用奖励
-                else:
-                    # 这里也可以用 RewardManager，临时生成一个奖励列表
-                    gen_rewards = [
-                        {"type": "coin", "val": 10}, # 基础值
-                        {"type": "exp", "val": 20}
-                    ]
-                    self.reward_manager.apply_rewards(gen_rewards, multiplier=result.get('rank_mult', 1.0))
-
+                self.write("[SYSTEM] Mission closed.\n", "dim")
+            
+            # 3. 如果是自由训练 (没有 active_mission)，生成通用奖励
             else:
-                self.write(f"\n[FAILED] {result['fail_reason']}\n", "error")
-                # 失败安慰奖
-                self.reward_manager.apply_rewards([{"type": "exp", "val": 10}])
+                self.reward_manager.apply_rewards(FREE_TRAIN_REWARDS, multiplier=result.get('rank_mult', 1.0))
 
-            save_game_data(self.data)
+        else:
+            self.write(f"\n[FAILED] {result['fail_reason']}\n", "error")
+            # 失败安慰奖
+            self.reward_manager.apply_rewards(FAILURE_REWARDS)
+
+        # 写入训练历史 (stats)
+        if result.get('model'):
+            try:
+                self.history.append(result['model'], result['epochs'], result['learning_rate'],
+                                    result['total_minutes'], result['accuracy'], success=result['success'],
+                                    is_mission=result.get('is_mission', False), crashed=result.get('crashed', False),
+                                    killed=result.get('killed', False), violations=result.get('violations', 0))
+            except OSError as e:
+                self.write(f"[WARN] Failed to record session history: {e}\n", "warn")
+
+        # 记录会话种子，配合 save/traces 可复现/复盘
+        if result.get('session_id') and result.get('progress', 1.0) > 0:
+            self.data['last_session'] = {"id": result['session_id'], "seed": result.get('seed')}
+            self.write(f"[SYSTEM] Session {result['session_id']} recorded. Type 'replay {result['session_id']}' to review.\n", "dim")
+
+        # 前台还有别的任务在跑时不要抢回命令行
+        fg_job = train_system.scheduler.foreground_job()
+        if not fg_job or fg_job.job_id == result.get('job_id'):
+            self.lock_input(False)
             self.new_prompt()
-        callbacks = {
-            'print': lambda t, s=None: self.after(0, lambda: self.write(str(t)+"\n", s)),
-            'update_bar': lambda t: self.after(0, lambda: self._ui_update_bar(t)),
-            'set_mini_mode': lambda val: self.after(0, lambda: self.set_mini_mode(val)),
+
+    def _resume_training(self, session_id=None):
+        background = self.train_flags.get("background", False)
+        if not background: self.lock_input(True)
+        callbacks = self._make_ui_callbacks(self._on_training_complete)
+        job = train_system.resume_training_session(self.data, callbacks, session_id, foreground=not background)
+        if not job:
+            self.write("train: no interrupted session to resume\n", "error")
+            self.lock_input(False)
+            self.new_prompt()
+        else:
+            self._announce_job(job)
+
+    def _make_ui_callbacks(self, on_finished):
+        """后台线程 -> UI 线程的回调表 (训练/复盘共用)，全部经渲染泵按顺序执行"""
+        # 进度条 key：还没画出来就被新进度覆盖的更新直接丢弃。
+        # 会话每打印一行就换一个 key：旧进度条定格在原处，新进度条在输出下面另起一行 (同 tqdm 日志)
+        bar = {'key': object(), 'drawn': False}
+
+        def end_bar():
+            if bar['drawn']:
+                self.post_call(self.progress_end, bar['key'])
+                bar['key'], bar['drawn'] = object(), False
+
+        def on_print(t, s=None):
+            end_bar()
+            self.post_write(str(t) + "\n", s)
+
+        def on_update_bar(t):
+            bar['drawn'] = True
+            self.post_latest(bar['key'], self.progress, bar['key'], t)
+
+        def on_done(res):
+            end_bar()
             # 这里的 finished 不再只是 UI 复位，而是携带数据的业务回调
-            'finished': lambda res: self.after(0, lambda: on_training_complete(res))
-        }
-        self.lock_input(True)
-        train_system.start_training_session(..., callbacks)
+            self.post_call(on_finished, res)
 
-    def _ui_update_bar(self, text):
-        self.tk_text.delete("end-1c linestart", "end-1c")
-        self.write(text)
+        return {
+            'print': on_print,
+            'update_bar': on_update_bar,
+            'set_mini_mode': lambda val: self.post_call(self.set_mini_mode, val),
+            'finished': on_done
+        }
 
     def _ui_train_finished(self):
         self.lock_input(False)
@@ -345,14 +786,32 @@ class CyberTerminal(TerminalCore):
         self.after(200, self._auto_check_mail)
         self.new_prompt()
 
+    def _update_title(self):
+        gpu = current_hardware(self.data)
+        self.title(f"Self-Attention-trainer_Terminal - Lv.{self.data.get('level', 0)} | "
+                   f"${self.data.get('coins', 0)} | {gpu['name']}")
+
     def print_motd(self):
-        gpu = HARDWARE[min(self.data.get('gpu_level', 0), len(HARDWARE)-1)]
+        gpu = current_hardware(self.data)
         self.write(f"Welcome to Ubuntu 22.04.2 LTS (GNU/Linux 5.15.0-76-generic x86_64)\n\n")
         self.write(f"  System load:  0.08              Processes: 104\n")
         self.write(f"  Memory usage: 24%               IPv4 address: 192.168.1.42\n")
         self.write(f"  GPU Driver:   NVIDIA 535.54     GPU: {gpu['name']}\n\n")
         self.write(f"  => Compute Credits: ${self.data.get('coins', 0)}\n", "warn")
 
+def create_app(tty=False):
+    """tty=True 时用普通终端前端，不加载 customtkinter / Tk"""
+    if tty:
+        from module.tty_frontend import TtyCore as Core
+    else:
+        from module.TUI import TerminalCore as Core
+
+    class CyberTerminal(CyberGame, Core):
+        pass
+
+    return CyberTerminal()
+
+
 if __name__ == "__main__":
-    app = CyberTerminal()
+    app = create_app(tty="--tty" in sys.argv[1:])
     app.mainloop()
\ No newline at end of file
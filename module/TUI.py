@@ -1,16 +1,33 @@
 import customtkinter as ctk
 import tkinter as tk
-import os
+import re
+import time
+
+from .frontend import Frontend, PUMP_INTERVAL_MS
 
 # 设置外观模式
 ctk.set_appearance_mode("Dark")
 
-class TerminalCore(ctk.CTk):
+# 进度条：原地只改变化的字符，所有进度条合计每秒最多这么多次 Tk 文本操作
+PROGRESS_OPS_PER_SEC = 120
+PROGRESS_BURST = 12         # 空闲后允许的突发操作数
+
+# 迷你模式小窗
+OVERLAY_SIZE = (400, 90)
+OVERLAY_MARGIN = (50, 100)  # 距屏幕右边 / 下边
+# tqdm 风格进度行:  42%|████    | 21/50 [00:10<00:14, 2.05it/s, loss=0.1234] ...
+_TQDM_RE = re.compile(r"\s*(\d+%\|[^|]*\|\s*\S+)\s*\[[^<]*<([^,\]]+)[^\]]*?loss=([^,\]\s]+)[^\]]*\]\s*(.*)")
+
+class TerminalCore(ctk.CTk, Frontend):
     """
     TUI 核心引擎：负责窗口绘制、光标保护、输入拦截、底层 I/O
-    不包含任何游戏具体的业务逻辑。
+    不包含任何游戏具体的业务逻辑 (渲染泵、写缓冲、钩子见 frontend.Frontend)。
     """
-    def __init__(self, title="Terminal", width=1000, height=650):
+    def __init__(self, title="Terminal", width=1000, height=650, scrollback=None, transcript=None):
+        """
+        scrollback: 文本框最多保留的行数 (None 不限)；
+        transcript: Transcript 实例，超出上限被删掉的旧行写入其中，可用 page() 读回
+        """
         super().__init__()
 
         # === 1. 窗口设置 ===
@@ -18,9 +35,6 @@ class TerminalCore(ctk.CTk):
         self.geometry(f"{width}x{height}")
         self.attributes('-topmost', True)
         
-        # 确定虚拟根目录 (用于显示 ~)
-        self.system_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        
         # === 2. UI 布局 ===
         self.grid_columnconfigure(0, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -39,10 +53,8 @@ class TerminalCore(ctk.CTk):
         self.tk_text = self.console._textbox 
         self._setup_tags()
 
-        # === 3. 核心状态 ===
-        self.input_locked = False
-        self.command_history = []
-        self.history_index = 0
+        # === 3. 核心状态 / 渲染泵 ===
+        self._setup_frontend(scrollback, transcript)
         
         # === 4. 事件绑定 ===
         self.tk_text.bind("<Return>", self._on_enter)
@@ -51,6 +63,17 @@ class TerminalCore(ctk.CTk):
         self.tk_text.bind("<Down>", self._on_down)
         self.tk_text.bind("<Button-1>", self._on_click)
         self.tk_text.bind("<Key>", self._on_key_press)
+        self.tk_text.bind("<Control-z>", self._on_ctrl_z)
+        self.tk_text.bind("<Control-c>", self._on_ctrl_c)
+
+        # === 5. 进度条区域 ===
+        self._bars = {}             # key -> [起点 mark, 当前显示的文本]
+        self._bar_pending = {}      # key -> 还没画上去的最新文本 (超出操作配额时等下一帧)
+        self._bar_seq = 0
+        self._bar_tokens = PROGRESS_BURST
+        self._bar_refill = time.perf_counter()
+        self._bar_retry = False
+        self.overlay = ProgressOverlay(self)
 
     def _setup_tags(self):
         """配置颜色方案"""
@@ -64,30 +87,133 @@ class TerminalCore(ctk.CTk):
     # ================= 公共 API (供 main.py 调用) =================
 
     def write(self, text, tag=None):
-        """追加文本"""
+        """追加文本 (在 buffered() 里时先进缓冲，退出时统一提交)"""
+        if self._write_buffer is not None:
+            self._write_buffer.append((text, tag))
+            return
         self.tk_text.insert("end", text, tag)
         self.tk_text.see("end")
+        if "\n" in text: self._trim_scrollback()
+
+    def write_many(self, pieces):
+        """[(text, tag), ...] 用一次多段 insert 提交 (相邻同 tag 先合并)，只滚动一次"""
+        args = []
+        for text, tag in pieces:
+            if not text: continue
+            tags = tag or ()
+            if args and args[-1] == tags: args[-2] += text
+            else: args += [text, tags]
+        if not args: return
+        self.tk_text.insert("end", *args)
+        self.tk_text.see("end")
+        self._trim_scrollback()
+
+    def _trim_scrollback(self):
+        """
+        行数超过上限 1/8 以后一次删到上限 (删除成本摊到多次写入上)，
+        删掉的行压缩后追加到 transcript，文本框的内存与重绘成本不随运行时长增长
+        """
+        if not self.scrollback: return
+        lines = self.screen_lines()
+        if lines <= self.scrollback + self.scrollback // 8: return
+        cut = f"{lines - self.scrollback + 1}.0"
+        for key, bar in list(self._bars.items()):
+            if self.tk_text.compare(bar[0], "<", cut): self._drop_bar(key)
+        evicted = self.tk_text.get("1.0", cut)
+        self.tk_text.delete("1.0", cut)
+        if self.transcript is not None:
+            try: self.transcript.append(evicted)
+            except OSError: pass        # 写不了盘也不能影响终端本身
+
+    # ================= 进度条 (原地刷新) =================
+
+    def progress(self, key, text):
+        """
+        显示 / 刷新 key 对应的单行进度条。第一次在末尾占一行 (起点用 Tk mark 标记)，
+        之后只替换和上次不同的那一段字符；其他输出照常追加在下面，不影响进度条。
+        """
+        self._bar_pending[key] = text
+        self._paint_bars()
+
+    def progress_end(self, key):
+        """进度条定格为普通文本 (最后一次刷新不受配额限制)，同一 key 再刷新会另起一行"""
+        text = self._bar_pending.pop(key, None)
+        if text is not None: self._repaint(key, text)
+        self._drop_bar(key)
+
+    def _drop_bar(self, key):
+        self._bar_pending.pop(key, None)
+        bar = self._bars.pop(key, None)
+        if bar: self.tk_text.mark_unset(bar[0])
+
+    def _paint_bars(self):
+        now = time.perf_counter()
+        self._bar_tokens = min(PROGRESS_BURST, self._bar_tokens + (now - self._bar_refill) * PROGRESS_OPS_PER_SEC)
+        self._bar_refill = now
+        # 等得最久的先画 (已在等待的 key 刷新时不改变位置)
+        for key in list(self._bar_pending):
+            if self._bar_tokens < 2: break
+            self._bar_tokens -= self._repaint(key, self._bar_pending.pop(key))
+        if self._bar_pending and not self._bar_retry:
+            self._bar_retry = True
+            self.after(PUMP_INTERVAL_MS, self._retry_bars)
+
+    def _retry_bars(self):
+        self._bar_retry = False
+        self._paint_bars()
+
+    def _repaint(self, key, text):
+        """把 key 的进度条改成 text，返回用掉的 Tk 操作数"""
+        if self.overlay.visible: self.overlay.show_progress(text)
+        bar = self._bars.get(key)
+        if bar is None:
+            # 新进度条：在末尾另起一行 (缓冲里的输出先提交，保证先后顺序)
+            self._flush_writes()
+            self._bar_seq += 1
+            mark = f"progress{self._bar_seq}"
+            if self.tk_text.get("end-2c") != "\n": self.tk_text.insert("end", "\n")
+            self.tk_text.mark_set(mark, "end-1c")
+            self.tk_text.mark_gravity(mark, tk.LEFT)
+            self.tk_text.insert("end", text + "\n")
+            self.tk_text.see("end")
+            self._bars[key] = [mark, text]
+            self._trim_scrollback()
+            return 4
+
+        mark, old = bar
+        if text == old: return 0
+        # 只替换公共前缀和公共后缀之间的部分
+        n = min(len(old), len(text))
+        head = 0
+        while head < n and old[head] == text[head]: head += 1
+        tail = 0
+        while tail < n - head and old[-1 - tail] == text[-1 - tail]: tail += 1
+        start = f"{mark} + {head} chars"
+        ops = 0
+        if len(old) - tail > head:
+            self.tk_text.delete(start, f"{mark} + {len(old) - tail} chars")
+            ops += 1
+        if len(text) - tail > head:
+            self.tk_text.insert(start, text[head:len(text) - tail])
+            ops += 1
+        bar[1] = text
+        return ops
 
     def clear_screen(self):
         """清屏"""
+        if self._write_buffer: self._write_buffer.clear()
+        for key in list(self._bars): self._drop_bar(key)
+        self._bar_pending.clear()
         self.tk_text.delete("1.0", "end")
 
     def new_prompt(self, custom_text=None):
         """生成提示符并锁定光标"""
-        if custom_text:
-             if not self.tk_text.get("end-2c") == "\n": self.write("\n")
-             self.write(custom_text)
-        else:
-            cwd = os.getcwd()
-            if cwd == self.system_root: path_str = "~"
-            elif cwd.startswith(self.system_root): 
-                path_str = f"~/{os.path.relpath(cwd, self.system_root)}".replace("\\", "/")
-            else: path_str = cwd
-
-            if not self.tk_text.get("end-2c") == "\n": self.write("\n")
-            self.write(f"[root@node-01 {path_str}]# ")
+        self._flush_writes()
+        if not self.tk_text.get("end-2c") == "\n": self.write("\n")
+        self.write(custom_text or self._prompt_text())
         
-        # 标记输入起点
+        # 标记输入起点 (提示符必须已经进了文本框)
+        self._flush_writes()
         self.tk_text.mark_set("input_start", "insert")
         self.tk_text.mark_gravity("input_start", tk.LEFT)
         self.tk_text.see("end")
@@ -102,11 +228,9 @@ class TerminalCore(ctk.CTk):
     def lock_input(self, locked=True):
         self.input_locked = locked
 
-    # ================= 业务逻辑钩子 (需在 main.py 重写) =================
-
-    def on_user_input(self, input_str):
-        """当用户按下回车时调用此方法"""
-        pass
+    def screen_lines(self):
+        """文本框里当前的行数"""
+        return int(self.tk_text.index("end-1c").split(".")[0])
 
     # ================= 底层事件处理 (通常不需要动) =================
 
@@ -116,6 +240,13 @@ class TerminalCore(ctk.CTk):
         if self.tk_text.compare("insert", "<", "input_start"):
             self.tk_text.mark_set("insert", "end")
 
+    def _on_ctrl_c(self, event):
+        if self.on_interrupt(): return "break"
+
+    def _on_ctrl_z(self, event):
+        self.on_suspend()
+        return "break"
+
     def _on_backspace(self, event):
         if self.input_locked: return "break"
         if self.tk_text.compare("insert", "<=", "input_start"): return "break"
@@ -127,13 +258,8 @@ class TerminalCore(ctk.CTk):
         self.tk_text.mark_set("insert", "end")
         self.write("\n")
         
-        # 历史记录逻辑
-        if user_input:
-            self.command_history.append(user_input)
-            self.history_index = len(self.command_history)
-        
-        # 调用钩子，把控制权交给 main.py
-        self.on_user_input(user_input)
+        # 记历史并调用钩子，把控制权交给 main.py
+        self._submit(user_input)
         return "break"
 
     def _on_up(self, event):
@@ -158,4 +284,54 @@ class TerminalCore(ctk.CTk):
     def _on_click(self, event):
         self.tk_text.mark_set("insert", "end")
         self.tk_text.focus_set()
-        return "break"
\ No newline at end of file
+        return "break"
+
+
+class ProgressOverlay:
+    """
+    迷你模式：屏幕右下角一个置顶小窗，只显示最近一次刷新的进度条、loss (带火花线) 和 ETA。
+    窗口第一次 show() 时创建，之后只是隐藏 / 显示，主窗口和控制台完全不动。
+    """
+    def __init__(self, master):
+        self.master = master
+        self.win = None
+        self.visible = False
+        self._shown = (None, None)
+
+    def _build(self):
+        self.win = ctk.CTkToplevel(self.master, fg_color="#0c0c0c")
+        self.win.title("Focus")
+        self.win.resizable(False, False)
+        self.win.attributes('-topmost', True)
+        self.win.protocol("WM_DELETE_WINDOW", self.hide)
+        self.bar_label = ctk.CTkLabel(self.win, text="", font=("Consolas", 12), text_color="#cccccc", anchor="w")
+        self.bar_label.pack(fill="x", padx=10, pady=(14, 0))
+        self.info_label = ctk.CTkLabel(self.win, text="", font=("Consolas", 11), text_color="#666666", anchor="w")
+        self.info_label.pack(fill="x", padx=10)
+
+    def show(self):
+        if self.win is None: self._build()
+        w, h = OVERLAY_SIZE
+        x = self.master.winfo_screenwidth() - w - OVERLAY_MARGIN[0]
+        y = self.master.winfo_screenheight() - h - OVERLAY_MARGIN[1]
+        self.win.geometry(f"{w}x{h}+{x}+{y}")
+        self._set("Waiting for first step...", "")
+        self.win.deiconify()
+        self.visible = True
+
+    def hide(self):
+        if self.win is not None: self.win.withdraw()
+        self.visible = False
+
+    def show_progress(self, text):
+        """tqdm 风格的进度行拆成「进度条」和「loss 火花线 / ETA」两行，认不出的格式原样显示"""
+        m = _TQDM_RE.match(text)
+        if m: self._set(m.group(1), f"loss {m.group(3)} {m.group(4)}".rstrip() + f"   ETA {m.group(2)}")
+        else: self._set(text, "")
+
+    def _set(self, bar, info):
+        # 内容没变就不碰 Tk
+        if self._shown == (bar, info): return
+        if self._shown[0] != bar: self.bar_label.configure(text=bar)
+        if self._shown[1] != info: self.info_label.configure(text=info)
+        self._shown = (bar, info)
\ No newline at end of file
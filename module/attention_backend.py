@@ -0,0 +1,248 @@
+# module/attention_backend.py
+# 纯 NumPy 的真实训练后端：一个很小的 decoder-only Self-Attention 模型，在 CPU 上训练。
+# 前向/反向全部向量化 (批量 matmul)，注意力按 query 分块计算，
+# 反向时按块重算 softmax，显存 (内存) 占用为 O(T * chunk) 而不是 O(T^2)。
+import math
+import time
+
+import numpy as np
+
+from .rng import derive_np_rng
+
+class TinyAttentionModel:
+    """
+    Embedding + N 层 [因果多头自注意力 + ReLU MLP] (残差连接) + 输出投影
+    idx: (B, T) int 数组；targets: (B, T) int 数组
+    """
+    def __init__(self, vocab_size, d_model, n_heads, n_layers, seq_len, rng, chunk_size=64):
+        assert d_model % n_heads == 0
+        self.vocab_size = vocab_size
+        self.d_model = d_model
+        self.n_heads = n_heads
+        self.n_layers = n_layers
+        self.seq_len = seq_len
+        self.chunk_size = chunk_size
+
+        D, V, F = d_model, vocab_size, 4 * d_model
+        std = 0.02
+        # 残差分支的输出层按层数缩小，保证深一点的模型初始也稳定
+        res_std = std / math.sqrt(2 * n_layers)
+        f32 = np.float32
+        self.params = {
+            "tok_emb": (rng.standard_normal((V, D)) * std).astype(f32),
+            "pos_emb": (rng.standard_normal((seq_len, D)) * std).astype(f32),
+            "w_out": (rng.standard_normal((D, V)) * std).astype(f32),
+        }
+        for l in range(n_layers):
+            self.params[f"w_qkv{l}"] = (rng.standard_normal((D, 3 * D)) * std).astype(f32)
+            self.params[f"w_o{l}"] = (rng.standard_normal((D, D)) * res_std).astype(f32)
+            self.params[f"w_1{l}"] = (rng.standard_normal((D, F)) * std).astype(f32)
+            self.params[f"b_1{l}"] = np.zeros(F, dtype=f32)
+            self.params[f"w_2{l}"] = (rng.standard_normal((F, D)) * res_std).astype(f32)
+            self.params[f"b_2{l}"] = np.zeros(D, dtype=f32)
+
+    def num_params(self):
+        return sum(p.size for p in self.params.values())
+
+    def flops_per_step(self, batch_size):
+        """粗略估算一次前向+反向的浮点运算量 (6 * 参数 * token + 注意力部分)"""
+        T, D = self.seq_len, self.d_model
+        dense = 6 * self.num_params() * batch_size * T
+        attn = 6 * 2 * batch_size * self.n_layers * T * T * D
+        return dense + attn
+
+    # ================= 注意力 (分块) =================
+
+    def _split_heads(self, x):
+        B, T, D = x.shape
+        return x.reshape(B, T, self.n_heads, D // self.n_heads).transpose(0, 2, 1, 3)
+
+    def _merge_heads(self, x):
+        B, H, T, Dh = x.shape
+        return x.transpose(0, 2, 1, 3).reshape(B, T, H * Dh)
+
+    def _chunk_probs(self, q_c, k, start, scale):
+        """对 query 块 [start, start+C) 计算因果 softmax 概率 (B, H, C, T)"""
+        C, T = q_c.shape[2], k.shape[2]
+        scores = np.matmul(q_c, k.transpose(0, 1, 3, 2)) * scale
+        rows = np.arange(start, start + C)[:, None]
+        cols = np.arange(T)[None, :]
+        scores = np.where(cols > rows, -np.inf, scores)
+        scores -= scores.max(axis=-1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=-1, keepdims=True)
+        return scores
+
+    def _attention_forward(self, q, k, v):
+        scale = 1.0 / math.sqrt(q.shape[-1])
+        out = np.empty_like(q)
+        T = q.shape[2]
+        for start in range(0, T, self.chunk_size):
+            end = min(start + self.chunk_size, T)
+            # 因果掩码：这个块只需要看前 end 个 key
+            p = self._chunk_probs(q[:, :, start:end], k[:, :, :end], start, scale)
+            out[:, :, start:end] = np.matmul(p, v[:, :, :end])
+        return out
+
+    def _attention_backward(self, q, k, v, d_out):
+        scale = 1.0 / math.sqrt(q.shape[-1])
+        dq = np.zeros_like(q)
+        dk = np.zeros_like(k)
+        dv = np.zeros_like(v)
+        T = q.shape[2]
+        for start in range(0, T, self.chunk_size):
+            end = min(start + self.chunk_size, T)
+            q_c, k_c, v_c = q[:, :, start:end], k[:, :, :end], v[:, :, :end]
+            p = self._chunk_probs(q_c, k_c, start, scale)   # 重算，不保存 T x T 矩阵
+            do_c = d_out[:, :, start:end]
+            dv[:, :, :end] += np.matmul(p.transpose(0, 1, 3, 2), do_c)
+            dp = np.matmul(do_c, v_c.transpose(0, 1, 3, 2))
+            ds = p * (dp - (dp * p).sum(axis=-1, keepdims=True)) * scale
+            dq[:, :, start:end] = np.matmul(ds, k_c)
+            dk[:, :, :end] += np.matmul(ds.transpose(0, 1, 3, 2), q_c)
+        return dq, dk, dv
+
+    # ================= 前向 / 反向 =================
+
+    def loss_and_grads(self, idx, targets):
+        P = self.params
+        B, T = idx.shape
+        D = self.d_model
+
+        x = P["tok_emb"][idx] + P["pos_emb"][:T]
+        caches = []
+        for l in range(self.n_layers):
+            qkv = x @ P[f"w_qkv{l}"]
+            q, k, v = (self._split_heads(t) for t in np.split(qkv, 3, axis=-1))
+            att = self._merge_heads(self._attention_forward(q, k, v))
+            x1 = x + att @ P[f"w_o{l}"]
+            pre = x1 @ P[f"w_1{l}"] + P[f"b_1{l}"]
+            h = np.maximum(pre, 0)
+            x2 = x1 + h @ P[f"w_2{l}"] + P[f"b_2{l}"]
+            caches.append((x, q, k, v, att, x1, pre, h))
+            x = x2
+
+        logits = x @ P["w_out"]
+        logits -= logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=-1, keepdims=True)
+        flat_probs = probs.reshape(B * T, -1)
+        flat_t = targets.reshape(-1)
+        loss = float(-np.log(flat_probs[np.arange(B * T), flat_t] + 1e-9).mean())
+
+        grads = {}
+        d_logits = flat_probs.copy()
+        d_logits[np.arange(B * T), flat_t] -= 1.0
+        d_logits = (d_logits / (B * T)).reshape(B, T, -1).astype(x.dtype)
+        grads["w_out"] = x.reshape(B * T, D).T @ d_logits.reshape(B * T, -1)
+        dx = d_logits @ P["w_out"].T
+
+        for l in reversed(range(self.n_layers)):
+            x_in, q, k, v, att, x1, pre, h = caches[l]
+            # MLP
+            grads[f"w_2{l}"] = h.reshape(B * T, -1).T @ dx.reshape(B * T, D)
+            grads[f"b_2{l}"] = dx.sum(axis=(0, 1))
+            dh = (dx @ P[f"w_2{l}"].T) * (pre > 0)
+            grads[f"w_1{l}"] = x1.reshape(B * T, D).T @ dh.reshape(B * T, -1)
+            grads[f"b_1{l}"] = dh.sum(axis=(0, 1))
+            dx1 = dx + dh @ P[f"w_1{l}"].T
+            # Attention
+            grads[f"w_o{l}"] = att.reshape(B * T, D).T @ dx1.reshape(B * T, D)
+            d_att = self._split_heads(dx1 @ P[f"w_o{l}"].T)
+            dq, dk, dv = self._attention_backward(q, k, v, d_att)
+            d_qkv = np.concatenate([self._merge_heads(t) for t in (dq, dk, dv)], axis=-1)
+            grads[f"w_qkv{l}"] = x_in.reshape(B * T, D).T @ d_qkv.reshape(B * T, -1)
+            dx = dx1 + d_qkv @ P[f"w_qkv{l}"].T
+
+        d_tok = np.zeros_like(P["tok_emb"])
+        np.add.at(d_tok, idx.reshape(-1), dx.reshape(B * T, D))
+        grads["tok_emb"] = d_tok
+        d_pos = np.zeros_like(P["pos_emb"])
+        d_pos[:T] = dx.sum(axis=0)
+        grads["pos_emb"] = d_pos
+        return loss, grads
+
+class AdamOptimizer:
+    def __init__(self, params, lr=3e-3, betas=(0.9, 0.98), eps=1e-8, clip=1.0):
+        self.params = params
+        self.lr = lr
+        self.beta1, self.beta2 = betas
+        self.eps = eps
+        self.clip = clip
+        self.t = 0
+        self.m = {k: np.zeros_like(v) for k, v in params.items()}
+        self.v = {k: np.zeros_like(v) for k, v in params.items()}
+
+    def step(self, grads):
+        # 全局梯度裁剪，避免大学习率下直接发散
+        norm = math.sqrt(sum(float((g * g).sum()) for g in grads.values()))
+        scale = min(1.0, self.clip / (norm + 1e-6))
+        self.t += 1
+        lr_t = self.lr * math.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        for k, g in grads.items():
+            g = g * scale
+            m, v = self.m[k], self.v[k]
+            m *= self.beta1
+            m += (1 - self.beta1) * g
+            v *= self.beta2
+            v += (1 - self.beta2) * (g * g)
+            self.params[k] -= lr_t * m / (np.sqrt(v) + self.eps)
+
+class SyntheticCorpus:
+    """
+    没有挂载数据集时使用的合成语料：一个随机但「尖锐」的一阶马尔可夫链。
+    Loss 会从 ln(V) 逐步下降到链的条件熵附近，能真实反映模型在学习。
+    """
+    def __init__(self, vocab_size, rng, concentration=0.1):
+        self.vocab_size = vocab_size
+        self.rng = rng
+        self.transition = rng.dirichlet(np.full(vocab_size, concentration), size=vocab_size)
+        self.cdf = np.cumsum(self.transition, axis=1)
+
+    def next_batch(self, batch_size, seq_len):
+        tokens = np.empty((batch_size, seq_len + 1), dtype=np.int64)
+        tokens[:, 0] = self.rng.integers(0, self.vocab_size, batch_size)
+        u = self.rng.random((batch_size, seq_len))
+        for t in range(seq_len):
+            rows = self.cdf[tokens[:, t]]
+            tokens[:, t + 1] = np.minimum((rows < u[:, t:t + 1]).sum(axis=1), self.vocab_size - 1)
+        return tokens
+
+class AttentionBackend:
+    """
+    训练循环使用的后端：每次 train_step() 真正做一次前向+反向+参数更新，
+    返回 (loss, 计算耗时秒)。模型规模随 tasks.json 的 base_ops 增长。
+    """
+    def __init__(self, model_cfg, seed, learning_rate=3e-3, batch_size=8, vocab_size=256, batch_source=None):
+        size = self.size_for(model_cfg.get('base_ops', 100))
+        rng = derive_np_rng(seed, "attention_backend")
+        self.batch_size = batch_size
+        self.model = TinyAttentionModel(vocab_size, size['d_model'], size['n_heads'],
+                                        size['n_layers'], size['seq_len'], rng)
+        self.optimizer = AdamOptimizer(self.model.params, lr=learning_rate)
+        # batch_source: 任何带 next_batch(batch_size, seq_len) -> (B, T+1) 的对象
+        self.batch_source = batch_source or SyntheticCorpus(vocab_size, rng)
+
+    @staticmethod
+    def size_for(base_ops):
+        """base_ops (20 ~ 150000) -> 模型尺寸；越大的条目层数、宽度和上下文越大"""
+        scale = max(1, int(math.log10(max(base_ops, 10))))    # 1 ~ 5
+        d_model = 32 * (scale + 1)
+        return {
+            "d_model": d_model,
+            "n_heads": d_model // 32,
+            "n_layers": scale + 1,
+            "seq_len": 32 * (scale + 1)
+        }
+
+    def describe(self):
+        m = self.model
+        return (f"[BACKEND] NumPy self-attention | layers={m.n_layers} d_model={m.d_model} "
+                f"heads={m.n_heads} ctx={m.seq_len} params={m.num_params() / 1e6:.2f}M")
+
+    def train_step(self):
+        t0 = time.perf_counter()
+        tokens = self.batch_source.next_batch(self.batch_size, self.model.seq_len)
+        loss, grads = self.model.loss_and_grads(tokens[:, :-1], tokens[:, 1:])
+        self.optimizer.step(grads)
+        return loss, time.perf_counter() - t0
@@ -0,0 +1,250 @@
+# module/career_sim.py
+# 经济平衡模拟器：让成千上万个合成玩家在虚拟时间里走完整个职业生涯
+# (收邮件 / 接任务 / 自由训练 / 买硬件 / 升级)，统计达到各等级与各档硬件所需的时间分布。
+#
+# 用法: python -m module.career_sim --players 2000 --hours 400 [--cost-scale 1.0] [--reward-scale 1.0]
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .config import HARDWARE
+from .game_mechanics import RewardManager, FREE_TRAIN_REWARDS, FAILURE_REWARDS
+from .game_state import GameState
+from .mission_generator import MissionGenerator
+from .rng import derive_rng, new_seed
+from .state_types import IdSet
+from .train import get_menu_data, mission_option, run_headless
+
+DAY = 24 * 3600
+
+
+class _SimTerminal:
+    """RewardManager 需要的最小终端：持有存档，输出全部丢弃"""
+    def __init__(self, data):
+        self.data = data
+
+    def write(self, text, tag=None):
+        pass
+
+
+def _new_player(rng):
+    """随机玩家画像：专注时长、每日场次、LR 偏好、接单意愿、存钱习惯"""
+    return {
+        "focus_duration": rng.choice([25, 25, 45, 60]),
+        "sessions_per_day": rng.randint(1, 6),
+        "lr": 10 ** rng.uniform(math.log10(3e-4), math.log10(8e-3)),
+        "accept_prob": rng.uniform(0.5, 1.0),
+        "reserve": rng.uniform(0.0, 0.5),     # 买硬件前额外留存的比例
+        "patience": rng.randint(2, 5),        # 同一任务连续失败几次后放弃
+    }
+
+
+def _scaled_rewards(rewards, reward_scale):
+    if reward_scale == 1.0: return rewards
+    return [dict(r, val=r['val'] * reward_scale) if r.get('type') == "coin" else r for r in rewards]
+
+
+def _try_buy(data, cost_scale, reserve):
+    """与 shop 相同的可见范围 (当前档位等级 + 1)，买得起就买下一档"""
+    idx = data.get('gpu_level', 0)
+    if idx + 1 >= len(HARDWARE): return False
+    nxt = HARDWARE[idx + 1]
+    if nxt.get('level', 1) > HARDWARE[idx].get('level', 1) + 1: return False
+    cost = nxt['cost'] * cost_scale
+    if data['coins'] < cost * (1 + reserve): return False
+    data['coins'] -= cost
+    data['gpu_level'] = idx + 1
+    return True
+
+
+def simulate_career(seed, hours=400, cost_scale=1.0, reward_scale=1.0, max_level=20):
+    """
+    模拟一个玩家直到累计训练 hours 小时。
+    返回 {"player", "level_at": {lv: (训练小时, 天数)}, "tier_at": {gpu_idx: (训练小时, 天数)}, "sessions", "days"}
+    随机委托按真实的 12 小时冷却刷新，所以后期进度受日历天数限制多于训练时长，两者都记录。
+    """
+    rng = derive_rng(seed, "career")
+    player = _new_player(rng)
+    data = GameState({"coins": 0, "gpu_level": 0, "level": 0, "Exp": 0, "mission_seed": rng.getrandbits(32),
+                      "focus_duration": player['focus_duration'], "received_mail_ids": IdSet()})
+    rewards = RewardManager(_SimTerminal(data))
+    generator = MissionGenerator()
+
+    inbox = []
+    active_mission = None
+    mission_failures = 0
+    stuck_at = None     # 放弃任务的时间：游戏里没有退单命令，该任务会一直占着 active_mission
+    trained_minutes = 0.0
+    now = 0.0
+    sessions = 0
+    level_at = {0: (0.0, 0.0)}
+    tier_at = {0: (0.0, 0.0)}
+
+    while trained_minutes < hours * 60 and data['level'] < max_level:
+        # 1. 收信 (随机委托按真实冷却时间在虚拟时钟上刷新)
+        for mail in generator.fetch_new_emails(data, now=now):
+            data['received_mail_ids'].add(mail['id'])
+            inbox.append(mail)
+
+        # 2. 处理收件箱：硬件升级立即生效，任务按意愿接
+        for mail in list(inbox):
+            att = mail.get('attachment')
+            if not att:
+                inbox.remove(mail)
+            elif att.get('instant_action'):
+                rewards.apply_rewards(att.get('rewards', []))
+                inbox.remove(mail)
+            elif active_mission is None and rng.random() < player['accept_prob']:
+                active_mission = att
+                mission_failures = 0
+                inbox.remove(mail)
+
+        # 3. 训练一场：有任务做任务，否则挑专注时长内能跑完一个 epoch 的最大模型
+        epochs = minutes = None
+        if active_mission is not None and stuck_at is None:
+            option = mission_option(data, active_mission)
+        else:
+            _, options = get_menu_data(data)
+            fits = [o for o in options.values() if o['mins_per_epoch'] <= player['focus_duration']]
+            option = max(fits, key=lambda o: o['model']['base_ops']) if fits else \
+                min(options.values(), key=lambda o: o['mins_per_epoch'])
+            # 结算只取决于 LR / 硬件等级 / 随机数，与 epoch 数无关：
+            # 后期推荐 epoch 数可达上万，这里只模拟 1 个 epoch，按推荐 epoch 数计时
+            epochs = 1
+            minutes = option['auto_epochs'] * option['mins_per_epoch']
+
+        result = run_headless(data, option, user_epochs=epochs, user_lr=player['lr'],
+                              seed=rng.getrandbits(32))['result']
+        sessions += 1
+        minutes = result['total_minutes'] if minutes is None else minutes
+        trained_minutes += minutes
+
+        # 4. 结算 (规则同 main.py 的 _on_training_complete)
+        if result['success']:
+            if result['is_mission']:
+                rewards.apply_rewards(_scaled_rewards(active_mission.get('rewards', []), reward_scale),
+                                      multiplier=result['rank_mult'])
+                active_mission = None
+            else:
+                rewards.apply_rewards(_scaled_rewards(FREE_TRAIN_REWARDS, reward_scale),
+                                      multiplier=result['rank_mult'])
+        else:
+            rewards.apply_rewards(FAILURE_REWARDS)
+            if result['is_mission']:
+                mission_failures += 1
+                if mission_failures >= player['patience']: stuck_at = trained_minutes / 60
+
+        # 5. 购物
+        while _try_buy(data, cost_scale, player['reserve']): pass
+
+        stamp = (trained_minutes / 60, now / DAY)
+        for lv in range(1, data['level'] + 1): level_at.setdefault(lv, stamp)
+        for tier in range(1, data['gpu_level'] + 1): tier_at.setdefault(tier, stamp)
+
+        # 一天 sessions_per_day 场，场次之间均匀分布
+        now += max(minutes * 60, DAY / player['sessions_per_day'])
+
+    return {"player": player, "level_at": level_at, "tier_at": tier_at,
+            "sessions": sessions, "days": now / DAY, "stuck_at": stuck_at}
+
+
+def _simulate_batch(seeds, hours, cost_scale, reward_scale):
+    """子进程入口"""
+    return [simulate_career(s, hours, cost_scale, reward_scale) for s in seeds]
+
+
+def _percentiles(careers, key):
+    """
+    {里程碑: (达成比例, 训练小时 p10, p50, p90, 天数 p50)}，分位数针对全体玩家：
+    模拟结束仍未达成的玩家按删失处理 (记为 inf，即「超过 --hours」)，这样各里程碑的分位数随等级单调不减。
+    分位数取实际样本值 (inverted_cdf)，不在有限值与 inf 之间插值。
+    """
+    milestones = sorted({m for c in careers for m in c[key]})
+    out = {}
+    for m in milestones:
+        stamps = np.array([c[key].get(m, (np.inf, np.inf)) for c in careers], dtype=np.float64)
+        p10, p50, p90 = np.percentile(stamps[:, 0], [10, 50, 90], method='inverted_cdf')
+        days = np.percentile(stamps[:, 1], 50, method='inverted_cdf')
+        out[m] = (float(np.isfinite(stamps[:, 0]).mean()), float(p10), float(p50), float(p90), float(days))
+    return out
+
+
+def run_simulation(players=1000, hours=400, cost_scale=1.0, reward_scale=1.0, workers=None,
+                   seed=None, progress=None):
+    """
+    把 players 个玩家按块分发到进程池。
+    progress(done, total): 可选进度回调
+    返回 {"levels": {...}, "tiers": {...}, "careers": n, "elapsed": 秒}
+    """
+    workers = workers or os.cpu_count() or 1
+    seed = new_seed() if seed is None else seed
+    rng = derive_rng(seed, "career_sim")
+    seeds = [rng.getrandbits(32) for _ in range(players)]
+    chunk = max(1, math.ceil(players / (workers * 8)))
+
+    t0 = time.perf_counter()
+    careers = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_simulate_batch, seeds[i:i + chunk], hours, cost_scale, reward_scale)
+                   for i in range(0, players, chunk)]
+        for fut in as_completed(futures):
+            careers.extend(fut.result())
+            if progress: progress(len(careers), players)
+
+    return {
+        "levels": _percentiles(careers, "level_at"),
+        "tiers": _percentiles(careers, "tier_at"),
+        "careers": len(careers),
+        "sessions": float(np.mean([c['sessions'] for c in careers])),
+        "days": float(np.mean([c['days'] for c in careers])),
+        "stuck": sum(1 for c in careers if c['stuck_at'] is not None) / len(careers),
+        "elapsed": time.perf_counter() - t0,
+    }
+
+
+def _cell(value, width, limit=None):
+    """删失的分位数 (该比例的玩家在模拟期内没达成) 显示为 >limit；各玩家模拟的天数不同，天数列没有统一上限，显示 -"""
+    if math.isfinite(value): return f"{value:>{width}.1f}"
+    return f"{'>' + f'{limit:g}' if limit is not None else '-':>{width}}"
+
+
+def format_report(report, hours):
+    header = f"{'reached':>8} {'p10 h':>8} {'p50 h':>8} {'p90 h':>8} {'p50 d':>7}"
+
+    def row(name, frac, p10, p50, p90, days):
+        return (f"{name:<36} {frac * 100:>7.1f}% {_cell(p10, 8, hours)} {_cell(p50, 8, hours)} "
+                f"{_cell(p90, 8, hours)} {_cell(days, 7)}")
+
+    lines = [f"{report['careers']} careers, {hours}h of training each "
+             f"(avg {report['sessions']:.0f} sessions over {report['days']:.0f} days), {report['elapsed']:.1f}s",
+             f"{report['stuck'] * 100:.1f}% gave up on a mission they could not pass (it blocks new contracts)",
+             "Percentiles are over all players; '>N' means that share had not got there when the simulation ended.",
+             "",
+             f"{'LEVEL':<36} {header}"]
+    for lv, stats in report['levels'].items():
+        if lv == 0: continue
+        lines.append(row('Lv.' + str(lv), *stats))
+    lines += ["", f"{'GPU TIER':<36} {header}"]
+    for tier, stats in report['tiers'].items():
+        if tier == 0: continue
+        lines.append(row(HARDWARE[tier]['name'][:36], *stats))
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Career-scale Monte Carlo balance simulator")
+    parser.add_argument("--players", type=int, default=1000)
+    parser.add_argument("--hours", type=float, default=400, help="training hours simulated per player")
+    parser.add_argument("--cost-scale", type=float, default=1.0, help="multiplier on hardware.json costs")
+    parser.add_argument("--reward-scale", type=float, default=1.0, help="multiplier on coin rewards")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    report = run_simulation(args.players, args.hours, args.cost_scale, args.reward_scale, args.workers, args.seed,
+                            progress=lambda d, t: print(f"\r{d}/{t} careers", end="", flush=True))
+    print("\n" + format_report(report, args.hours))
@@ -12,6 +12,13 @@ BASE_DIR = os.path.dirname(MODULE_DIR)
 # ================= 下面的路径拼接保持不变 =================
 # 现在这些路径会自动拼接到根目录下
 SAVE_FILE = os.path.join(BASE_DIR, "./save/cyber_save.json")
+SAVE_DB_FILE = os.path.join(BASE_DIR, "./save/cyber_save.db")
+CHECKPOINT_DIR = os.path.join(BASE_DIR, "./save/checkpoints")
+TRACE_DIR = os.path.join(BASE_DIR, "./save/traces")
+DATASET_DIR = os.path.join(BASE_DIR, "./save/datasets")
+RUNS_DIR = os.path.join(BASE_DIR, "./save/runs")
+HISTORY_DIR = os.path.join(BASE_DIR, "./save/history")
+TRANSCRIPT_DIR = os.path.join(BASE_DIR, "./save/transcripts")
 HARDWARE_FILE = os.path.join(BASE_DIR, "./data/hardware.json")
 TASKS_FILE = os.path.join(BASE_DIR, "./data/tasks.json")
 WORKSPACE_DIR = os.path.join(BASE_DIR, "workspace")
@@ -21,6 +28,16 @@ WORKSPACE_DIR = os.path.join(BASE_DIR, "workspace")
 TARGET_SESSION_TIME = 40 * 60 
 # 收益系数 (每 1 TFLOPs 运算量的收益)
 REWARD_FACTOR = 0.05           
+# 训练断点写入间隔 (秒，按训练时钟计)
+CHECKPOINT_INTERVAL = 15
+# 同时占用虚拟 GPU 的训练任务上限，多出来的任务排队
+MAX_RUNNING_JOBS = 2
+# 存档写盘合并窗口 (秒)：窗口内的多次修改只写一次盘
+SAVE_COALESCE_SECS = 1.0
+# 终端文本框保留的行数，更早的输出压缩进 save/transcripts (用 scrollback 命令翻看)
+SCROLLBACK_LINES = 5000
+# 存档后端："json" (快照 + 变更日志) 或 "sqlite" (save/cyber_save.db，首次启用时自动迁移 JSON 存档)
+SAVE_BACKEND = "json"
 # =======================================================
 
 DEBUG_MODE = False
@@ -0,0 +1,266 @@
+# module/dataset_store.py
+# 本地数据集：把目录里的文本 / 图片分词后写成扁平的 np.memmap 分片 + 索引，
+# 训练时由后台预取线程按固定大小切 batch，数据量可以远大于内存。
+import json
+import os
+import queue
+import re
+import threading
+import time
+
+import numpy as np
+
+from .config import DATASET_DIR, TASKS_DATA
+
+# ===== 分词与格式 =====
+# 字节级分词：0~255 为原始字节 / 灰度像素，256 为文档分隔符
+VOCAB_SIZE = 257
+EOS_TOKEN = 256
+TOKEN_DTYPE = np.uint16
+SHARD_TOKENS = 32 * 1024 * 1024          # 单个分片 64MB
+READ_CHUNK = 1024 * 1024                 # 文本按 1MB 块流式读取
+
+TEXT_EXTS = {".txt", ".md", ".py", ".json", ".csv", ".html", ".xml", ".log", ".jsonl"}
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp"}
+IMAGE_SIZE = 64                          # 图片缩放到 64x64 灰度后逐像素成 token
+# 数据集名直接作为 DATASET_DIR 下的目录名：只允许字母数字开头的 [A-Za-z0-9_-]，不能带路径
+_NAME_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9_-]{0,63}")
+
+
+def check_name(name):
+    """名字不合法时抛出 ValueError (防止 '..'、'a/b' 之类的名字读写 DATASET_DIR 以外的文件)"""
+    if not _NAME_RE.fullmatch(name or ""):
+        raise ValueError(f"invalid dataset name '{name}' (letters, digits, '_' and '-' only)")
+
+
+def dataset_path(name):
+    check_name(name)
+    return os.path.join(DATASET_DIR, name)
+
+
+def _index_path(name):
+    return os.path.join(dataset_path(name), "index.json")
+
+
+def declared_datasets():
+    """tasks.json 里声明的数据集名"""
+    return list(TASKS_DATA.get('datasets', []))
+
+
+def _iter_files(source_dir):
+    for root, dirs, files in os.walk(source_dir):
+        dirs.sort()
+        for fn in sorted(files):
+            ext = os.path.splitext(fn)[1].lower()
+            if ext in TEXT_EXTS: yield os.path.join(root, fn), "text"
+            elif ext in IMAGE_EXTS: yield os.path.join(root, fn), "image"
+
+
+def _tokenize_file(path, kind):
+    """逐块产出一个文件的 token 数组 (不会一次读入整个文件)"""
+    if kind == "image":
+        from PIL import Image
+        img = Image.open(path).convert("L").resize((IMAGE_SIZE, IMAGE_SIZE))
+        yield np.asarray(img, dtype=np.uint8).ravel().astype(TOKEN_DTYPE)
+    else:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(READ_CHUNK)
+                if not chunk: break
+                yield np.frombuffer(chunk, dtype=np.uint8).astype(TOKEN_DTYPE)
+
+
+class _ShardWriter:
+    """把 token 流顺序写入固定容量的分片文件"""
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.shards = []
+        self.f = None
+        self.filled = 0
+
+    def _roll(self):
+        self.close()
+        name = f"shard_{len(self.shards):05d}.bin"
+        self.f = open(os.path.join(self.out_dir, name), 'wb')
+        self.shards.append({"file": name, "tokens": 0})
+        self.filled = 0
+
+    def write(self, tokens):
+        while len(tokens):
+            if self.f is None or self.filled >= SHARD_TOKENS: self._roll()
+            take = min(len(tokens), SHARD_TOKENS - self.filled)
+            self.f.write(tokens[:take].tobytes())
+            self.filled += take
+            self.shards[-1]['tokens'] += take
+            tokens = tokens[take:]
+
+    def close(self):
+        if self.f:
+            self.f.close()
+            self.f = None
+
+
+def build_dataset(name, source_dir, progress=None):
+    """
+    把 source_dir 下的文本 / 图片流式分词写入 save/datasets/<name>/。
+    progress(files_done, tokens_done): 可选进度回调
+    返回索引 dict；源目录没有可用文件时抛 ValueError
+    """
+    if not os.path.isdir(source_dir):
+        raise ValueError(f"{source_dir}: No such directory")
+    out_dir = dataset_path(name)
+    os.makedirs(out_dir, exist_ok=True)
+    for fn in os.listdir(out_dir):
+        if fn.startswith("shard_"): os.remove(os.path.join(out_dir, fn))
+
+    writer = _ShardWriter(out_dir)
+    eos = np.array([EOS_TOKEN], dtype=TOKEN_DTYPE)
+    n_docs = n_images = source_bytes = total = 0
+    try:
+        for path, kind in _iter_files(source_dir):
+            try:
+                for tokens in _tokenize_file(path, kind):
+                    writer.write(tokens)
+                    total += len(tokens)
+            except Exception:
+                continue  # 损坏的图片等直接跳过
+            writer.write(eos)
+            total += 1
+            n_docs += 1
+            if kind == "image": n_images += 1
+            source_bytes += os.path.getsize(path)
+            if progress: progress(n_docs, total)
+    finally:
+        writer.close()
+
+    if not n_docs:
+        raise ValueError(f"{source_dir}: no text or image files found")
+
+    index = {
+        "name": name,
+        "source": os.path.abspath(source_dir),
+        "vocab_size": VOCAB_SIZE,
+        "dtype": np.dtype(TOKEN_DTYPE).str,
+        "documents": n_docs,
+        "images": n_images,
+        "source_bytes": source_bytes,
+        "total_tokens": total,
+        "shards": writer.shards,
+        "created": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    tmp = _index_path(name) + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp, _index_path(name))
+    return index
+
+
+def load_index(name):
+    """返回数据集索引；未构建时返回 None"""
+    try:
+        with open(_index_path(name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def list_datasets():
+    """声明过的 + 已构建的数据集 -> [(name, index 或 None)]"""
+    names = declared_datasets()
+    if os.path.isdir(DATASET_DIR):
+        names += [n for n in sorted(os.listdir(DATASET_DIR)) if n not in names]
+    return [(n, load_index(n)) for n in names]
+
+
+def remove_dataset(name):
+    out_dir = dataset_path(name)
+    if not os.path.isdir(out_dir): return False
+    for fn in os.listdir(out_dir):
+        os.remove(os.path.join(out_dir, fn))
+    os.rmdir(out_dir)
+    return True
+
+
+class MemmapDataset:
+    """只读打开全部分片 (np.memmap)，按需由操作系统分页，不做整体拷贝"""
+    def __init__(self, name):
+        index = load_index(name)
+        if index is None:
+            raise ValueError(f"dataset '{name}' is not built")
+        self.name = name
+        self.index = index
+        self.vocab_size = index['vocab_size']
+        dtype = np.dtype(index['dtype'])
+        self.shards = [np.memmap(os.path.join(dataset_path(name), s['file']), dtype=dtype, mode='r',
+                                 shape=(s['tokens'],))
+                       for s in index['shards'] if s['tokens'] > 0]
+        self.sizes = np.array([len(s) for s in self.shards], dtype=np.int64)
+        self.itemsize = dtype.itemsize
+
+    def sample_batch(self, rng, batch_size, seq_len):
+        """随机取 batch_size 段长 seq_len+1 的连续 token，返回 (B, T+1) int64"""
+        span = seq_len + 1
+        usable = np.maximum(self.sizes - span, 0)
+        if not usable.any():
+            raise ValueError(f"dataset '{self.name}' is shorter than one sequence ({span} tokens)")
+        shard_ids = rng.choice(len(self.shards), size=batch_size, p=usable / usable.sum())
+        out = np.empty((batch_size, span), dtype=np.int64)
+        for i, sid in enumerate(shard_ids):
+            start = int(rng.integers(0, usable[sid] + 1))
+            out[i] = self.shards[sid][start:start + span]
+        return out
+
+
+class BatchPrefetcher:
+    """
+    后台线程提前准备 batch 放进有界队列，训练 step 只做一次 get()。
+    与 SyntheticCorpus 接口一致 (next_batch)，可直接作为 AttentionBackend 的 batch_source。
+    """
+    def __init__(self, dataset, batch_size, seq_len, rng, depth=4):
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.seq_len = seq_len
+        self.rng = rng
+        self.queue = queue.Queue(maxsize=depth)
+        self.stop_event = threading.Event()
+        self.tokens_served = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+
+    @property
+    def batch_tokens(self):
+        return self.batch_size * (self.seq_len + 1)
+
+    @property
+    def batch_bytes(self):
+        return self.batch_tokens * self.dataset.itemsize
+
+    def _worker(self):
+        try:
+            while not self.stop_event.is_set():
+                batch = self.dataset.sample_batch(self.rng, self.batch_size, self.seq_len)
+                while not self.stop_event.is_set():
+                    try:
+                        self.queue.put(batch, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+        except Exception as e:
+            self.error = e
+
+    def next_batch(self, batch_size=None, seq_len=None):
+        if (batch_size or self.batch_size) != self.batch_size or (seq_len or self.seq_len) != self.seq_len:
+            raise ValueError("prefetcher batch shape mismatch")
+        while True:
+            try:
+                batch = self.queue.get(timeout=0.1)
+                break
+            except queue.Empty:
+                if self.error: raise self.error
+        self.tokens_served += batch.size
+        return batch
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join(timeout=1.0)
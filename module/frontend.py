@@ -0,0 +1,134 @@
+# module/frontend.py
+# 前端无关的终端核心：渲染泵 (跨线程 UI 更新)、写缓冲、命令历史、提示符文本和业务钩子。
+# 具体前端负责真正的输出与输入：TUI.TerminalCore (customtkinter 窗口) / tty_frontend.TtyCore (普通终端)。
+# 前端需要提供: write / write_many / new_prompt / clear_screen / lock_input / after /
+#              progress / progress_end / screen_lines，以及 overlay (show / hide)。
+import collections
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 渲染泵：后台线程的 UI 更新进同一个队列，由主循环定时取出
+PUMP_INTERVAL_MS = 16       # 取队列的间隔
+FRAME_BUDGET = 0.008        # 每帧最多处理这么久 (秒)，剩下的留给下一帧，键盘事件不会被饿死
+FRAME_CHARS = 64 * 1024     # 每帧最多插入的字符数
+UI_QUEUE_MAX = 4096         # 队列上限：满了以后后台线程阻塞等待 (背压)
+
+
+class Frontend:
+    """各前端共用的部分。子类在自己的 __init__ 里调用 _setup_frontend()"""
+
+    def _setup_frontend(self, scrollback=None, transcript=None):
+        # 确定虚拟根目录 (用于显示 ~)
+        self.system_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.input_locked = False
+        self.command_history = []
+        self.history_index = 0
+        self._write_buffer = None   # buffered() 期间的 [(text, tag)]
+        self.scrollback = scrollback
+        self.transcript = transcript
+
+        self._ui_queue = collections.deque()
+        self._ui_cond = threading.Condition()
+        self._ui_latest = {}
+        self.after(PUMP_INTERVAL_MS, self._pump)
+
+    # ================= 写缓冲 =================
+
+    @contextmanager
+    def buffered(self):
+        """with term.buffered(): 块内的 write 只进缓冲，结束时 write_many 一次提交 (可嵌套)"""
+        if self._write_buffer is not None:
+            yield
+            return
+        self._write_buffer = []
+        try:
+            yield
+        finally:
+            self._flush_writes()
+            self._write_buffer = None
+
+    def _flush_writes(self):
+        """需要读取或改动已有输出之前，先把缓冲提交 (提示符、进度条等)"""
+        if not self._write_buffer: return
+        pieces, self._write_buffer = self._write_buffer, []
+        self.write_many(pieces)
+
+    # ================= 跨线程 API (后台线程调用，由渲染泵在主线程执行) =================
+
+    def post_write(self, text, tag=None):
+        """排队追加文本；同一 tag 的连续写入在一帧内合并成一次 insert"""
+        self._post(("write", text, tag))
+
+    def post_call(self, fn, *args):
+        """排队在主线程执行 fn(*args)，与 post_write 保持先后顺序"""
+        self._post(("call", fn, args))
+
+    def post_latest(self, key, fn, *args):
+        """同一 key 只保留最新的一次 (进度条等)，被覆盖的更新直接丢弃，不占队列"""
+        with self._ui_cond:
+            first = key not in self._ui_latest
+            self._ui_latest[key] = (fn, args)
+            if first: self._ui_queue.append(("latest", key))
+
+    def _post(self, item):
+        with self._ui_cond:
+            # 背压：队列满时后台线程等泵取走一部分 (主线程自己投递时不能等)
+            if threading.current_thread() is not threading.main_thread():
+                while len(self._ui_queue) >= UI_QUEUE_MAX:
+                    self._ui_cond.wait(0.1)
+            self._ui_queue.append(item)
+
+    def _pump(self):
+        start = time.perf_counter()
+        chars = 0
+        try:
+            # 一帧内的写入与 post_call 一起放进 buffered()：整帧最多一次 insert
+            with self.buffered():
+                while chars < FRAME_CHARS and time.perf_counter() - start < FRAME_BUDGET:
+                    with self._ui_cond:
+                        if not self._ui_queue: break
+                        item = self._ui_queue.popleft()
+                        if item[0] == "latest": item = ("call",) + self._ui_latest.pop(item[1])
+                        if len(self._ui_queue) < UI_QUEUE_MAX: self._ui_cond.notify_all()
+                    if item[0] == "write":
+                        self.write(item[1], item[2])
+                        chars += len(item[1])
+                    else:
+                        item[1](*item[2])
+        finally:
+            self.after(PUMP_INTERVAL_MS, self._pump)
+
+    # ================= 输入 / 提示符 =================
+
+    def _prompt_text(self):
+        cwd = os.getcwd()
+        if cwd == self.system_root: path_str = "~"
+        elif cwd.startswith(self.system_root):
+            path_str = f"~/{os.path.relpath(cwd, self.system_root)}".replace("\\", "/")
+        else: path_str = cwd
+        return f"[root@node-01 {path_str}]# "
+
+    def _submit(self, user_input):
+        """前端收到一行输入 (已去掉首尾空白)：记历史，再交给 on_user_input"""
+        if user_input:
+            self.command_history.append(user_input)
+            self.history_index = len(self.command_history)
+        # 同步输出 (表格、列表) 在命令结束时一次提交
+        with self.buffered():
+            self.on_user_input(user_input)
+
+    # ================= 业务逻辑钩子 (需在 main.py 重写) =================
+
+    def on_user_input(self, input_str):
+        """当用户按下回车时调用此方法"""
+        pass
+
+    def on_suspend(self):
+        """当用户按下 Ctrl-Z 时调用 (即使输入已锁定)"""
+        pass
+
+    def on_interrupt(self):
+        """当用户按下 Ctrl-C 时调用，返回 True 表示已处理 (否则保留复制功能)"""
+        return False
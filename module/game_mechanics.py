@@ -1,4 +1,17 @@
 # module/game_mechanics.py
+from .state_types import Inventory
+
+# 非任务训练的固定奖励 (main.py 结算与 career_sim 共用)
+FREE_TRAIN_REWARDS = [
+    {"type": "coin", "val": 10}, # 基础值
+    {"type": "exp", "val": 20}
+]
+# 失败安慰奖
+FAILURE_REWARDS = [{"type": "exp", "val": 10}]
+
+# 升级所需经验：(当前等级 + 1)^2 * 100
+def exp_to_next_level(level):
+    return ((level + 1) ** 2) * 100
 
 class RewardManager:
     def __init__(self, terminal_ref):
@@ -30,19 +43,21 @@ class RewardManager:
 
         self.term.write("\n[SYSTEM] Processing Rewards...\n", "system")
         
-        for reward in reward_list:
-            r_type = reward.get('type')
-            r_val = reward.get('val')
-            
-            if r_type in self.handlers:
-                # 执行对应的处理函数
-                handler = self.handlers[r_type]
-                handler(r_val, multiplier)
-            else:
-                self.term.write(f"  [ERR] Unknown reward type: {r_type}\n", "error")
+        # 一次结算内的多项修改对其他线程原子可见，订阅者只收到一次通知
+        with self.term.data.batch():
+            for reward in reward_list:
+                r_type = reward.get('type')
+                r_val = reward.get('val')
+                
+                if r_type in self.handlers:
+                    # 执行对应的处理函数
+                    handler = self.handlers[r_type]
+                    handler(r_val, multiplier)
+                else:
+                    self.term.write(f"  [ERR] Unknown reward type: {r_type}\n", "error")
 
-        # 统一处理升级检查 (不再写死在 train.py)
-        self._check_level_up()
+            # 统一处理升级检查 (不再写死在 train.py)
+            self._check_level_up()
 
     # --- 具体实现 ---
 
@@ -63,17 +78,16 @@ class RewardManager:
         self.term.write(f"  > [HARDWARE] GPU upgraded to Level {target_level}!\n", "warn")
 
     def _add_item(self, item_id, _):
-        # 示例：添加到背包
-        inventory = self.term.data.get('inventory', [])
-        inventory.append(item_id)
-        self.term.data['inventory'] = inventory
+        # 背包按物品计数，重复获得只增加数量
+        self.term.data.setdefault('inventory', Inventory()).add(item_id)
+        self.term.data.touch('inventory')
         self.term.write(f"  > Item acquired: {item_id}\n", "system")
 
     def _check_level_up(self):
         # 从 train.py 移出来的升级逻辑
         while True:
             current_lv = self.term.data.get('level', 1)
-            req_exp = ((current_lv+1)**2) * 100
+            req_exp = exp_to_next_level(current_lv)
             current_exp = self.term.data.get('Exp', 0)
             
             if current_exp >= req_exp:
@@ -0,0 +1,140 @@
+# module/game_state.py
+# 存档状态：仍然是 dict (现有 data['x'] / data.get 代码不用改)，但写操作加锁、记录脏字段并通知订阅者。
+# 训练线程在会话开始时取 snapshot()，不再与 Tk 线程交替读写同一个 dict。
+import copy
+import threading
+from contextlib import contextmanager
+
+from .state_types import to_plain
+
+
+class GameState(dict):
+    """
+    线程安全的存档 dict。
+    - 顶层字段的赋值 / 删除自动记为脏字段并通知订阅者；
+      嵌套对象 (收件箱、IdSet、Inventory ...) 原地修改后调用 touch(key)。
+    - take_dirty() 取走自上次以来改过的字段，写盘只序列化这些字段。
+    - batch() 内的多次修改原子可见 (snapshot 看不到一半的状态)，结束时合并成一次通知。
+    订阅回调在修改所在的线程里执行，需要碰 Tk 的订阅者自己切回主线程 (如 TerminalCore.post_call)。
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.RLock()
+        self._dirty = set()
+        self._subscribers = []      # [(keys 集合或 None, callback)]
+        self._batch_depth = 0
+        self._batch_keys = set()
+
+    # ===== 订阅 =====
+
+    def subscribe(self, callback, keys=None):
+        """callback(changed_keys)；keys 为 None 时订阅全部字段。返回取消订阅的函数"""
+        entry = (frozenset(keys) if keys is not None else None, callback)
+        self._subscribers.append(entry)
+        return lambda: self._subscribers.remove(entry)
+
+    def _changed(self, keys):
+        with self.lock:
+            self._dirty.update(keys)
+            if self._batch_depth:
+                self._batch_keys.update(keys)
+                return
+        self._notify(keys)
+
+    def _notify(self, keys):
+        for wanted, callback in list(self._subscribers):
+            hit = keys if wanted is None else keys & wanted
+            if hit: callback(set(hit))
+
+    @contextmanager
+    def batch(self):
+        keys = set()
+        try:
+            with self.lock:
+                self._batch_depth += 1
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                    if not self._batch_depth: keys, self._batch_keys = self._batch_keys, set()
+        finally:
+            if keys: self._notify(keys)
+
+    # ===== 脏字段 / 快照 =====
+
+    def touch(self, *keys):
+        """嵌套对象原地修改后调用"""
+        self._changed(set(keys))
+
+    def take_dirty(self):
+        with self.lock:
+            dirty, self._dirty = self._dirty, set()
+            return dirty
+
+    def mark_dirty(self, keys):
+        """写盘失败时把字段放回脏集合 (不通知订阅者)"""
+        with self.lock:
+            self._dirty.update(keys)
+
+    def snapshot(self, keys=None, plain=False):
+        """
+        一致的深拷贝 (嵌套的收件箱、IdSet 等也在锁内复制，之后与原数据互不影响)；
+        keys 给定时只取这些字段 (不存在的字段不出现在结果里)。
+        plain=True 时容器转成 JSON 形式，写盘线程拿到后在锁外序列化。
+        """
+        with self.lock:
+            items = dict(self) if keys is None else \
+                {k: dict.__getitem__(self, k) for k in keys if dict.__contains__(self, k)}
+            if plain: return {k: copy.deepcopy(to_plain(v)) for k, v in items.items()}
+            return copy.deepcopy(items)
+
+    # ===== dict 写操作 =====
+
+    def __setitem__(self, key, value):
+        with self.lock:
+            super().__setitem__(key, value)
+        self._changed({key})
+
+    def __delitem__(self, key):
+        with self.lock:
+            super().__delitem__(key)
+        self._changed({key})
+
+    def pop(self, key, *default):
+        with self.lock:
+            had = key in self
+            value = super().pop(key, *default)
+        if had: self._changed({key})
+        return value
+
+    def setdefault(self, key, default=None):
+        with self.lock:
+            if key in self: return dict.__getitem__(self, key)
+            super().__setitem__(key, default)
+        self._changed({key})
+        return default
+
+    def update(self, *args, **kwargs):
+        changes = dict(*args, **kwargs)
+        with self.lock:
+            super().update(changes)
+        if changes: self._changed(set(changes))
+
+    def clear(self):
+        with self.lock:
+            keys = set(self)
+            super().clear()
+        if keys: self._changed(keys)
+
+
+def snapshot(data):
+    """训练线程用：GameState 取一致快照，普通 dict 直接深拷贝"""
+    return data.snapshot() if isinstance(data, GameState) else copy.deepcopy(dict(data))
+
+
+def plain_snapshot(data, keys=None):
+    """写盘用：字段的 JSON 形式深拷贝 (GameState 在锁内取)；keys 为 None 时取全部字段"""
+    if isinstance(data, GameState): return data.snapshot(keys, plain=True)
+    items = dict(list(data.items()))
+    if keys is not None: items = {k: items[k] for k in keys if k in items}
+    return {k: copy.deepcopy(to_plain(v)) for k, v in items.items()}
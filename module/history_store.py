@@ -0,0 +1,200 @@
+# module/history_store.py
+# 训练历史：每个会话追加一行到列式存储 (每列一个定长二进制文件)，
+# 同时增量维护按天汇总的 rollup 与按模型汇总，stats 查询只读汇总，不扫描全表。
+import datetime
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from .config import HISTORY_DIR
+
+# 列名 -> dtype (小端定长)，一行 = 每列各一个元素
+COLUMNS = {
+    "ts": "<f8",          # 结束时间 (unix 秒)
+    "model": "<u2",       # 模型编号，见 meta.json 的 models 表
+    "epochs": "<u4",
+    "lr": "<f4",
+    "minutes": "<f4",     # 实际训练时长
+    "accuracy": "<f4",
+    "flags": "u1",        # 见 FLAG_*
+    "violations": "<u2",
+}
+FLAG_SUCCESS = 1
+FLAG_MISSION = 2
+FLAG_CRASHED = 4
+FLAG_KILLED = 8
+
+# 按天汇总：day_index = 日期序数 - meta['day0']，每天一条定长记录，可原地更新
+# sessions, successes, minutes, accuracy_sum, violations
+_DAY_RECORD = struct.Struct("<IIddI")
+DAY_FIELDS = ("sessions", "successes", "minutes", "accuracy_sum", "violations")
+
+
+def _day_ordinal(ts):
+    return datetime.date.fromtimestamp(ts).toordinal()
+
+
+class HistoryStore:
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        self.meta_path = os.path.join(root, "meta.json")
+        self.daily_path = os.path.join(root, "daily.bin")
+        self.meta = {"models": [], "day0": None, "per_model": {}, "rows": 0}
+        if os.path.exists(self.meta_path):
+            try:
+                with open(self.meta_path, 'r', encoding='utf-8') as f:
+                    self.meta.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+        self._repair()
+
+    def _col_path(self, name):
+        return os.path.join(self.root, f"{name}.col")
+
+    def _repair(self):
+        """
+        崩溃在两次列写入之间时，各列长度可能不一致：截断到 meta 记录的行数；
+        崩溃在改写 daily.bin 之后、meta 提交之前时，按 meta['rollup'] 把那一天的记录恢复原值
+        """
+        pending = self.meta.pop('rollup', None)
+        if pending and os.path.exists(self.daily_path):
+            with open(self.daily_path, 'r+b') as f:
+                if pending['prev'] is not None:
+                    f.seek(pending['idx'] * _DAY_RECORD.size)
+                    f.write(_DAY_RECORD.pack(*pending['prev']))
+                f.truncate(pending['size'])
+            self._save_meta()
+        rows = self.meta['rows']
+        for name, dtype in COLUMNS.items():
+            path = self._col_path(name)
+            size = rows * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, 'r+b') as f: f.truncate(size)
+
+    def _save_meta(self):
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, ensure_ascii=False)
+        os.replace(tmp, self.meta_path)
+
+    # ===== 写入 =====
+
+    def append(self, model, epochs, learning_rate, minutes, accuracy, success=False, is_mission=False,
+               crashed=False, killed=False, violations=0, ts=None):
+        ts = time.time() if ts is None else ts
+        os.makedirs(self.root, exist_ok=True)
+
+        models = self.meta['models']
+        if model not in models: models.append(model)
+        flags = ((FLAG_SUCCESS if success else 0) | (FLAG_MISSION if is_mission else 0)
+                 | (FLAG_CRASHED if crashed else 0) | (FLAG_KILLED if killed else 0))
+        row = {"ts": ts, "model": models.index(model), "epochs": epochs, "lr": learning_rate,
+               "minutes": minutes, "accuracy": accuracy, "flags": flags, "violations": violations}
+        for name, dtype in COLUMNS.items():
+            with open(self._col_path(name), 'ab') as f:
+                f.write(np.array([row[name]], dtype=dtype).tobytes())
+
+        self._update_day(ts, success, minutes, accuracy, violations)
+        # rows 加一与清掉 rollup 在同一次 meta 写入里提交：之前崩溃则整行 (含当天汇总) 回滚
+        self.meta.pop('rollup', None)
+        stat = self.meta['per_model'].setdefault(model, {"sessions": 0, "successes": 0, "minutes": 0.0,
+                                                         "accuracy_sum": 0.0, "best": 0.0})
+        stat['sessions'] += 1
+        stat['successes'] += 1 if success else 0
+        stat['minutes'] += minutes
+        stat['accuracy_sum'] += accuracy
+        stat['best'] = max(stat['best'], accuracy)
+        self.meta['rows'] += 1
+        self._save_meta()
+
+    def _update_day(self, ts, success, minutes, accuracy, violations):
+        day = _day_ordinal(ts)
+        if self.meta['day0'] is None: self.meta['day0'] = day
+        idx = day - self.meta['day0']
+        if idx < 0: return     # 系统时钟回拨：只记原始行，不进汇总
+        size = _DAY_RECORD.size
+        mode = 'r+b' if os.path.exists(self.daily_path) else 'w+b'
+        with open(self.daily_path, mode) as f:
+            f.seek(0, os.SEEK_END)
+            old_size = f.tell()
+            have = old_size // size
+            prev = None
+            if idx < have:
+                f.seek(idx * size)
+                prev = list(_DAY_RECORD.unpack(f.read(size)))
+            # 先把改写前的状态记进 meta 落盘，_repair 据此回滚
+            self.meta['rollup'] = {"idx": idx, "prev": prev, "size": old_size}
+            self._save_meta()
+            if idx >= have:
+                f.seek(0, os.SEEK_END)
+                f.write(b"\0" * size * (idx + 1 - have))   # 中间没玩的日子补零
+            f.seek(idx * size)
+            rec = list(_DAY_RECORD.unpack(f.read(size)))
+            rec[0] += 1
+            rec[1] += 1 if success else 0
+            rec[2] += minutes
+            rec[3] += accuracy
+            rec[4] += violations
+            f.seek(idx * size)
+            f.write(_DAY_RECORD.pack(*rec))
+
+    # ===== 查询 =====
+
+    def __len__(self):
+        return self.meta['rows']
+
+    def columns(self):
+        """全部行的列数组 (只读 memmap)，用于临时分析"""
+        out = {}
+        for name, dtype in COLUMNS.items():
+            path = self._col_path(name)
+            if not self.meta['rows'] or not os.path.exists(path):
+                out[name] = np.zeros(0, dtype=dtype)
+            else:
+                out[name] = np.memmap(path, dtype=dtype, mode='r', shape=(self.meta['rows'],))
+        return out
+
+    def _read_days(self, first_day, last_day):
+        """[first_day, last_day] (日期序数，含两端) 的逐日记录，缺失的日子为全零"""
+        n = last_day - first_day + 1
+        records = [(0, 0, 0.0, 0.0, 0)] * max(n, 0)
+        day0 = self.meta['day0']
+        if n <= 0 or day0 is None or not os.path.exists(self.daily_path): return records
+        lo, hi = max(first_day - day0, 0), last_day - day0
+        if hi < lo: return records
+        size = _DAY_RECORD.size
+        with open(self.daily_path, 'rb') as f:
+            f.seek(lo * size)
+            raw = f.read((hi - lo + 1) * size)
+        offset = lo + day0 - first_day
+        for i, rec in enumerate(_DAY_RECORD.iter_unpack(raw[:len(raw) // size * size])):
+            records[offset + i] = rec
+        return records
+
+    def day_range(self, first_day, last_day):
+        """[first_day, last_day] 的汇总，只读取这些天的记录"""
+        total = dict.fromkeys(DAY_FIELDS, 0)
+        for rec in self._read_days(first_day, last_day):
+            for k, v in zip(DAY_FIELDS, rec): total[k] += v
+        return total
+
+    def last_days(self, n, now=None):
+        """最近 n 天 (含今天) 的汇总"""
+        today = _day_ordinal(time.time() if now is None else now)
+        return self.day_range(today - n + 1, today)
+
+    def this_week(self, now=None):
+        """本周 (周一至今天) 的汇总"""
+        today = datetime.date.fromtimestamp(time.time() if now is None else now)
+        return self.day_range(today.toordinal() - today.weekday(), today.toordinal())
+
+    def daily_series(self, n, now=None):
+        """最近 n 天每天的训练分钟数，最早的在前"""
+        today = _day_ordinal(time.time() if now is None else now)
+        return [rec[2] for rec in self._read_days(today - n + 1, today)]
+
+    def per_model(self):
+        return self.meta['per_model']
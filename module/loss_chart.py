@@ -0,0 +1,116 @@
+# module/loss_chart.py
+# 终端 Loss 曲线：LTTB (Largest-Triangle-Three-Buckets) 降采样 + 盲文点阵 / 火花线渲染。
+# 降采样后点数只取决于图宽，绘制成本与会话步数无关。
+import numpy as np
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+# 盲文字符的点位：_BRAILLE_BITS[dy][dx]，一个字符 2 列 x 4 行
+_BRAILLE_BITS = ((0x01, 0x08), (0x02, 0x10), (0x04, 0x20), (0x40, 0x80))
+
+
+def lttb(y, n_out, x=None):
+    """
+    把 (x, y) 降采样到至多 n_out 个点，保留视觉上的峰谷。
+    首尾点固定，中间每个桶选出与「上一个选中点、下一个桶均值」构成三角形面积最大的点。
+    传入 x 时按 x 等宽分桶 (点距不均匀时空桶跳过)，否则按下标等分。
+    返回 (x, y) 两个数组
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    by_x = x is not None
+    x = np.asarray(x, dtype=np.float64) if by_x else np.arange(n, dtype=np.float64)
+    if n_out >= n or n <= 2: return x, y
+    if n_out < 3:
+        idx = np.linspace(0, n - 1, max(n_out, 1)).astype(int)
+        return x[idx], y[idx]
+
+    if by_x:
+        edges = np.searchsorted(x, np.linspace(x[0], x[-1], n_out - 1), side='left')
+        edges = np.clip(edges, 1, n - 1)
+        edges[0], edges[-1] = 1, n - 1
+    else:
+        edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    idx = [0]
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if hi <= lo: continue
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        if nhi <= nlo: nlo, nhi = n - 1, n
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        idx.append(a)
+    idx.append(n - 1)
+    return x[idx], y[idx]
+
+
+def sparkline(values, width):
+    """单行火花线 (LTTB 降采样到 width 个字符)"""
+    if len(values) == 0: return ""
+    _, y = lttb(values, width)
+    lo, hi = y.min(), y.max()
+    if hi - lo < 1e-12: return SPARK_CHARS[0] * len(y)
+    levels = ((y - lo) / (hi - lo) * (len(SPARK_CHARS) - 1)).round().astype(int)
+    return "".join(SPARK_CHARS[i] for i in levels)
+
+
+def braille_chart(values, width=60, height=6, label="loss"):
+    """
+    多行盲文点阵折线图 (width x height 个字符 = 2*width x 4*height 个点)。
+    返回字符串列表，左侧带 y 轴刻度，最后一行是 x 轴 (step)。
+    """
+    n = len(values)
+    if n == 0: return []
+    xs, ys = lttb(values, width * 2)
+    lo, hi = float(ys.min()), float(ys.max())
+    span = hi - lo if hi - lo > 1e-12 else 1.0
+    px_w, px_h = width * 2, height * 4
+
+    grid = [[0] * width for _ in range(height)]
+    def dot(px, py):
+        grid[py // 4][px // 2] |= _BRAILLE_BITS[py % 4][px % 2]
+
+    cols = (xs / max(n - 1, 1) * (px_w - 1)).round().astype(int)
+    rows = ((hi - ys) / span * (px_h - 1)).round().astype(int)
+    prev = None
+    for px, py in zip(cols, rows):
+        # 相邻点之间补竖线，陡降段也连续
+        if prev is not None and prev[0] <= px:
+            for yy in range(min(prev[1], py), max(prev[1], py) + 1): dot(px, yy)
+        dot(px, py)
+        prev = (px, py)
+
+    lines = []
+    for r in range(height):
+        if r == 0: axis = f"{hi:>9.4f} ┤"
+        elif r == height - 1: axis = f"{lo:>9.4f} ┤"
+        else: axis = " " * 9 + " │"
+        lines.append(axis + "".join(chr(0x2800 + b) for b in grid[r]))
+    lines.append(" " * 10 + "└" + "─" * width)
+    lines.append(" " * 11 + f"{label} (step 1..{n})".ljust(width))
+    return lines
+
+
+class LossHistory:
+    """
+    训练中增量记录 Loss：缓冲超过 2*capacity 点时用 LTTB 压回 capacity 点，
+    追加是均摊 O(1)，渲染成本只与 capacity 有关。
+    """
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.x = []
+        self.y = []
+
+    def append(self, step, loss):
+        self.x.append(step)
+        self.y.append(loss)
+        if len(self.y) > 2 * self.capacity:
+            x, y = lttb(self.y, self.capacity, self.x)
+            self.x, self.y = x.tolist(), y.tolist()
+
+    def sparkline(self, width):
+        if not self.y: return ""
+        _, y = lttb(self.y, width, self.x)
+        return sparkline(y, width)
@@ -1,10 +1,11 @@
 import json
 import os
-import random
-import uuid
 import datetime
 import time  # [新增] 引入 time 模块用于处理时间戳
 
+from .rng import next_stream
+from .state_types import IdSet
+
 class MissionGenerator:
     def __init__(self):
         self.fixed_emails = self._load_fixed_emails()
@@ -25,13 +26,14 @@ class MissionGenerator:
             with open(path, 'r', encoding='utf-8') as f: return json.load(f)
         except: return []
 
-    def fetch_new_emails(self, game_data):
+    def fetch_new_emails(self, game_data, now=None):
         """
         核心逻辑：根据玩家状态决定生成什么邮件
+        now: 当前时间戳 (默认 time.time()，模拟器传入虚拟时间)
         """
         player_level = game_data.get('level', 1)
         current_gpu_level = game_data.get('gpu_level', 0)
-        history = set(game_data.get('received_mail_ids', []))
+        history = IdSet.from_json(game_data.get('received_mail_ids'))
         
         new_batch = []
 
@@ -65,7 +67,7 @@ class MissionGenerator:
         
         # 获取上次生成时间 (如果不存在则为0)
         last_gen_time = game_data.get('last_random_mission_time', 0)
-        current_time = time.time()
+        current_time = time.time() if now is None else now
         
         # 设定冷却时间：12小时 (秒)
         # 调试建议：测试时可以将 12*3600 改为 10 (10秒) 以便快速验证
@@ -74,11 +76,14 @@ class MissionGenerator:
         # 只有当 (当前时间 - 上次时间 >= 12小时) 且没有正在处理的剧情邮件时才生成
         if (current_time - last_gen_time >= cooldown) and player_level >= 1:
             
+            # 本次生成使用存档种子派生的独立随机流 (可复现)
+            rng = next_stream(game_data, "mission")
+
             # 随机生成 1 到 2 个任务
-            mission_count = random.randint(1, 2)
+            mission_count = rng.randint(1, 2)
             
             for _ in range(mission_count):
-                random_mail = self._generate_random_email(player_level, current_gpu_level)
+                random_mail = self._generate_random_email(player_level, current_gpu_level, rng)
                 new_batch.append(random_mail)
             
             # [关键] 更新生成时间戳并记录到 game_data
@@ -110,16 +115,16 @@ class MissionGenerator:
         }
         }
 
-    def _generate_random_email(self, player_level, gpu_level):
-        """随机生成逻辑 (根据显卡等级区分待遇)"""
+    def _generate_random_email(self, player_level, gpu_level, rng):
+        """随机生成逻辑 (根据显卡等级区分待遇)，rng 为本次生成的随机流"""
         
         # --- 根据 GPU 等级决定发件人和奖励 ---
         if gpu_level < 4:
             # === 导师带教阶段 (Level < 4) ===
             sender_name = "Professor"
             sender_email = "lab_director@university.edu"
-            mission_flavor = random.choice(["Commercial", "Tutorial"])
-            topic = random.choice(self.professor_topics)
+            mission_flavor = rng.choice(["Commercial", "Tutorial"])
+            topic = rng.choice(self.professor_topics)
             
             if mission_flavor == "Commercial":
                 subject = f"Assigment: External Request ({topic})"
@@ -134,21 +139,21 @@ class MissionGenerator:
             
         else:
             # === 独立接单阶段 (Level >= 4) ===
-            choice = random.choice(self.external_senders)
+            choice = rng.choice(self.external_senders)
             sender_name = choice
             sender_email = f"auto@{choice.lower()}.net"
-            topic = random.choice(self.external_topics)
+            topic = rng.choice(self.external_topics)
             
-            subject = f"Contract: {topic} v.{random.randint(1,9)}"
+            subject = f"Contract: {topic} v.{rng.randint(1,9)}"
             body = "System generated request.\nPerform the attached task for standard credits."
             
             reward_coin = 40
             reward_exp_mult = 1.0
 
         # --- 通用数值计算 ---
-        difficulty = max(1, player_level + random.randint(-1, 1))
+        difficulty = max(1, player_level + rng.randint(-1, 1))
         base_ops = 100 * (1.2 ** difficulty)
-        rnd_id = f"rnd_{str(uuid.uuid4())[:6]}"
+        rnd_id = f"rnd_{rng.getrandbits(24):06x}"
         rewards_list = [
             {"type": "exp", "val": int(80 * difficulty * reward_exp_mult)},
             {"type": "coin", "val": int(reward_coin * difficulty)}
@@ -166,7 +171,10 @@ class MissionGenerator:
                 "name": f"Task: {topic}",
                 "base_ops": int(base_ops),
                 "difficulty": difficulty,
-                "requirements": { ... },
+                "requirements": {
+                    "min_epochs": 5 + difficulty,
+                    "target_acc": 60 + (difficulty * 2)
+                },
                 "instant_action": False, # 需要训练
                 "rewards": rewards_list # 使用列表替代原来的 dict
             }
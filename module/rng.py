@@ -0,0 +1,34 @@
+# module/rng.py
+import random
+import secrets
+
+import numpy as np
+
+def new_seed():
+    """生成一个新的 32 位会话种子"""
+    return secrets.randbits(32)
+
+def derive_rng(seed, *labels):
+    """
+    从一个种子派生出独立的随机流。
+    labels 用于区分用途 (例如 "validation" / "mission")，相同的 seed + labels 永远得到相同序列。
+    """
+    return random.Random(":".join([str(seed)] + [str(l) for l in labels]))
+
+def derive_np_rng(seed, *labels):
+    """同 derive_rng，但返回 NumPy Generator (用于向量化生成)"""
+    entropy = derive_rng(seed, *labels).getrandbits(128)
+    return np.random.default_rng(entropy)
+
+def next_stream(game_data, name):
+    """
+    存档级随机流：种子记录在存档里，每调用一次序号 +1。
+    读档后可以按 (种子, 序号) 复现任何一次生成结果。
+    """
+    seed_key = f"{name}_seed"
+    counter_key = f"{name}_counter"
+    if game_data.get(seed_key) is None:
+        game_data[seed_key] = new_seed()
+    counter = game_data.get(counter_key, 0)
+    game_data[counter_key] = counter + 1
+    return derive_rng(game_data[seed_key], name, counter)
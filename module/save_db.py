@@ -0,0 +1,164 @@
+# module/save_db.py
+# SQLite 存档后端 (WAL)：标量字段存 kv 表，随游戏时长增长的字段 (收件 ID、完成任务、背包、收件箱)
+# 各自建表并带索引。保存时按表做差分，只写变化的行，一次保存一个事务。
+import json
+import sqlite3
+import threading
+
+from .game_state import plain_snapshot
+from .state_types import IdSet, Inventory
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS received_mails (id TEXT PRIMARY KEY, seq INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS completed_missions (id TEXT PRIMARY KEY, seq INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS inventory (item TEXT PRIMARY KEY, count INTEGER NOT NULL, seq INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS inbox (id TEXT PRIMARY KEY, seq INTEGER NOT NULL, read INTEGER NOT NULL,
+                                  type TEXT, mail TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS received_mails_seq ON received_mails (seq);
+CREATE INDEX IF NOT EXISTS completed_missions_seq ON completed_missions (seq);
+CREATE INDEX IF NOT EXISTS inbox_seq ON inbox (seq);
+"""
+
+# 存档字段 -> 表 (有序 ID 列表)
+ID_TABLES = {"received_mail_ids": "received_mails", "completed_mission_ids": "completed_missions"}
+TABLE_FIELDS = set(ID_TABLES) | {"inventory", "inbox"}
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, sort_keys=True)
+
+
+class SaveDB:
+    """
+    一个存档一个数据库文件。load() 读出与 JSON 存档相同形状的 dict，
+    save(data) 与上次落盘的状态做差分后只写变化的行。可在后台写盘线程里调用。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # 已落盘状态，用于差分
+        self._kv = {}
+        self._ids = {field: set() for field in ID_TABLES}
+        self._inventory = {}
+        self._inbox = {}
+        self._seq = 0
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    def is_empty(self):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM kv LIMIT 1").fetchone() is None
+
+    # ===== 读取 =====
+
+    def load(self):
+        with self.lock:
+            return self._load()
+
+    def _load(self):
+        cur = self.conn
+        data = {}
+        self._kv, self._inventory, self._inbox = {}, {}, {}
+        for key, value in cur.execute("SELECT key, value FROM kv"):
+            self._kv[key] = value
+            data[key] = json.loads(value)
+
+        for field, table in ID_TABLES.items():
+            ids = [row[0] for row in cur.execute(f"SELECT id FROM {table} ORDER BY seq")]
+            self._ids[field] = set(ids)
+            if ids: data[field] = ids
+
+        for item, count in cur.execute("SELECT item, count FROM inventory ORDER BY seq"):
+            self._inventory[item] = count
+        if self._inventory: data['inventory'] = dict(self._inventory)
+
+        inbox = []
+        for mail_id, text in cur.execute("SELECT id, mail FROM inbox ORDER BY seq"):
+            self._inbox[mail_id] = text
+            inbox.append(json.loads(text))
+        if inbox: data['inbox'] = inbox
+
+        self._seq = max([0] + [cur.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {t}").fetchone()[0]
+                               for t in list(ID_TABLES.values()) + ["inventory", "inbox"]])
+        return data
+
+    # ===== 写入 =====
+
+    def save(self, data, keys=None):
+        """keys: 只写这些字段 (GameState 的脏字段)；None 表示与上次落盘的状态做完整差分"""
+        with self.lock:
+            items = plain_snapshot(data, keys)
+            try:
+                with self.conn:     # 一次保存一个事务
+                    self._save_kv(items, keys)
+                    for field, table in ID_TABLES.items():
+                        if keys is None or field in keys:
+                            self._save_ids(table, self._ids[field], IdSet.from_json(items.get(field)))
+                    if keys is None or 'inventory' in keys:
+                        self._save_inventory(Inventory.from_json(items.get('inventory')).to_json())
+                    if keys is None or 'inbox' in keys:
+                        self._save_inbox(items.get('inbox') or [])
+            except Exception:
+                # 事务已回滚，差分基准按库里的实际内容重建
+                self._load()
+                raise
+
+    def _next_seq(self):
+        self._seq += 1
+        return self._seq
+
+    def _save_kv(self, items, keys=None):
+        current = {k: _dumps(v) for k, v in items.items() if k not in TABLE_FIELDS}
+        changed = [(k, text) for k, text in current.items() if self._kv.get(k) != text]
+        scope = self._kv if keys is None else keys
+        removed = [(k,) for k in scope if k in self._kv and k not in current]
+        if changed: self.conn.executemany("INSERT OR REPLACE INTO kv (key, value) VALUES (?, ?)", changed)
+        if removed: self.conn.executemany("DELETE FROM kv WHERE key = ?", removed)
+        for (k,) in removed: del self._kv[k]
+        self._kv.update(current)
+
+    def _save_ids(self, table, persisted, ids):
+        current = set(ids)
+        added = [i for i in ids if i not in persisted]
+        removed = persisted - current
+        if added:
+            self.conn.executemany(f"INSERT OR IGNORE INTO {table} (id, seq) VALUES (?, ?)",
+                                  [(i, self._next_seq()) for i in added])
+        if removed:
+            self.conn.executemany(f"DELETE FROM {table} WHERE id = ?", [(i,) for i in removed])
+        persisted.clear()
+        persisted.update(current)
+
+    def _save_inventory(self, counts):
+        for item, count in counts.items():
+            old = self._inventory.get(item)
+            if old is None:
+                self.conn.execute("INSERT INTO inventory (item, count, seq) VALUES (?, ?, ?)",
+                                  (item, count, self._next_seq()))
+            elif old != count:
+                self.conn.execute("UPDATE inventory SET count = ? WHERE item = ?", (count, item))
+        removed = [(item,) for item in self._inventory if item not in counts]
+        if removed: self.conn.executemany("DELETE FROM inventory WHERE item = ?", removed)
+        self._inventory = counts
+
+    def _save_inbox(self, inbox):
+        current = {}
+        for mail in inbox:
+            text = _dumps(mail)
+            current[mail['id']] = text
+            if mail['id'] not in self._inbox:
+                self.conn.execute("INSERT INTO inbox (id, seq, read, type, mail) VALUES (?, ?, ?, ?, ?)",
+                                  (mail['id'], self._next_seq(), int(bool(mail.get('read'))), mail.get('type'), text))
+            elif self._inbox[mail['id']] != text:
+                self.conn.execute("UPDATE inbox SET read = ?, type = ?, mail = ? WHERE id = ?",
+                                  (int(bool(mail.get('read'))), mail.get('type'), text, mail['id']))
+        removed = [(i,) for i in self._inbox if i not in current]
+        if removed: self.conn.executemany("DELETE FROM inbox WHERE id = ?", removed)
+        self._inbox = current
@@ -0,0 +1,117 @@
+# module/session_trace.py
+# 训练会话的紧凑二进制记录 (.satr)，用于 replay 复盘
+#
+# 文件布局 (小端):
+#   Header   : magic, version, flags, seed, epochs, steps_per_epoch, n_steps, n_violations,
+#              final_acc, mins_per_epoch, learning_rate, name_len
+#   Name     : UTF-8 模型名 (name_len 字节)
+#   Losses   : float32 * n_steps
+#   Ticks    : uint32 * n_violations   (发生违规的全局 step 序号)
+import os
+import re
+import struct
+
+import numpy as np
+
+from .config import TRACE_DIR
+
+MAGIC = b"SATR"
+VERSION = 1
+TRACE_EXT = ".satr"
+
+FLAG_MISSION = 0x1
+FLAG_SUCCESS = 0x2
+FLAG_CRASHED = 0x4
+
+_HEADER = struct.Struct("<4sHHIIIIIfffH")
+# train.new_session_id 的格式: 20240101_120000_ab12
+_SESSION_ID_RE = re.compile(r"\d{8}_\d{6}_[0-9a-f]{4}")
+
+def is_session_id(session_id):
+    """会话 ID 会拼进文件路径 (trace / checkpoint)，只接受 new_session_id 生成的格式"""
+    return isinstance(session_id, str) and _SESSION_ID_RE.fullmatch(session_id) is not None
+
+def trace_path(session_id):
+    """会话 ID 来自命令行，先校验格式，避免 '../' 之类的路径逃出 TRACE_DIR"""
+    if not is_session_id(session_id):
+        raise ValueError("invalid session id")
+    return os.path.join(TRACE_DIR, session_id + TRACE_EXT)
+
+def save_trace(session_id, trace):
+    """
+    写入一条会话记录。trace 为 dict:
+    model, seed, epochs, steps_per_epoch, mins_per_epoch, learning_rate,
+    losses, violation_ticks, final_acc, is_mission, success, is_crashed
+    """
+    losses = np.asarray(trace['losses'], dtype='<f4')
+    ticks = np.asarray(trace.get('violation_ticks', []), dtype='<u4')
+    name = trace['model'].encode('utf-8')[:0xFFFF]
+
+    flags = 0
+    if trace.get('is_mission'): flags |= FLAG_MISSION
+    if trace.get('success'): flags |= FLAG_SUCCESS
+    if trace.get('is_crashed'): flags |= FLAG_CRASHED
+
+    header = _HEADER.pack(MAGIC, VERSION, flags, trace['seed'] & 0xFFFFFFFF,
+                          trace['epochs'], trace['steps_per_epoch'], len(losses), len(ticks),
+                          trace['final_acc'], trace['mins_per_epoch'], trace['learning_rate'], len(name))
+
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    path = trace_path(session_id)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(name)
+        f.write(losses.tobytes())
+        f.write(ticks.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+def load_trace(session_id):
+    """读取会话记录，不存在返回 None，格式错误抛出 ValueError"""
+    path = trace_path(session_id)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    if len(raw) < _HEADER.size:
+        raise ValueError("truncated trace header")
+    (magic, version, flags, seed, epochs, steps_per_epoch, n_steps, n_violations,
+     final_acc, mins_per_epoch, learning_rate, name_len) = _HEADER.unpack_from(raw, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a session trace")
+    if not steps_per_epoch:
+        raise ValueError("corrupt trace header")
+    if len(raw) < _HEADER.size + name_len + n_steps * 4 + n_violations * 4:
+        raise ValueError("truncated trace")
+
+    offset = _HEADER.size
+    name = raw[offset:offset + name_len].decode('utf-8', errors='replace')
+    offset += name_len
+    losses = np.frombuffer(raw, dtype='<f4', count=n_steps, offset=offset)
+    offset += n_steps * 4
+    ticks = np.frombuffer(raw, dtype='<u4', count=n_violations, offset=offset)
+
+    return {
+        "session_id": session_id,
+        "model": name,
+        "seed": seed,
+        "epochs": epochs,
+        "steps_per_epoch": steps_per_epoch,
+        "mins_per_epoch": mins_per_epoch,
+        "learning_rate": learning_rate,
+        "losses": losses,
+        "violation_ticks": ticks,
+        "final_acc": final_acc,
+        "is_mission": bool(flags & FLAG_MISSION),
+        "success": bool(flags & FLAG_SUCCESS),
+        "is_crashed": bool(flags & FLAG_CRASHED)
+    }
+
+def list_traces():
+    """按时间倒序返回所有会话 ID"""
+    if not os.path.isdir(TRACE_DIR):
+        return []
+    names = [f[:-len(TRACE_EXT)] for f in os.listdir(TRACE_DIR) if f.endswith(TRACE_EXT)]
+    return sorted(names, reverse=True)
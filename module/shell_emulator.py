@@ -4,7 +4,8 @@ import shlex
 import shutil
 import subprocess
 import threading
-from .storage import save_game_data
+
+from .config import SCROLLBACK_LINES
 
 class ShellHandler:
     def __init__(self, terminal):
@@ -16,14 +17,15 @@ class ShellHandler:
         path = args[0] if args else "."
         try:
             files = sorted(os.listdir(path))
-            self.term.write("\n")
-            for f in files:
-                if f.startswith(".") or f == "__pycache__": continue
-                if os.path.isdir(f): self.term.write(f"{f:<15}", "dir")
-                elif f.endswith(".py"): self.term.write(f"{f:<15}", "exe")
-                else: self.term.write(f"{f:<15}")
-                if (files.index(f) + 1) % 4 == 0: self.term.write("\n")
-            self.term.write("\n")
+            with self.term.buffered():
+                self.term.write("\n")
+                for i, f in enumerate(files):
+                    if f.startswith(".") or f == "__pycache__": continue
+                    if os.path.isdir(f): self.term.write(f"{f:<15}", "dir")
+                    elif f.endswith(".py"): self.term.write(f"{f:<15}", "exe")
+                    else: self.term.write(f"{f:<15}")
+                    if (i + 1) % 4 == 0: self.term.write("\n")
+                self.term.write("\n")
         except Exception as e:
             self.term.write(f"ls: {e}\n", "error")
 
@@ -38,14 +40,18 @@ class ShellHandler:
         except Exception as e: self.term.write(f"cd: {e}\n", "error")
 
     def handle_sysctl(self, args):
+        DEFAULTS = {"train_backend": "sim", "use_local_tier": False, "scrollback_lines": SCROLLBACK_LINES}
         PARAM_MAP = {
             "kernel.focus_duration": "focus_duration",
-            "kernel.strict_mode": "strict_mode"
+            "kernel.strict_mode": "strict_mode",
+            "kernel.train_backend": "train_backend",
+            "kernel.use_local_tier": "use_local_tier",
+            "kernel.scrollback": "scrollback_lines"
         }
 
         if not args:
             for display_key, save_key in PARAM_MAP.items():
-                val = self.data.get(save_key)
+                val = self.data.get(save_key, DEFAULTS.get(save_key))
                 if isinstance(val, bool): val = 1 if val else 0
                 self.term.write(f"{display_key} = {val}\n")
         else:
@@ -62,17 +68,25 @@ class ShellHandler:
                             if new_val < 1: raise ValueError
                             self.data[save_key] = new_val
                             self.term.write(f"{key} = {new_val}\n")
-                        elif save_key == "strict_mode":
+                        elif save_key in ("strict_mode", "use_local_tier"):
                             is_true = val_str.lower() in ('1', 'on', 'true', 'yes')
                             self.data[save_key] = is_true
                             self.term.write(f"{key} = {1 if is_true else 0}\n")
-                        save_game_data(self.data)
+                        elif save_key == "scrollback_lines":
+                            new_val = int(val_str)
+                            if new_val < 100: raise ValueError
+                            self.data[save_key] = new_val
+                            self.term.write(f"{key} = {new_val}\n")
+                        elif save_key == "train_backend":
+                            if val_str not in ("sim", "numpy"): raise ValueError
+                            self.data[save_key] = val_str
+                            self.term.write(f"{key} = {val_str}\n")
                     except ValueError:
                             self.term.write(f"sysctl: invalid value '{val_str}' for key '{key}'\n", "error")
             else:
                 key = full_arg
                 if key in PARAM_MAP:
-                    val = self.data.get(PARAM_MAP[key])
+                    val = self.data.get(PARAM_MAP[key], DEFAULTS.get(PARAM_MAP[key]))
                     if isinstance(val, bool): val = 1 if val else 0
                     self.term.write(f"{key} = {val}\n")
                 else:
@@ -83,7 +97,7 @@ class ShellHandler:
         def _task():
             parts = shlex.split(cmd_str)
             if not parts: 
-                self.term.after(0, self.term.new_prompt)
+                self.term.post_call(self.term.new_prompt)
                 return
             cmd_head = parts[0]
             
@@ -102,15 +116,13 @@ class ShellHandler:
                not os.path.exists(cmd_head):
                 
                 err_msg = f"bash: {cmd_head}: command not found\n"
-                self.term.after(0, lambda: self.term.write(err_msg, "error"))
-                self.term.after(0, self.term.new_prompt)
+                self.term.post_write(err_msg, "error")
+                self.term.post_call(self.term.new_prompt)
                 return
 
             try:
-                # 注意：这里我们使用 self.term.write，但需要在主线程更新 UI
-                # TerminalCore 的 write 方法通常是线程安全的(after调用)，或者是直接操作 UI
-                # 如果 TerminalCore.write 内部用了 after，这里直接调没问题。
-                # 你的代码原版是用 self.after(0, ...) 包装的，这里保持一致。
+                # 输出经渲染泵回到主线程：同一 tag 的连续行合并插入，
+                # 泵跟不上时 post_write 阻塞读线程，子进程随之被管道反压，界面保持可输入
 
                 process = subprocess.Popen(
                     cmd_str, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
@@ -123,11 +135,11 @@ class ShellHandler:
                             if is_error:
                                 if "不是内部或外部命令" in line or "is not recognized" in line:
                                     msg = f"bash: {cmd_head}: command not found\n"
-                                    self.term.after(0, lambda: self.term.write(msg, "error"))
+                                    self.term.post_write(msg, "error")
                                 else:
-                                    self.term.after(0, lambda l=line: self.term.write(l, "error"))
+                                    self.term.post_write(line, "error")
                             else:
-                                self.term.after(0, lambda l=line: self.term.write(l))
+                                self.term.post_write(line)
                     stream.close()
 
                 t_out = threading.Thread(target=read_stream, args=(process.stdout, False))
@@ -140,8 +152,8 @@ class ShellHandler:
                 t_err.join()
                         
             except Exception as e:
-                self.term.after(0, lambda: self.term.write(str(e) + "\n", "error"))
+                self.term.post_write(str(e) + "\n", "error")
             
-            self.term.after(0, self.term.new_prompt)
+            self.term.post_call(self.term.new_prompt)
             
         threading.Thread(target=_task, daemon=True).start()
\ No newline at end of file
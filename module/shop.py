@@ -1,6 +1,6 @@
 # module/shop.py
 from .config import HARDWARE
-from .storage import save_game_data
+from .calibrate import local_tier
 
 class ShopHandler:
     def __init__(self, terminal):
@@ -35,6 +35,16 @@ class ShopHandler:
                 self.term.write(f"      {h['description']}\n", "dim")
                 self.term.write("\n") 
 
+        # 本机档位：calibrate 之后出现，免费切换
+        local = local_tier(self.data)
+        if local:
+            in_use = bool(self.data.get('use_local_tier'))
+            prefix = "*" if in_use else " "
+            row_str = f"{prefix + 'L':<4} {local['level']:<4} {local['name']:<32} {local['tflops']:<10} $0 (buy local)"
+            self.term.write(row_str + "\n", "system" if in_use else None)
+            self.term.write(f"      {local['description']}\n", "dim")
+            self.term.write("\n")
+
     def buy_item(self, args):
         if not args:
              self.term.write("Usage: buy <id>\n", "error")
@@ -42,6 +52,15 @@ class ShopHandler:
              
         item_id = args[0]
         found = False
+
+        if item_id.lower() in ("l", "local"):
+            local = local_tier(self.data)
+            if not local:
+                self.term.write("No local tier yet. Run 'calibrate' first.\n", "error")
+                return
+            self.data['use_local_tier'] = True
+            self.term.write(f"Switched to {local['name']} ({local['tflops']} TFLOPS).\n", "success")
+            return
         
         for i, h in enumerate(HARDWARE):
             if str(i) == item_id or str(h['id']) == item_id:
@@ -54,7 +73,7 @@ class ShopHandler:
                     
                     self.data['coins'] -= h['cost']
                     self.data['gpu_level'] = i
-                    save_game_data(self.data)
+                    self.data['use_local_tier'] = False
                     self.term.write(f"Purchased {h['name']}.\n", "success")
                 else:
                     self.term.write(f"Transaction failed: Insufficient funds (Need ${h['cost']}).\n", "error")
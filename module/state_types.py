@@ -0,0 +1,154 @@
+# module/state_types.py
+# 存档里随游戏时长增长的集合字段：ID 集合 (O(1) 成员判断)、计数背包、数字 ID 位图。
+# 每种容器都有紧凑且稳定的 JSON 形式 (to_json / from_json)，from_json 兼容旧存档里的普通列表。
+
+
+class BitSet:
+    """非负整数集合，按位存储。JSON 形式为十六进制字符串 (第 n 位 = 第 n//8 字节的第 n%8 位)"""
+    def __init__(self, values=()):
+        self._bytes = bytearray()
+        self._len = 0
+        for v in values: self.add(v)
+
+    def add(self, n):
+        if n < 0: raise ValueError("BitSet only holds non-negative integers")
+        i, bit = divmod(n, 8)
+        if i >= len(self._bytes): self._bytes.extend(bytes(i + 1 - len(self._bytes)))
+        if not self._bytes[i] >> bit & 1:
+            self._bytes[i] |= 1 << bit
+            self._len += 1
+
+    def discard(self, n):
+        if n in self:
+            self._bytes[n // 8] &= ~(1 << n % 8) & 0xFF
+            self._len -= 1
+
+    def __contains__(self, n):
+        i, bit = divmod(n, 8)
+        return 0 <= i < len(self._bytes) and bool(self._bytes[i] >> bit & 1)
+
+    def __iter__(self):
+        for i, byte in enumerate(self._bytes):
+            if not byte: continue
+            for bit in range(8):
+                if byte >> bit & 1: yield i * 8 + bit
+
+    def __len__(self):
+        return self._len
+
+    def to_json(self):
+        return bytes(self._bytes).rstrip(b"\0").hex()
+
+    @classmethod
+    def from_json(cls, text):
+        bits = cls()
+        bits._bytes = bytearray.fromhex(text or "")
+        bits._len = sum(b.bit_count() for b in bits._bytes)
+        return bits
+
+
+class IdSet:
+    """
+    字符串 ID 集合，保持加入顺序。形如 '001' 的三位数字 ID (剧情邮件) 存在 BitSet 里。
+    JSON 形式: {"ids": [...], "num": "<BitSet hex>"}
+    """
+    NUMERIC_WIDTH = 3
+
+    def __init__(self, ids=()):
+        self._ids = {}          # dict 当有序集合用
+        self._nums = BitSet()
+        for x in ids: self.add(x)
+
+    def _numeric(self, x):
+        if len(x) == self.NUMERIC_WIDTH and x.isascii() and x.isdigit(): return int(x)
+        return None
+
+    def add(self, x):
+        n = self._numeric(x)
+        if n is None: self._ids[x] = None
+        else: self._nums.add(n)
+
+    def discard(self, x):
+        n = self._numeric(x)
+        if n is None: self._ids.pop(x, None)
+        else: self._nums.discard(n)
+
+    def __contains__(self, x):
+        n = self._numeric(x)
+        return x in self._ids if n is None else n in self._nums
+
+    def __iter__(self):
+        yield from self._ids
+        for n in self._nums: yield f"{n:0{self.NUMERIC_WIDTH}d}"
+
+    def __len__(self):
+        return len(self._ids) + len(self._nums)
+
+    def to_json(self):
+        out = {"ids": list(self._ids)}
+        if self._nums: out["num"] = self._nums.to_json()
+        return out
+
+    @classmethod
+    def from_json(cls, value):
+        if isinstance(value, cls): return value
+        if isinstance(value, dict):
+            ids = cls(value.get("ids", []))
+            ids._nums = BitSet.from_json(value.get("num"))
+            return ids
+        return cls(value or [])
+
+
+class Inventory:
+    """计数背包：物品 ID -> 数量，按首次获得的顺序。JSON 形式: {"item_id": count, ...}"""
+    def __init__(self, counts=None):
+        self.counts = dict(counts or {})
+
+    def add(self, item, n=1):
+        self.counts[item] = self.counts.get(item, 0) + n
+
+    def remove(self, item, n=1):
+        """数量不够时不扣除并返回 False"""
+        have = self.counts.get(item, 0)
+        if have < n: return False
+        if have == n: del self.counts[item]
+        else: self.counts[item] = have - n
+        return True
+
+    def count(self, item):
+        return self.counts.get(item, 0)
+
+    def items(self):
+        return self.counts.items()
+
+    def __contains__(self, item):
+        return item in self.counts
+
+    def __iter__(self):
+        return iter(self.counts)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def to_json(self):
+        return dict(self.counts)
+
+    @classmethod
+    def from_json(cls, value):
+        if isinstance(value, cls): return value
+        if isinstance(value, dict): return cls(value)
+        inv = cls()
+        for item in value or []: inv.add(item)
+        return inv
+
+
+# 存档字段 -> 容器类型 (load_game_data 加载后转换，保存时用 to_plain 转回 JSON)
+STATE_FIELDS = {
+    "received_mail_ids": IdSet,
+    "completed_mission_ids": IdSet,
+    "inventory": Inventory,
+}
+
+
+def to_plain(value):
+    return value.to_json() if isinstance(value, (BitSet, IdSet, Inventory)) else value
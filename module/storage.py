@@ -1,12 +1,92 @@
 
 
+import atexit
 import json
 import os
-from .config import SAVE_FILE
+import shutil
+import struct
+import threading
+import time
+import zlib
+from .config import SAVE_FILE, SAVE_DB_FILE, SAVE_BACKEND, CHECKPOINT_DIR, SAVE_COALESCE_SECS
+from .state_types import STATE_FIELDS
+from .game_state import GameState, plain_snapshot
+from .session_trace import is_session_id
+
+# ================= 存档 (快照 + 变更日志) =================
+# cyber_save.json 是快照；每次保存只把变化的顶层字段追加到 cyber_save.journal。
+# 日志记录格式: [payload 长度 u32][crc32 u32][payload = JSON {"set": {...}, "del": [...]}]
+# 日志超过阈值时压缩：快照写临时文件 -> fsync -> 原子替换，再清空日志。
+# 记录是「整字段覆盖」，回放是幂等的；压缩前先追加日志，所以在任何一步崩溃都不会丢数据。
+
+JOURNAL_FILE = os.path.splitext(SAVE_FILE)[0] + ".journal"
+JOURNAL_COMPACT_BYTES = 256 * 1024
+_RECORD_HEADER = struct.Struct("<II")
+
+_journal_lock = threading.Lock()
+_persisted = {}         # 已落盘状态：顶层字段 -> 序列化后的 JSON 文本
+_journal_size = 0
+
+
+def _encode_record(payload):
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+    return _RECORD_HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def _read_journal():
+    """返回 (有效记录列表, 有效部分的字节数)；遇到截断或校验失败的记录即停止"""
+    records = []
+    try:
+        with open(JOURNAL_FILE, 'rb') as f:
+            raw = f.read()
+    except OSError:
+        return records, 0
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(raw):
+        length, crc = _RECORD_HEADER.unpack_from(raw, offset)
+        body = raw[offset + _RECORD_HEADER.size: offset + _RECORD_HEADER.size + length]
+        if len(body) < length or zlib.crc32(body) != crc: break
+        try: records.append(json.loads(body.decode('utf-8')))
+        except ValueError: break
+        offset += _RECORD_HEADER.size + length
+    return records, offset
+
+
+# ================= SQLite 后端 (可选) =================
+# config.SAVE_BACKEND = "sqlite" 时存档写入 cyber_save.db；sqlite3 不可用时退回 JSON。
+# 首次启用时自动迁移 JSON 存档，原存档另存为 cyber_save.json.migrated。
+
+_db = None
+
+def _save_db():
+    global _db
+    if SAVE_BACKEND != "sqlite": return None
+    if _db is None:
+        try:
+            from .save_db import SaveDB
+        except ImportError:
+            print("[System] sqlite3 is not available, falling back to the JSON save backend.")
+            return None
+        dir_path = os.path.dirname(SAVE_DB_FILE)
+        if dir_path and not os.path.exists(dir_path):
+            os.makedirs(dir_path)
+        _db = SaveDB(SAVE_DB_FILE)
+    return _db
+
+
+def _migrate_json_save(db):
+    """把 JSON 快照 + 日志的内容一次性写入数据库，再移走 JSON 存档"""
+    data = _load_json_save()
+    db.save(data)
+    _atomic_write_json(SAVE_FILE + ".migrated", data, indent=4)
+    for path in (SAVE_FILE, JOURNAL_FILE):
+        if os.path.exists(path): os.remove(path)
+    print(f"[System] Save migrated to {os.path.basename(SAVE_DB_FILE)} ({len(data)} fields).")
+
 
 def load_game_data():
     """
-    加载存档。如果文件不存在或损坏，返回默认初始数据。
+    加载存档 (JSON 快照 + 日志，或 SQLite)。如果不存在或损坏，返回默认初始数据。
     """
     # 1. 定义初始默认状态
     default_data = {
@@ -21,35 +101,236 @@ def load_game_data():
     
     final_data = default_data.copy()
 
-    # 2. 尝试读取
+    db = _save_db()
+    if db is not None:
+        if db.is_empty() and (os.path.exists(SAVE_FILE) or os.path.exists(JOURNAL_FILE)):
+            _migrate_json_save(db)
+        on_disk = db.load()
+    else:
+        on_disk = _load_json_save()
+
+    # 增量更新：只更新存档里有的字段，保留默认值里新增的字段
+    final_data.update(on_disk)
+    # 集合类字段转成对应容器 (兼容旧存档里的列表)
+    for key, cls in STATE_FIELDS.items():
+        final_data[key] = cls.from_json(final_data.get(key))
+    # 首次保存做一次完整差分，把默认值和格式转换写回存档
+    state = GameState(final_data)
+    state.mark_dirty(state.keys())
+    return state
+
+
+def _load_json_save():
+    """
+    读取快照，再按顺序回放日志，返回存档里实际存在的字段。
+    日志尾部若有写到一半的记录 (崩溃)，丢弃并截断；快照损坏时保留一份 .corrupt 副本。
+    """
+    global _persisted, _journal_size
+    on_disk = {}
+
+    # 1. 尝试读取快照
     if os.path.exists(SAVE_FILE):
         try:
             with open(SAVE_FILE, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-                
-                # 3. 增量更新：只更新存档里有的字段，保留默认值里新增的字段
-                for key, value in loaded_data.items():
-                    final_data[key] = value
-                    
+                on_disk.update(json.load(f))
         except Exception as e:
-            print(f"[System Error] Corrupted save file. Creating new one. (Reason: {e})")
-            pass
-            
-    return final_data
+            print(f"[System Error] Corrupted save snapshot, recovering from journal. (Reason: {e})")
+            try: shutil.copyfile(SAVE_FILE, SAVE_FILE + ".corrupt")
+            except OSError: pass
+
+    with _journal_lock:
+        # 2. 按顺序回放日志
+        records, valid = _read_journal()
+        for rec in records:
+            on_disk.update(rec.get("set", {}))
+            for key in rec.get("del", []): on_disk.pop(key, None)
+        if os.path.exists(JOURNAL_FILE) and os.path.getsize(JOURNAL_FILE) > valid:
+            print(f"[System] Discarded a torn save journal record ({os.path.getsize(JOURNAL_FILE) - valid} bytes).")
+            with open(JOURNAL_FILE, 'r+b') as f: f.truncate(valid)
+        _journal_size = valid
+        # 默认值里新增、存档里还没有的字段会在下次保存时写入日志
+        _persisted = {k: json.dumps(v, ensure_ascii=False, sort_keys=True) for k, v in on_disk.items()}
+    return on_disk
 
-def save_game_data(data):
+
+def save_game_data(data, full=False):
     """
-    保存存档。会自动创建父目录。
+    保存存档：只把与上次落盘不同的顶层字段追加到日志 (fsync)，日志过大时压缩进快照；
+    SQLite 后端则只写变化的行。
+    data 是 GameState 时只序列化脏字段；full=True 时对全部字段做差分 (退出前兜底)。
     """
+    global _journal_size
+    keys = data.take_dirty() if isinstance(data, GameState) and not full else None
     try:
-        dir_path = os.path.dirname(SAVE_FILE)
-        if dir_path and not os.path.exists(dir_path):
-            os.makedirs(dir_path)
+        db = _save_db()
+        if db is not None:
+            db.save(data, keys)
+            return
+        with _journal_lock:
+            # 可能在后台线程执行：在 data.lock 内复制成纯 JSON 结构，之后只序列化这份拷贝
+            plain = plain_snapshot(data, keys)
+            current = {k: json.dumps(v, ensure_ascii=False, sort_keys=True) for k, v in plain.items()}
+            changed = {k: plain[k] for k, text in current.items() if _persisted.get(k) != text}
+            removed = [k for k in (_persisted if keys is None else keys) if k in _persisted and k not in current]
+            if not changed and not removed: return
 
-        with open(SAVE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
+            dir_path = os.path.dirname(SAVE_FILE)
+            if dir_path and not os.path.exists(dir_path):
+                os.makedirs(dir_path)
+
+            # 先追加日志：日志回放的结果始终等于本次保存的数据
+            record = _encode_record({"set": changed, "del": removed})
+            with open(JOURNAL_FILE, 'ab') as f:
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            _journal_size += len(record)
+            for k in removed: del _persisted[k]
+            _persisted.update(current)
+
+            if _journal_size > JOURNAL_COMPACT_BYTES or not os.path.exists(SAVE_FILE):
+                # 压缩：原子写完整快照后清空日志；两步之间崩溃时回放日志得到的仍是同一份数据
+                full_plain = plain_snapshot(data)
+                _atomic_write_json(SAVE_FILE, full_plain, indent=4)
+                with open(JOURNAL_FILE, 'wb') as f:
+                    os.fsync(f.fileno())
+                _journal_size = 0
+                _persisted.clear()
+                _persisted.update({k: json.dumps(v, ensure_ascii=False, sort_keys=True) for k, v in full_plain.items()})
             
     except Exception as e:
+        if keys: data.mark_dirty(keys)
         print(f"\n[CRITICAL ERROR] Failed to save game data!")
-        print(f"Target path: {SAVE_FILE}")
-        print(f"Error detail: {e}\n")
\ No newline at end of file
+        print(f"Target path: {SAVE_DB_FILE if _db is not None else SAVE_FILE}")
+        print(f"Error detail: {e}\n")
+
+# ================= 后台写盘 (Write-behind) =================
+
+class SaveCoalescer:
+    """
+    request(data) 只记下待写的存档并唤醒后台线程，线程等满 delay 秒的合并窗口后写一次盘，
+    窗口内的多次请求合并成一次 save_game_data。flush() 在调用线程里立即写完 (退出前调用)。
+    """
+    def __init__(self, delay=SAVE_COALESCE_SECS):
+        self.delay = delay
+        self._cond = threading.Condition()
+        self._pending = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def request(self, data):
+        with self._cond:
+            self._pending = data
+            self._cond.notify()
+
+    def flush(self, data=None):
+        """data: 额外要求完整差分一次的存档 (退出时兜底，漏掉 touch 的嵌套修改也能写进去)"""
+        with self._cond:
+            pending, self._pending = self._pending, None
+        # 与后台线程的写入由 _journal_lock 串行化，且两边都序列化最新的 data，不会写回旧状态
+        data = data if data is not None else pending
+        if data is not None: save_game_data(data, full=True)
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5.0)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed: self._cond.wait()
+                if self._closed: return
+                deadline = time.monotonic() + self.delay
+                while not self._closed:
+                    left = deadline - time.monotonic()
+                    if left <= 0: break
+                    self._cond.wait(left)
+                data, self._pending = self._pending, None
+            if data is not None: save_game_data(data)
+
+
+_saver = None
+
+def request_save(data):
+    """UI 线程用：标记存档已变更，由后台线程合并写盘，不阻塞输入"""
+    global _saver
+    if _saver is None:
+        _saver = SaveCoalescer()
+        atexit.register(flush_saves)
+    _saver.request(data)
+
+def flush_saves(data=None):
+    """同步写完所有未落盘的修改 (exit / 关窗 / 进程退出时)；传入 data 时对它做一次完整差分"""
+    if _saver is not None: _saver.flush(data)
+    elif data is not None: save_game_data(data, full=True)
+
+# ================= 训练断点 (Checkpoint) =================
+
+def _atomic_write_json(path, data, indent=None):
+    """先写临时文件并 fsync，再原子替换，避免写到一半时崩溃损坏文件"""
+    dir_path = os.path.dirname(path)
+    if dir_path and not os.path.exists(dir_path):
+        os.makedirs(dir_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=indent, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+# 断点必须包含的字段，缺任何一个都当作没有断点
+CHECKPOINT_KEYS = ("session_id", "model", "epochs", "learning_rate", "mins_per_epoch", "seed")
+
+def _checkpoint_path(session_id):
+    """会话 ID 可能来自命令行 (train --resume)，格式不对时抛 ValueError，不拼出 save/checkpoints 以外的路径"""
+    if not is_session_id(session_id):
+        raise ValueError(f"invalid session id '{session_id}'")
+    return os.path.join(CHECKPOINT_DIR, f"{session_id}.json")
+
+def save_checkpoint(state):
+    """写入训练断点 (save/checkpoints/<session_id>.json，每个会话一份)"""
+    try:
+        _atomic_write_json(_checkpoint_path(state['session_id']), state)
+    except Exception as e:
+        print(f"[System Error] Failed to write checkpoint: {e}")
+
+def list_checkpoints():
+    """按时间倒序返回所有存在断点的会话 ID"""
+    if not os.path.isdir(CHECKPOINT_DIR):
+        return []
+    return sorted((f[:-5] for f in os.listdir(CHECKPOINT_DIR) if f.endswith(".json") and is_session_id(f[:-5])),
+                  reverse=True)
+
+def load_checkpoint(session_id=None):
+    """读取训练断点 (默认最近的一个)，不存在、ID 不合法或损坏时返回 None"""
+    if session_id is None:
+        sessions = list_checkpoints()
+        if not sessions: return None
+        session_id = sessions[0]
+    if not is_session_id(session_id):
+        return None
+    path = _checkpoint_path(session_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            ckpt = json.load(f)
+    except Exception as e:
+        print(f"[System Error] Corrupted checkpoint ignored. (Reason: {e})")
+        return None
+    if not isinstance(ckpt, dict) or any(k not in ckpt for k in CHECKPOINT_KEYS):
+        print(f"[System Error] Incomplete checkpoint ignored: {session_id}")
+        return None
+    return ckpt
+
+def clear_checkpoint(session_id):
+    try:
+        path = _checkpoint_path(session_id)
+        if os.path.exists(path):
+            os.remove(path)
+    except Exception as e:
+        print(f"[System Error] Failed to remove checkpoint: {e}")
\ No newline at end of file
@@ -0,0 +1,94 @@
+# module/sweep.py
+# 学习率扫描：把同一模型在不同 LR 下的无头训练分发到进程池，统计准确率与崩溃率分布
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .rng import derive_rng, new_seed
+
+# 子进程只需要影响结算的存档字段；后端固定为模拟曲线，避免扫描时真的训练模型
+_SWEEP_KEYS = ('gpu_level', 'use_local_tier', 'calibration')
+
+
+def parse_lr_range(text):
+    """'1e-4:1e-2' -> (0.0001, 0.01)；格式错误抛 ValueError"""
+    lo, hi = (float(x) for x in text.split(":", 1))
+    if lo <= 0 or hi <= 0: raise ValueError("learning rate must be positive")
+    return min(lo, hi), max(lo, hi)
+
+
+def lr_grid(lo, hi, points):
+    """在 [lo, hi] 上按对数均匀取 points 个 LR"""
+    if points <= 1 or lo == hi: return [lo]
+    return [float(x) for x in np.geomspace(lo, hi, points)]
+
+
+def _run_batch(game_data, selected_option, epochs, lr, seeds):
+    """子进程入口：跑一组种子，返回 [(accuracy, crashed, success), ...]"""
+    from .train import run_headless
+    out = []
+    for seed in seeds:
+        r = run_headless(game_data, selected_option, user_epochs=epochs, user_lr=lr, seed=seed)['result']
+        out.append((r['accuracy'], r['crashed'], r['success']))
+    return out
+
+
+def summarize(lr, samples):
+    acc = np.array([s[0] for s in samples])
+    p10, p50, p90 = np.percentile(acc, [10, 50, 90])
+    return {
+        "lr": lr,
+        "n": len(samples),
+        "mean": float(acc.mean()),
+        "p10": float(p10), "p50": float(p50), "p90": float(p90),
+        "crash_rate": sum(1 for s in samples if s[1]) / len(samples),
+        "success_rate": sum(1 for s in samples if s[2]) / len(samples),
+    }
+
+
+def recommend(stats):
+    """成功率最高者优先，其次看中位准确率"""
+    return max(stats, key=lambda s: (round(s['success_rate'], 3), s['p50'])) if stats else None
+
+
+def run_sweep(game_data, selected_option, lo, hi, n, points=8, epochs=None, workers=None,
+              seed=None, on_result=None, cancel_event=None):
+    """
+    每个 LR 跑 n 次无头训练，按 worker 数切块提交到进程池。
+    on_result(stat): 某个 LR 的全部样本回来后立即回调 (在调用线程里执行)
+    cancel_event: 置位后取消尚未开始的块，已返回的 LR 照常统计
+    返回按 LR 排序的统计列表
+    """
+    workers = workers or os.cpu_count() or 1
+    seed = new_seed() if seed is None else seed
+    sub_data = {k: game_data[k] for k in _SWEEP_KEYS if k in game_data}
+    sub_data['train_backend'] = "sim"
+    epochs = epochs or selected_option['auto_epochs']
+    lrs = lr_grid(lo, hi, points)
+
+    chunk = max(1, math.ceil(n * len(lrs) / (workers * 4)))
+    pending = {}
+    samples = {lr: [] for lr in lrs}
+    stats = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i, lr in enumerate(lrs):
+            rng = derive_rng(seed, "sweep", i)
+            seeds = [rng.getrandbits(32) for _ in range(n)]
+            for j in range(0, n, chunk):
+                fut = pool.submit(_run_batch, sub_data, selected_option, epochs, lr, seeds[j:j + chunk])
+                pending[fut] = lr
+
+        for fut in as_completed(pending):
+            if cancel_event is not None and cancel_event.is_set():
+                for f in pending: f.cancel()
+                break
+            lr = pending[fut]
+            samples[lr].extend(fut.result())
+            if len(samples[lr]) == n:
+                stat = summarize(lr, samples[lr])
+                stats.append(stat)
+                if on_result: on_result(stat)
+
+    return sorted(stats, key=lambda s: s['lr'])
@@ -0,0 +1,114 @@
+# module/tb_events.py
+# 轻量 TensorBoard 事件文件写入器：手工编码 Event protobuf + TFRecord 帧 (CRC32C)，
+# 不依赖 tensorflow / tensorboard。训练线程只做一次 queue.put，编码与写盘都在后台线程。
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+
+from .config import RUNS_DIR
+
+# ===== CRC32C (Castagnoli) =====
+_CRC_TABLE = []
+for _i in range(256):
+    _c = _i
+    for _ in range(8):
+        _c = (_c >> 1) ^ 0x82F63B78 if _c & 1 else _c >> 1
+    _CRC_TABLE.append(_c)
+
+def crc32c(data):
+    crc = 0xFFFFFFFF
+    table = _CRC_TABLE
+    for b in data:
+        crc = table[(crc ^ b) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+def _masked_crc(data):
+    crc = crc32c(data)
+    return ((((crc >> 15) | (crc << 17)) & 0xFFFFFFFF) + 0xA282EAD8) & 0xFFFFFFFF
+
+def tfrecord(payload):
+    """TFRecord 帧：len(u64) + masked_crc(len) + payload + masked_crc(payload)"""
+    header = struct.pack("<Q", len(payload))
+    return header + struct.pack("<I", _masked_crc(header)) + payload + struct.pack("<I", _masked_crc(payload))
+
+# ===== Event protobuf (只编码用到的字段) =====
+# Event { double wall_time = 1; int64 step = 2; string file_version = 3; Summary summary = 5; }
+# Summary { repeated Value value = 1; }  Value { string tag = 1; float simple_value = 2; }
+
+def _varint(n):
+    out = bytearray()
+    n &= 0xFFFFFFFFFFFFFFFF
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+def _len_field(field, payload):
+    return _varint((field << 3) | 2) + _varint(len(payload)) + payload
+
+def encode_event(wall_time, step=0, file_version=None, scalars=None):
+    """scalars: [(tag, value), ...] -> Event 序列化字节"""
+    out = b"\x09" + struct.pack("<d", wall_time)          # field 1, fixed64
+    if step: out += b"\x10" + _varint(step)              # field 2, varint
+    if file_version: out += _len_field(3, file_version.encode('utf-8'))
+    if scalars:
+        summary = b"".join(
+            _len_field(1, _len_field(1, tag.encode('utf-8')) + b"\x15" + struct.pack("<f", value))
+            for tag, value in scalars)
+        out += _len_field(5, summary)
+    return out
+
+
+class EventWriter:
+    """
+    每个会话一个目录 (save/runs/<session_id>)，每次打开写一个新的 events.out.tfevents.* 文件，
+    续训时 TensorBoard 会把同目录下的文件合并成一条曲线。
+    add_scalar 只入队；后台线程批量编码后写入带缓冲的追加文件，每 flush_secs 秒 flush 一次，不 fsync。
+    """
+    def __init__(self, run_name, flush_secs=2.0):
+        self.logdir = os.path.join(RUNS_DIR, run_name)
+        os.makedirs(self.logdir, exist_ok=True)
+        filename = f"events.out.tfevents.{int(time.time())}.{socket.gethostname()}"
+        self.path = os.path.join(self.logdir, filename)
+        self.flush_secs = flush_secs
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._worker, daemon=True)
+        self.thread.start()
+        self.queue.put((time.time(), 0, None))    # 文件头事件 (file_version)
+
+    def add_scalar(self, tag, value, step):
+        self.queue.put((time.time(), step, [(tag, float(value))]))
+
+    def add_scalars(self, values, step):
+        """values: {tag: value}，同一 step 的多个标量合并成一条 Event"""
+        self.queue.put((time.time(), step, [(t, float(v)) for t, v in values.items()]))
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=5.0)
+
+    def _worker(self):
+        with open(self.path, 'ab', buffering=64 * 1024) as f:
+            last_flush = time.monotonic()
+            while True:
+                try:
+                    item = self.queue.get(timeout=self.flush_secs)
+                except queue.Empty:
+                    item = ()
+                if item is None: break
+                if item:
+                    wall_time, step, scalars = item
+                    if scalars is None:
+                        f.write(tfrecord(encode_event(wall_time, file_version="brain.Event:2")))
+                    else:
+                        f.write(tfrecord(encode_event(wall_time, step, scalars=scalars)))
+                if time.monotonic() - last_flush >= self.flush_secs:
+                    f.flush()
+                    last_flush = time.monotonic()
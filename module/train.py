@@ -1,15 +1,98 @@
 import time
 import math
-import random
 import json
 import os
 import threading
 
-from .config import HARDWARE
-from .storage import save_game_data
+import numpy as np
+
+from .config import CHECKPOINT_INTERVAL, MAX_RUNNING_JOBS
+from .calibrate import current_hardware
+from .dataset_store import MemmapDataset, BatchPrefetcher
+from .tb_events import EventWriter
+from .loss_chart import LossHistory, braille_chart
+from .storage import save_game_data, save_checkpoint, load_checkpoint, list_checkpoints, clear_checkpoint
 from . import process_guard 
+from . import session_trace
+from .rng import new_seed, derive_rng, derive_np_rng
+from .game_state import snapshot
 
 TIME_CONSTANT = 0.05
+SPARK_WIDTH = 12      # 进度条尾部火花线宽度
+CHART_WIDTH = 50      # 结算时 Loss 曲线宽度 (字符)
+
+# ================= 时钟 (Clock) =================
+# 训练循环只通过 clock.now() / clock.sleep() 感知时间，
+# 这样同一套 Loss/违规/精度/奖励逻辑既能跑在真实时间上，也能跑在虚拟时间上。
+
+class WallClock:
+    """真实时钟：sleep 会真正阻塞当前线程"""
+    def now(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        if seconds > 0: time.sleep(seconds)
+
+    def wait(self, event, timeout):
+        """等待 timeout 秒或 event 被置位，返回 event 是否已置位"""
+        return event.wait(max(0.0, timeout))
+
+class VirtualClock:
+    """虚拟时钟：sleep 只推进内部时间，不做任何等待 (无头模式 / 回归测试)"""
+    def __init__(self, start=0.0):
+        self._now = float(start)
+
+    def now(self):
+        return self._now
+
+    def sleep(self, seconds):
+        if seconds > 0: self._now += seconds
+
+    def wait(self, event, timeout):
+        if event.is_set(): return True
+        self.sleep(timeout)
+        return False
+
+def _no_violation():
+    return False, None
+
+# ================= Loss 轨迹生成 (Trajectory) =================
+
+def generate_trajectory(base_loss, target_loss, learning_rate, epochs, steps_per_epoch=100,
+                        base_step_delay=1.0, seed=None, start_epoch=1, num_epochs=None):
+    """
+    一次性用 NumPy 生成若干个 epoch 的 Loss 轨迹，训练循环只需按下标取值。
+    曲线形状与逐 step 计算完全一致 (指数衰减 + 噪声 + 随机尖峰)。
+    默认生成整个会话；指定 start_epoch / num_epochs 时只生成其中一段 (进度仍按全会话计算)。
+    返回 dict: ideal_val, noise, spike, display_loss, step_delay (均为 ndarray)
+    """
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    if num_epochs is None: num_epochs = epochs - start_epoch + 1
+
+    total_steps = epochs * steps_per_epoch
+    first = (start_epoch - 1) * steps_per_epoch
+    n = num_epochs * steps_per_epoch
+
+    total_progress = np.arange(first, first + n, dtype=np.float64) / total_steps
+    decay = np.exp(-4.0 * total_progress)
+    ideal_val = target_loss + (base_loss - target_loss) * decay
+
+    instability = learning_rate * 1000.0
+    noise_scale = instability * 0.05 * (decay + 0.1)
+    noise = rng.uniform(-1.0, 1.0, n) * noise_scale
+    spike_mask = rng.random(n) < (learning_rate * 10)
+    spike = np.where(spike_mask, rng.uniform(0.1, 0.5, n), 0.0)
+
+    display_loss = np.maximum(0.0001, ideal_val + noise + spike)
+    step_delay = base_step_delay * rng.uniform(0.9, 1.1, n)
+
+    return {
+        "ideal_val": ideal_val,
+        "noise": noise,
+        "spike": spike,
+        "display_loss": display_loss,
+        "step_delay": step_delay
+    }
 
 def load_tasks():
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -24,8 +107,7 @@ def get_menu_data(game_data):
     返回给 main.py 用于显示选单的数据
     """
     tasks_data = load_tasks()
-    gpu_idx = min(game_data.get('gpu_level', 0), len(HARDWARE)-1)
-    gpu = HARDWARE[gpu_idx]
+    gpu = current_hardware(game_data)
     tflops = max(0.1, gpu['tflops'])
     target_focus_time = game_data.get('focus_duration', 25)
     player_level = game_data.get('level', 1)
@@ -54,26 +136,295 @@ def get_menu_data(game_data):
         }
     return menu_lines, options
 
-def start_training_session(game_data, selected_option, user_epochs, user_lr, ui_callbacks):
-    model = selected_option['model']
-    mins_per_epoch = selected_option['mins_per_epoch']
-    
+def mission_option(game_data, mission):
+    """把已接受的任务附件包装成与 get_menu_data 选项同结构的 dict (选单中的 ID 0)"""
+    tflops = max(0.1, current_hardware(game_data)['tflops'])
+    return {
+        "model": {
+            "name": mission['name'], "base_ops": mission['base_ops'], "difficulty": mission['difficulty'],
+            "__mission_reqs": mission['requirements'], "__rewards": mission['rewards'], "max_loss": 2.5
+        },
+        "mins_per_epoch": (mission['base_ops'] / tflops) * TIME_CONSTANT,
+        "auto_epochs": mission['requirements'].get('min_epochs') or 10
+    }
+
+def _resolve_params(selected_option, user_epochs, user_lr):
     # 默认参数处理
     epochs = int(user_epochs) if user_epochs else selected_option['auto_epochs']
     
     # 如果用户没填 LR，默认 0.001
     learning_rate = float(user_lr) if user_lr else 0.001 
+    return epochs, learning_rate
+
+def new_session_id(seed):
+    """会话 ID：启动时间 + 种子低 16 位，按字典序即按时间排序"""
+    return time.strftime("%Y%m%d_%H%M%S") + f"_{seed & 0xFFFF:04x}"
+
+def start_training_session(game_data, selected_option, user_epochs, user_lr, ui_callbacks,
+                           priority=None, foreground=True):
+    """提交一个训练任务到调度器，返回 TrainingJob"""
+    model = selected_option['model']
+    mins_per_epoch = selected_option['mins_per_epoch']
+    epochs, learning_rate = _resolve_params(selected_option, user_epochs, user_lr)
+
+    # 每个会话独立的随机种子，随结果写入存档和 trace，便于复现
+    seed = new_seed()
+    session_id = new_session_id(seed)
+
+    run_kwargs = {
+        'game_data': game_data, 'model': model, 'epochs': epochs,
+        'learning_rate': learning_rate, 'mins_per_epoch': mins_per_epoch,
+        'seed': seed, 'session_id': session_id, 'checkpoint': True
+    }
+    return scheduler.submit(run_kwargs, ui_callbacks, priority=priority, foreground=foreground)
+
+def pending_checkpoints():
+    """存在断点、且当前没有在运行的会话 ID (按时间倒序)"""
+    running = scheduler.session_ids()
+    return [sid for sid in list_checkpoints() if sid not in running]
+
+def resume_training_session(game_data, ui_callbacks, session_id=None, foreground=True):
+    """
+    从 save/checkpoints 继续一次被中断的训练 (默认最近的一次)。
+    没有可用断点时返回 None，否则返回 TrainingJob。
+    """
+    if session_id is None:
+        candidates = pending_checkpoints()
+        if not candidates: return None
+        session_id = candidates[0]
+    elif session_id in scheduler.session_ids():
+        return None
+
+    ckpt = load_checkpoint(session_id)
+    if not ckpt:
+        return None
+    run_kwargs = {
+        'game_data': game_data, 'model': ckpt['model'], 'epochs': ckpt['epochs'],
+        'learning_rate': ckpt['learning_rate'], 'mins_per_epoch': ckpt['mins_per_epoch'],
+        'seed': ckpt['seed'], 'session_id': ckpt['session_id'], 'checkpoint': True, 'resume': ckpt
+    }
+    return scheduler.submit(run_kwargs, ui_callbacks, foreground=foreground)
+
+# ================= 任务调度 (Job Scheduler) =================
+# 多个训练任务共享当前显卡的算力：运行中的任务按优先级权重瓜分 TFLOPS，
+# 超过 MAX_RUNNING_JOBS 的任务进入队列，按 (优先级, 提交顺序) 依次启动。
+
+class TrainingJob:
+    def __init__(self, job_id, run_kwargs, ui, priority, foreground):
+        self.job_id = job_id
+        self.run_kwargs = run_kwargs
+        self.name = run_kwargs['model']['name']
+        self.is_mission = run_kwargs['model'].get('__mission_reqs') is not None
+        self.session_id = run_kwargs.get('session_id')
+        self.priority = priority
+        self.foreground = foreground
+        self.state = "queued"          # queued / running / done / killed
+        self.share = 1.0               # 当前分到的算力比例
+        self.progress = None           # (epoch, epochs, global_step, total_steps, loss)
+        self.cancel_event = threading.Event()
+        self.cancel_reason = None      # kill / shutdown
+        self.log = []                  # 后台运行时的输出 (只保留最近若干行)
+        self.thread = None
+        self._real_ui = ui
+        self.ui = self._make_ui()
+
+    def _make_ui(self):
+        """只有前台任务才真正输出到终端，后台任务的输出暂存在 log 里"""
+        def _print(text, style=None):
+            if self.foreground: self._real_ui['print'](text, style)
+            else:
+                self.log.append((str(text), style))
+                del self.log[:-20]
+        def _update_bar(text):
+            if self.foreground: self._real_ui['update_bar'](text)
+        def _set_mini_mode(val):
+            if self.foreground or not val: self._real_ui['set_mini_mode'](val)
+        def _finished(result):
+            # 附带任务编号和前后台状态，方便 UI 决定如何收尾
+            self._real_ui['finished'](dict(result, job_id=self.job_id, foreground=self.foreground))
+        return {'print': _print, 'update_bar': _update_bar,
+                'set_mini_mode': _set_mini_mode, 'finished': _finished}
+
+class JobScheduler:
+    def __init__(self, max_running=MAX_RUNNING_JOBS):
+        self.max_running = max_running
+        self.jobs = []
+        self._next_id = 1
+        self._lock = threading.RLock()
+
+    def submit(self, run_kwargs, ui, priority=None, foreground=True):
+        if priority is None:
+            # 任务合同默认优先级更高
+            priority = 2 if run_kwargs['model'].get('__mission_reqs') is not None else 1
+        with self._lock:
+            job = TrainingJob(self._next_id, run_kwargs, ui, max(1, int(priority)), foreground)
+            self._next_id += 1
+            self.jobs.append(job)
+            if foreground:
+                for other in self.jobs:
+                    if other is not job: other.foreground = False
+            self._schedule()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            for job in self.jobs:
+                if str(job.job_id) == str(job_id).lstrip('%'):
+                    return job
+        return None
+
+    def active_jobs(self):
+        with self._lock:
+            return [j for j in self.jobs if j.state in ("queued", "running")]
+
+    def session_ids(self):
+        return {j.session_id for j in self.active_jobs()}
+
+    def foreground_job(self):
+        for job in self.active_jobs():
+            if job.foreground: return job
+        return None
+
+    def set_foreground(self, job):
+        with self._lock:
+            for other in self.jobs:
+                other.foreground = (other is job)
+
+    def kill(self, job_id):
+        """终止任务：排队中的直接移除，运行中的在下一个 step 检查点退出"""
+        finished = None
+        with self._lock:
+            job = self.get(job_id)
+            if not job or job.state not in ("queued", "running"):
+                return None
+            job.cancel_reason = "kill"
+            job.cancel_event.set()
+            if job.state == "queued":
+                job.state = "killed"
+                finished = job.ui['finished']
+        # 回调在锁外执行：UI 回调里再调用调度器 (或等待别的线程调用) 也不会死锁
+        if finished: finished(_killed_result(job.run_kwargs, 0.0))
+        return job
+
+    def shutdown(self, timeout=1.0):
+        """程序退出时调用：运行中的任务写入断点后退出 (不结算)，排队中的丢弃"""
+        with self._lock:
+            running = [j for j in self.jobs if j.state == "running"]
+            for job in self.jobs:
+                if job.state in ("queued", "running"):
+                    job.cancel_reason = "shutdown"
+                    job.cancel_event.set()
+                    if job.state == "queued": job.state = "killed"
+            threads = [j.thread for j in running if j.thread is not None]
+        deadline = time.monotonic() + timeout
+        for t in threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+
+    def _schedule(self):
+        with self._lock:
+            running = [j for j in self.jobs if j.state == "running"]
+            queued = sorted((j for j in self.jobs if j.state == "queued"),
+                            key=lambda j: (-j.priority, j.job_id))
+            while queued and len(running) < self.max_running:
+                job = queued.pop(0)
+                job.state = "running"
+                running.append(job)
+                job.thread = threading.Thread(target=self._run_job, args=(job,), daemon=True)
+                job.thread.start()
+            self._rebalance(running)
+
+    def _rebalance(self, running):
+        total = sum(j.priority for j in running)
+        for job in running:
+            job.share = job.priority / total
+
+    def _run_job(self, job):
+        try:
+            _run_training_loop(ui=job.ui, job=job, **job.run_kwargs)
+        except Exception as e:
+            # 主循环以外 (准备 / 验证结算) 出错也要回调 finished，否则前台一直锁在训练模式
+            job.ui['print'](f"[ERR] Training failed: {e}", "error")
+            job.ui['set_mini_mode'](False)
+            job.ui['finished'](_error_result(e, 0.0))
+        finally:
+            with self._lock:
+                job.state = "killed" if job.cancel_event.is_set() else "done"
+                self.jobs = [j for j in self.jobs if j.state in ("queued", "running") or j is job]
+                self._schedule()
+
+scheduler = JobScheduler()
+
+def _error_result(e, minutes):
+    return {
+        "success": False,
+        "accuracy": 0.0,
+        "fail_reason": f"Training interrupted: {e}",
+        "rank_mult": 1.0,
+        "total_minutes": minutes
+    }
 
-    threading.Thread(target=_run_training_loop, 
-                     args=(game_data, model, epochs, learning_rate, mins_per_epoch, ui_callbacks), 
-                     daemon=True).start()
+def _killed_result(run_kwargs, minutes):
+    return {
+        "success": False,
+        "killed": True,
+        "accuracy": 0.0,
+        "fail_reason": "Killed by user",
+        "rank_mult": 1.0,
+        "total_minutes": minutes,
+        "progress": 0.0,
+        "is_mission": run_kwargs['model'].get('__mission_reqs') is not None,
+        "seed": run_kwargs.get('seed'),
+        "session_id": run_kwargs.get('session_id')
+    }
+
+def _headless_ui():
+    """无头模式下的 UI 回调：全部丢弃"""
+    noop = lambda *args, **kwargs: None
+    return {'print': noop, 'update_bar': noop, 'set_mini_mode': noop, 'finished': noop}
+
+def run_headless(game_data, selected_option, user_epochs=None, user_lr=None, guard=None, seed=None):
+    """
+    无头模式：不需要 Tk 窗口，在虚拟时钟上跑完一次完整训练。
+    返回 {"result": result_payload, "trace": [(t_ms, epoch, step, loss), ...]}
+    guard: 违规检测函数，默认视为从不违规 (签名同 process_guard.check_violation)
+    """
+    model = selected_option['model']
+    mins_per_epoch = selected_option['mins_per_epoch']
+    epochs, learning_rate = _resolve_params(selected_option, user_epochs, user_lr)
+
+    trace = []
+    result = _run_training_loop(game_data, model, epochs, learning_rate, mins_per_epoch, _headless_ui(),
+                                clock=VirtualClock(), guard=guard or _no_violation,
+                                render_interval=None, trace=trace, seed=seed)
+    return {"result": result, "trace": trace}
+
+def _run_training_loop(game_data, model, epochs, learning_rate, mins_per_epoch, ui,
+                       clock=None, guard=None, render_interval=0.1, trace=None, seed=None, session_id=None,
+                       checkpoint=False, resume=None, job=None):
+    """
+    训练主循环。
+    clock: 时钟对象 (默认 WallClock)；render_interval 为 None 时不刷新进度条
+           (只在违规检测 / epoch 边界 / 断点处与时钟对齐)
+    trace: 传入 list 时，每个 step 结束后追加 (t_ms, epoch, step, loss)
+    seed: 会话种子，Loss 轨迹与验证阶段的随机数都从它派生 (None 则随机生成)
+    session_id: 不为 None 时，结束后把会话写入 save/traces/<session_id>.satr
+    checkpoint: 为 True 时每隔 CHECKPOINT_INTERVAL 秒写入断点，正常结束后删除
+    resume: 断点数据 (load_checkpoint 的返回值)，从断点记录的 step 继续
+    job: 所属的 TrainingJob，用于读取算力份额、上报进度和响应 kill (kill 时以已完成的进度结算)
+    """
+    clock = clock or WallClock()
+    guard = guard or process_guard.check_violation
+    if seed is None: seed = new_seed()
+    rng = derive_rng(seed, "validation")
+    # 会话期间只读这份快照 (strict_mode / gpu_level / dataset ...)，不与 Tk 线程共用可变的存档
+    game_data = snapshot(game_data)
 
-def _run_training_loop(game_data, model, epochs, learning_rate, mins_per_epoch, ui):
     ui['set_mini_mode'](True)
-    time.sleep(0.5)
+    clock.sleep(0.5)
+    session_start = clock.now()
 
-    gpu_idx = game_data.get('gpu_level', 0)
-    gpu_name = HARDWARE[min(gpu_idx, len(HARDWARE)-1)]['name']
+    gpu = current_hardware(game_data)
+    gpu_name = gpu['name']
     
     # --- 0. 识别任务类型 ---
     mission_reqs = model.get('__mission_reqs') 
@@ -104,46 +455,157 @@ def _run_training_loop(game_data, model, epochs, learning_rate, mins_per_epoch,
     base_step_delay = (mins_per_epoch * 60) / steps_per_epoch
     if base_step_delay < 0.01: base_step_delay = 0.01
 
+    # 整个会话的 Loss / 耗时轨迹一次性预计算，循环里只做取值
+    trajectory = generate_trajectory(base_loss, target_loss, learning_rate, epochs,
+                                     steps_per_epoch, base_step_delay,
+                                     seed=derive_np_rng(seed, "trajectory"))
+    loss_seq = trajectory['display_loss'].tolist()
+    delay_seq = trajectory['step_delay'].tolist()
+
+    # sysctl kernel.train_backend=numpy：在 CPU 上真实训练一个小型自注意力模型，
+    # 进度条显示真实 loss / it/s；节奏与结算仍沿用模拟轨迹 (奖励规则不变)
+    # dataset mount <name>：每个 step 消费一个从 memmap 分片预取的真实 batch
+    dataset = None
+    if game_data.get('dataset'):
+        try:
+            dataset = MemmapDataset(game_data['dataset'])
+        except ValueError as e:
+            ui['print'](f"[WARN] {e}, using synthetic data", "warn")
+
+    backend = None
+    if game_data.get('train_backend') == "numpy":
+        from .attention_backend import AttentionBackend
+        backend = AttentionBackend(model, seed, learning_rate=learning_rate,
+                                   vocab_size=dataset.vocab_size if dataset else 256)
+        ui['print'](backend.describe())
+
+    prefetcher = None
+    if dataset:
+        prefetcher = BatchPrefetcher(dataset, backend.batch_size if backend else 8,
+                                     backend.model.seq_len if backend else 128,
+                                     derive_np_rng(seed, "dataset"))
+        if backend: backend.batch_source = prefetcher
+        ui['print'](f"[DATA] {dataset.name}: {dataset.index['total_tokens']:,} tokens in {len(dataset.shards)} shard(s), "
+                    f"batch {prefetcher.batch_tokens} tokens")
+
     current_loss = base_loss
     focus_violation_count = 0
+    violation_ticks = []
 
     # [新增] 平滑参数，模仿tqdm
     smoothing = 0.3
     avg_speed = None 
 
+    # 断点续训：模拟轨迹由种子重新生成，只需恢复计数器；
+    # 真实后端算出的 loss 无法由种子重现，断点里存了已完成部分，原样放回 (权重不存断点，从种子初始化重新开始)
+    start_step = 0
+    if resume:
+        start_step = resume['global_step']
+        if resume.get('backend') == "numpy" and 'losses' not in resume:
+            raise ValueError("checkpoint from the numpy backend has no recorded losses, cannot resume")
+        if 'losses' in resume:
+            real_losses = resume['losses'][:start_step]
+            loss_seq[:len(real_losses)] = real_losses
+        current_loss = resume['current_loss']
+        focus_violation_count = resume['focus_violation_count']
+        violation_ticks = list(resume.get('violation_ticks', []))
+        avg_speed = resume.get('avg_speed')
+        ui['print'](f"[RESUME] Restored checkpoint at epoch {start_step // steps_per_epoch + 1}, step {start_step % steps_per_epoch}", "warn")
+
+    def write_checkpoint(next_step):
+        state = {
+            "session_id": session_id, "seed": seed, "model": model, "epochs": epochs,
+            "learning_rate": learning_rate, "mins_per_epoch": mins_per_epoch,
+            "global_step": next_step, "current_loss": current_loss,
+            "focus_violation_count": focus_violation_count,
+            "violation_ticks": violation_ticks, "avg_speed": avg_speed
+        }
+        if backend is not None:
+            state["backend"] = "numpy"
+            state["losses"] = [float(v) for v in loss_seq[:next_step]]
+        save_checkpoint(state)
+    # 进度条尾部的 Loss 火花线 (容量固定，渲染成本与步数无关)；无头模式不需要
+    loss_history = LossHistory() if render_interval is not None else None
+    if loss_history is not None:
+        for i in range(start_step): loss_history.append(i + 1, loss_seq[i])
+
+    last_checkpoint = clock.now()
+    killed = False
+    total_steps = epochs * steps_per_epoch
+    steps_done = start_step
+    strict = game_data.get('strict_mode', False)
+    cancel_event = job.cancel_event if job is not None else threading.Event()
+    events = None
+
     try:
+        # TensorBoard 标量：save/runs/<session_id>，训练线程只负责入队 (目录不可写等错误按训练中断处理)
+        if session_id: events = EventWriter(session_id)
+
         # ==================== MAIN LOOP ====================
-        for current_epoch in range(1, epochs + 1):
+        # 每个 step 有一个绝对截止时间 (deadline)，线程只在「需要渲染」或「需要观察」时醒来：
+        # 不会因为反复 sleep 累积误差，后台任务几乎不占用唤醒次数，kill/Ctrl-C 立即生效。
+        deadline = clock.now()
+        next_render = deadline
+
+        def render_bar():
+            # 格式: 100%|██████████| 50/50 [00:02<00:00, 24.32it/s, loss=0.0123]
+            # 注意：这里直接使用当前 step 算好的 avg_speed 和 eta，不在等待期间变动
+            current_step_count = step + 1
+            percent = int(current_step_count / steps_per_epoch * 100)
+            bar_str = _make_progress_bar(percent, length=20)
+            data_str = ""
+            if prefetcher is not None:
+                data_str = (f", {_fmt_rate(avg_speed * prefetcher.batch_bytes)}B/s"
+                            f", {_fmt_rate(avg_speed * prefetcher.batch_tokens)}tok/s")
+            info_str = f"{percent:>3}%|{bar_str}| {current_step_count}/{steps_per_epoch} [{_fmt(clock.now() - epoch_start)}<{_fmt(eta)}, {avg_speed:.2f}it/s{data_str}, loss={display_loss:.4f}] {loss_history.sparkline(SPARK_WIDTH)}"
+            ui['update_bar'](info_str)
+
+        for current_epoch in range(start_step // steps_per_epoch + 1, epochs + 1):
+            if killed: break
             ui['print'](f"Epoch {current_epoch}/{epochs}")
             
-            epoch_start = time.time()
+            epoch_first = (current_epoch - 1) * steps_per_epoch
+            first_step = max(0, start_step - epoch_first)
+            # 续训时把本 epoch 已完成部分的耗时计入 elapsed
+            epoch_start = clock.now() - sum(delay_seq[epoch_first:epoch_first + first_step])
             
-            for step in range(steps_per_epoch):
+            for step in range(first_step, steps_per_epoch):
+                if cancel_event.is_set():
+                    killed = True
+                    break
+
                 # 严格模式检测
-                if game_data.get('strict_mode', False) and step % 15 == 0:
-                    violation, _ = process_guard.check_violation()
-                    if violation: focus_violation_count += 1
-
-                # 模拟 Loss 曲线
-                total_progress = ((current_epoch - 1) * steps_per_epoch + step) / (epochs * steps_per_epoch)
-                decay = math.exp(-4.0 * total_progress) 
-                ideal_val = target_loss + (base_loss - target_loss) * decay
-                
-                noise_scale = instability * 0.05 * (decay + 0.1) 
-                noise = random.uniform(-noise_scale, noise_scale)
-                if random.random() < (learning_rate * 10): 
-                    noise += random.uniform(0.1, 0.5)
-                
-                display_loss = max(0.0001, ideal_val + noise)
+                global_step = (current_epoch - 1) * steps_per_epoch + step
+                if strict and step % 15 == 0:
+                    violation, _ = guard()
+                    if violation:
+                        focus_violation_count += 1
+                        violation_ticks.append(global_step)
+                        if events: events.add_scalar("train/focus_violations", focus_violation_count, global_step + 1)
+
+                # 模拟 Loss 曲线 (取预计算轨迹)；真实后端则跑一个训练 step
+                display_loss = loss_seq[global_step]
+                compute_time = None
+                if backend is not None:
+                    display_loss, compute_time = backend.train_step()
+                    loss_seq[global_step] = display_loss
+                elif prefetcher is not None:
+                    prefetcher.next_batch()
                 current_loss = display_loss 
                 
                 # --- [修正核心] 速度计算逻辑 ---
-                # 1. 计算当前Step预计耗时 (模拟真实运算时间)
-                step_sleep = base_step_delay * random.uniform(0.9, 1.1)
+                # 1. 当前Step预计耗时 (模拟真实运算时间)，多任务并行时按分到的算力放慢
+                step_sleep = delay_seq[global_step]
+                if job is not None:
+                    step_sleep /= job.share
+                    job.progress = (current_epoch, epochs, global_step + 1, total_steps, display_loss)
                 
                 # 2. 计算瞬时速度 (iteration per second)
                 # 避免除以0
                 curr_rate = 1.0 / step_sleep if step_sleep > 0 else 0.0
+                if compute_time is not None:
+                    # 真实计算比模拟节奏慢时，以真实速度为准
+                    curr_rate = min(curr_rate, 1.0 / max(compute_time, 1e-9))
                 
                 # 3. 使用指数移动平均 (EMA) 平滑速度，防止数字跳动
                 if avg_speed is None:
@@ -155,57 +617,89 @@ def _run_training_loop(game_data, model, epochs, learning_rate, mins_per_epoch,
                 steps_left = (steps_per_epoch - (step + 1))
                 eta = steps_left / avg_speed if avg_speed > 0 else 0
 
-                remaining_sleep = step_sleep
-                
-                # 在单个 step 等待期间刷新 UI
-                # 这里的循环只负责"走时间"，不应该重新计算速度，否则会导致速度在等待期间不断下降
-                while remaining_sleep > 0:
-                    chunk = min(0.1, remaining_sleep) # 刷新频率 10Hz
-                    time.sleep(chunk)
-                    remaining_sleep -= chunk
-                    
-                    # 实时更新经过的时间
-                    elapsed = time.time() - epoch_start
-                    current_step_count = step + 1
-                    
-                    # 构造 TQDM 风格字符串
-                    percent = int(current_step_count / steps_per_epoch * 100)
-                    bar_str = _make_progress_bar(percent, length=20)
-                    
-                    # 格式: 100%|██████████| 50/50 [00:02<00:00, 24.32it/s, loss=0.0123]
-                    # 注意：这里直接使用上面计算好的 avg_speed 和 eta，不在循环内变动
-                    info_str = f"{percent:>3}%|{bar_str}| {current_step_count}/{steps_per_epoch} [{_fmt(elapsed)}<{_fmt(eta)}, {avg_speed:.2f}it/s, loss={display_loss:.4f}]"
-                    
-                    ui['update_bar'](info_str)
+                deadline += step_sleep
+                if compute_time is not None:
+                    deadline = max(deadline, clock.now())
+                rendering = render_interval is not None and (job is None or job.foreground)
+
+                # 5. 等待：渲染到期就醒来刷新进度条，否则只在必须对齐真实时间的 step 上等待
+                #    (下一个 step 要做违规检测 / epoch 结束 / 需要写断点)
+                while rendering and next_render < deadline:
+                    if clock.wait(cancel_event, next_render - clock.now()):
+                        break
+                    render_bar()
+                    next_render = max(next_render + render_interval, clock.now())
+
+                must_align = (step == steps_per_epoch - 1
+                              or (strict and (step + 1) % 15 == 0)
+                              or (checkpoint and deadline - last_checkpoint >= CHECKPOINT_INTERVAL))
+                if must_align and not cancel_event.is_set():
+                    clock.wait(cancel_event, deadline - clock.now())
+                if cancel_event.is_set():
+                    killed = True
+                    break
+                steps_done = global_step + 1
+                if loss_history is not None: loss_history.append(steps_done, display_loss)
+                # step 很短时渲染间隔可能跳过 epoch 的最后一步：对齐的 step 总是补画一帧，epoch 结束时停在 100%
+                if rendering and must_align: render_bar()
+
+                if events:
+                    scalars = {"train/loss": display_loss, "train/it_per_sec": avg_speed}
+                    if prefetcher is not None: scalars["data/tokens_per_sec"] = avg_speed * prefetcher.batch_tokens
+                    events.add_scalars(scalars, steps_done)
+
+                if trace is not None:
+                    trace.append(((deadline - session_start) * 1000.0, current_epoch, step + 1, display_loss))
+
+                if checkpoint and deadline - last_checkpoint >= CHECKPOINT_INTERVAL:
+                    write_checkpoint(global_step + 1)
+                    last_checkpoint = deadline
 
     except Exception as e:
+        if prefetcher is not None: prefetcher.close()
+        if events: events.close()
         ui['print'](f"[ERR] Training interrupted: {e}", "error")
-        time.sleep(2)
+        clock.sleep(2)
+        error_result = _error_result(e, (clock.now() - session_start) / 60)
         ui['set_mini_mode'](False)
-        ui['finished'](error_result) # <--- 加上参数
-        return
+        ui['finished'](error_result)
+        return error_result
+
+    if prefetcher is not None: prefetcher.close()
+
+    # 程序退出：保留断点，下次 train --resume 继续，不产生结果
+    if killed and job is not None and job.cancel_reason == "shutdown":
+        if checkpoint: write_checkpoint(steps_done)
+        if events: events.close()
+        return None
+
+    progress_frac = steps_done / total_steps if total_steps else 1.0
+    if killed:
+        ui['print'](f"\n[INTERRUPTED] {model['name']} stopped at {progress_frac * 100:.1f}% ({steps_done}/{total_steps} steps).", "error")
+        if checkpoint: clear_checkpoint(session_id)
 
     # ================= 3. 验证与结算 (Validation Phase) =================
     
     ui['print']("\n" + "="*65)
     ui['print']("VALIDATING MODEL PERFORMANCE...")
-    time.sleep(1.0)
+    if not killed: clock.sleep(1.0)
     
     # --- 计算基础 Accuracy ---
-    hw_level = HARDWARE[min(gpu_idx, len(HARDWARE)-1)].get('level', 1)
+    hw_level = gpu.get('level', 1)
     
     base_score = 50.0 + (hw_level * 2) 
-    potential_score = 40.0 * potential_factor 
+    # 中途终止的会话只能兑现已完成部分的潜力
+    potential_score = 40.0 * potential_factor * progress_frac
     
     risk_penalty = 0
     crash_chance = max(0, (learning_rate - 0.003) * 100) 
     is_crashed = False
     
-    if random.random() * 100 < crash_chance:
+    if rng.random() * 100 < crash_chance:
         is_crashed = True
         risk_penalty = 50.0
     else:
-        risk_penalty = random.uniform(0, instability * 2.0)
+        risk_penalty = rng.uniform(0, instability * 2.0)
 
     final_acc = base_score + potential_score - risk_penalty - (focus_violation_count * 5)
     final_acc = max(10.0, min(99.9, final_acc))
@@ -216,22 +710,29 @@ def _run_training_loop(game_data, model, epochs, learning_rate, mins_per_epoch,
     else:
         steps_show = 8
         for i in range(steps_show):
-            curr = final_acc * ((i+1)/steps_show) + random.uniform(-2, 2)
+            curr = final_acc * ((i+1)/steps_show) + rng.uniform(-2, 2)
             curr = min(99.9, max(0, curr))
             ui['print'](f">> Validation Accuracy: {curr:.2f}%")
-            time.sleep(0.1)
+            if not killed: clock.sleep(0.1)
         
         color = "system"
         if final_acc >= 90: color = "success"
         elif final_acc < 60: color = "error"
         ui['print'](f">> FINAL ACCURACY: {final_acc:.2f}%", color)
 
+    # 整个会话的 Loss 曲线 (LTTB 降采样到图宽)
+    if render_interval is not None and steps_done > 1:
+        ui['print']("")
+        for line in braille_chart(loss_seq[:steps_done], width=CHART_WIDTH, height=6): ui['print'](line, "dim")
+
     # ================= 4. 判定胜利条件 =================
     
     success = False
     fail_reason = ""
 
-    if is_mission:
+    if killed:
+        fail_reason = f"Interrupted at {progress_frac * 100:.1f}%"
+    elif is_mission:
         req_acc = mission_reqs.get('target_acc')
         
         if req_acc is None:
@@ -268,11 +769,109 @@ def _run_training_loop(game_data, model, epochs, learning_rate, mins_per_epoch,
         "accuracy": final_acc,
         "fail_reason": fail_reason,
         "rank_mult": rank_mult,
-        "total_minutes": epochs * mins_per_epoch # 也可以把统计数据传回去
+        "total_minutes": epochs * mins_per_epoch if not killed else (clock.now() - session_start) / 60,
+        "is_mission": is_mission,
+        "killed": killed,
+        "crashed": is_crashed,
+        "progress": progress_frac,
+        "seed": seed,
+        "session_id": session_id,
+        "model": model['name'],
+        "epochs": epochs,
+        "learning_rate": learning_rate,
+        "violations": focus_violation_count
     }
-    time.sleep(4)
+
+    if session_id:
+        try:
+            session_trace.save_trace(session_id, {
+                "model": model['name'], "seed": seed, "epochs": epochs,
+                "steps_per_epoch": steps_per_epoch, "mins_per_epoch": mins_per_epoch,
+                "learning_rate": learning_rate, "losses": loss_seq[:steps_done],
+                "violation_ticks": violation_ticks, "final_acc": final_acc,
+                "is_mission": is_mission, "success": success, "is_crashed": is_crashed
+            })
+        except Exception as e:
+            ui['print'](f"[WARN] Failed to write session trace: {e}", "warn")
+    if checkpoint:
+        clear_checkpoint(session_id)
+    if events:
+        events.add_scalars({"val/accuracy": final_acc, "val/crashed": float(is_crashed),
+                            "train/focus_violations": focus_violation_count}, steps_done)
+        events.close()
+
+    if not killed: clock.sleep(4)
     ui['set_mini_mode'](False)
     ui['finished'](result_payload)
+    return result_payload
+
+
+# ================= 复盘 (Replay) =================
+
+def start_replay(session_id, speed, ui_callbacks):
+    """后台线程复盘一条会话记录，不重新计算任何数值"""
+    trace = session_trace.load_trace(session_id)
+    if trace is None:
+        return False
+
+    def _replay():
+        try:
+            _run_replay(trace, speed, ui_callbacks)
+        except Exception as e:
+            # 出错也要回调 finished，否则命令行一直处于锁定状态
+            ui_callbacks['print'](f"[ERR] Replay interrupted: {e}", "error")
+            ui_callbacks['finished'](trace)
+
+    threading.Thread(target=_replay, daemon=True).start()
+    return True
+
+def _run_replay(trace, speed, ui, clock=None, max_fps=20):
+    """
+    按记录的 Loss 序列重新渲染进度条。
+    speed: 播放倍速 (相对原始专注时长)，<= 0 表示瞬间播完
+    """
+    clock = clock or WallClock()
+    losses = trace['losses']
+    steps_per_epoch = trace['steps_per_epoch']
+    ticks = set(trace['violation_ticks'].tolist())
+
+    step_delay = max(0.01, trace['mins_per_epoch'] * 60 / steps_per_epoch)
+    play_delay = step_delay / speed if speed > 0 else 0.0
+    # 每帧至少 1/max_fps 秒，倍速很高时跳过中间的 step
+    stride = max(1, int(math.ceil((1.0 / max_fps) / play_delay))) if play_delay > 0 else steps_per_epoch
+
+    ui['print'](f"\n[REPLAY] {trace['session_id']} | {trace['model']} | LR: {trace['learning_rate']:.6g} | seed={trace['seed']:08x}")
+    ui['print']("-" * 65)
+
+    for epoch_idx in range(trace['epochs']):
+        first = epoch_idx * steps_per_epoch
+        if first >= len(losses): break
+        ui['print'](f"Epoch {epoch_idx + 1}/{trace['epochs']}")
+        last = min(first + steps_per_epoch, len(losses))
+
+        for global_step in range(first, last):
+            if global_step in ticks:
+                ui['print'](f"[GUARD] Focus violation at step {global_step - first + 1}", "error")
+            local = global_step - first + 1
+            if local % stride == 0 or global_step == last - 1:
+                clock.sleep(play_delay * stride)
+                percent = int(local / steps_per_epoch * 100)
+                elapsed = local * step_delay
+                eta = (steps_per_epoch - local) * step_delay
+                info_str = f"{percent:>3}%|{_make_progress_bar(percent, length=20)}| {local}/{steps_per_epoch} [{_fmt(elapsed)}<{_fmt(eta)}, {1.0 / step_delay:.2f}it/s, loss={float(losses[global_step]):.4f}]"
+                ui['update_bar'](info_str)
+
+    ui['print']("\n" + "="*65)
+    if trace['is_crashed']:
+        ui['print'](">> Validation Accuracy: NaN (Model Diverged)", "error")
+    else:
+        ui['print'](f">> FINAL ACCURACY: {trace['final_acc']:.2f}%", "success" if trace['success'] else "error")
+    verdict = "SUCCESS" if trace['success'] else "FAILED"
+    kind = "Mission" if trace['is_mission'] else "Free training"
+    ui['print'](f"[REPLAY] {kind} | {verdict} | {len(trace['violation_ticks'])} violation(s)", "dim")
+    if len(losses) > 1:
+        for line in braille_chart(losses, width=CHART_WIDTH, height=6): ui['print'](line, "dim")
+    ui['finished'](trace)
 
 
 def _make_progress_bar(percent, length=20):
@@ -283,4 +882,10 @@ def _make_progress_bar(percent, length=20):
 
 def _fmt(seconds):
     m, s = divmod(int(seconds), 60)
-    return f"{m:02d}:{s:02d}"
\ No newline at end of file
+    return f"{m:02d}:{s:02d}"
+
+def _fmt_rate(value):
+    for unit in ("", "k", "M", "G"):
+        if value < 1000: return f"{value:.1f}{unit}"
+        value /= 1000.0
+    return f"{value:.1f}T"
\ No newline at end of file
@@ -0,0 +1,75 @@
+# module/transcript.py
+# 终端回滚记录：超出行数上限、被挤出文本框的旧行按块压缩后追加到磁盘，需要时按页读回。
+# 文件格式: 重复的 [行数 u32][压缩长度 u32][crc32 u32][zlib(UTF-8 文本)]，只追加，不改写。
+import os
+import struct
+import threading
+import time
+import zlib
+
+_BLOCK_HEADER = struct.Struct("<III")
+
+
+class Transcript:
+    """
+    一个终端会话一个文件 (save/transcripts/<开始时间>.transcript)。
+    内存里只保留每个块的 (文件偏移, 起始行号, 行数)，读回时只解压用到的块。
+    """
+    def __init__(self, root, name=None):
+        self.root = root
+        name = name or time.strftime("%Y%m%d-%H%M%S")
+        self.path = os.path.join(root, f"{name}.transcript")
+        self.lock = threading.Lock()
+        self.blocks = []        # [(offset, first_line, n_lines)]
+        self.lines = 0
+        if os.path.exists(self.path): self._scan()
+
+    def _scan(self):
+        """重新打开已有文件时重建块索引；尾部写坏的块截掉"""
+        with open(self.path, 'rb') as f:
+            raw = f.read()
+        offset = 0
+        while offset + _BLOCK_HEADER.size <= len(raw):
+            n_lines, length, crc = _BLOCK_HEADER.unpack_from(raw, offset)
+            body = raw[offset + _BLOCK_HEADER.size: offset + _BLOCK_HEADER.size + length]
+            if len(body) < length or zlib.crc32(body) != crc: break
+            self.blocks.append((offset, self.lines, n_lines))
+            self.lines += n_lines
+            offset += _BLOCK_HEADER.size + length
+        if offset < len(raw):
+            with open(self.path, 'r+b') as f: f.truncate(offset)
+
+    def append(self, text):
+        """追加一段被挤出的文本 (整行，以换行结尾)"""
+        n_lines = text.count("\n")
+        if not n_lines: return
+        body = zlib.compress(text.encode('utf-8'), 6)
+        with self.lock:
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(_BLOCK_HEADER.pack(n_lines, len(body), zlib.crc32(body)) + body)
+            self.blocks.append((offset, self.lines, n_lines))
+            self.lines += n_lines
+
+    def read_lines(self, start, count):
+        """第 start 行起 (0 起算，最早的一行为 0) 的至多 count 行"""
+        start = max(0, start)
+        end = min(self.lines, start + count)
+        out = []
+        with self.lock:
+            blocks = [b for b in self.blocks if b[1] < end and b[1] + b[2] > start]
+            if not blocks: return out
+            with open(self.path, 'rb') as f:
+                for offset, first, n_lines in blocks:
+                    f.seek(offset)
+                    _, length, _ = _BLOCK_HEADER.unpack(f.read(_BLOCK_HEADER.size))
+                    lines = zlib.decompress(f.read(length)).decode('utf-8').splitlines()
+                    out.extend(lines[max(0, start - first): end - first])
+        return out
+
+    def page(self, page, page_size=50):
+        """从最近被挤出的内容往回数的第 page 页 (1 起算)，返回 (行号, 行列表)"""
+        start = self.lines - page * page_size
+        count = page_size + min(0, start)
+        return max(0, start), self.read_lines(start, count) if count > 0 else []
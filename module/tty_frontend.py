@@ -0,0 +1,218 @@
+# module/tty_frontend.py
+# 普通终端前端 (python main.py --tty)：ANSI 彩色输出 + 行输入，不加载 customtkinter / Tk，
+# 可以在 SSH、容器和 CI 里跑完整的游戏。对 main.py 提供与 TerminalCore 相同的接口。
+import codecs
+import heapq
+import itertools
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+
+from .frontend import Frontend
+
+# 与 TerminalCore._setup_tags 的配色对应
+_COLORS = {"dir": "94", "exe": "92", "error": "91", "warn": "93", "system": "96", "dim": "90"}
+
+PROGRESS_INTERVAL = 0.1     # 进度行每秒最多重画 10 次 (SSH 下每次重画都是一次网络往返)
+
+
+class _NoOverlay:
+    """终端里没有置顶小窗：进度条本来就在最后一行"""
+    visible = False
+
+    def show(self): pass
+
+    def hide(self): pass
+
+
+class TtyCore(Frontend):
+    """
+    单线程事件循环：after() 定时器 + 渲染泵，都在主线程执行；
+    stdin 由后台线程按行读取，经 post_call 交回主线程，Ctrl-C / Ctrl-Z 由信号处理转成同样的钩子。
+    终端自己保存回滚记录，这里不裁剪也不写 transcript。
+    """
+    def __init__(self, title="Terminal", width=None, height=None, scrollback=None, transcript=None):
+        self.out = sys.stdout
+        self.live = self.out.isatty()           # 非终端 (管道 / CI 日志) 不输出控制序列，进度条只打印最终状态
+        self.color = self.live and "NO_COLOR" not in os.environ
+        self.overlay = _NoOverlay()
+        self._timers = []                       # 堆 [(到期时间, 序号, fn, args)]
+        self._timer_seq = itertools.count()
+        self._handlers = {}
+        self._running = False
+        self._lines = 1
+        self._at_line_start = True
+        self._bar = None                        # (key, text)：正占着最后一行的进度条
+        self._bar_pending = {}                  # key -> 还没画的最新文本
+        self._bar_drawn_at = 0.0
+        self._bar_retry = False
+        self._setup_frontend()
+        self.title(title)
+
+    # ================= 输出 =================
+
+    def _emit(self, text, tag=None):
+        if not text: return
+        code = _COLORS.get(tag) if self.color else None
+        self.out.write(f"\x1b[{code}m{text}\x1b[0m" if code else text)
+        self._lines += text.count("\n")
+        self._at_line_start = text.endswith("\n")
+
+    def write(self, text, tag=None):
+        """追加文本 (在 buffered() 里时先进缓冲，退出时统一提交)"""
+        if self._write_buffer is not None:
+            self._write_buffer.append((text, tag))
+            return
+        self._end_bar_line()
+        self._emit(text, tag)
+        self.out.flush()
+
+    def write_many(self, pieces):
+        """[(text, tag), ...] 一次写出、一次 flush"""
+        self._end_bar_line()
+        for text, tag in pieces: self._emit(text, tag)
+        self.out.flush()
+
+    def clear_screen(self):
+        """清屏"""
+        if self._write_buffer: self._write_buffer.clear()
+        self._bar = None
+        self._bar_pending.clear()
+        if self.live: self.out.write("\x1b[2J\x1b[H")
+        self._at_line_start = True
+        self.out.flush()
+
+    def new_prompt(self, custom_text=None):
+        """输出提示符并解锁输入"""
+        self._flush_writes()
+        self._end_bar_line()
+        if not self._at_line_start: self._emit("\n")
+        self._emit(custom_text or self._prompt_text())
+        self.out.flush()
+        self.input_locked = False
+
+    def lock_input(self, locked=True):
+        self.input_locked = locked
+
+    def screen_lines(self):
+        """本次会话输出过的行数"""
+        return self._lines
+
+    # ================= 进度条 (最后一行回车重画) =================
+
+    def progress(self, key, text):
+        """进度条占最后一行，用 \\r 原地重画；其他输出到来时定格换行"""
+        self._bar_pending[key] = text
+        if self.live: self._paint_bars()
+
+    def progress_end(self, key):
+        """进度条定格为普通文本 (非终端输出时只打印这一次)"""
+        text = self._bar_pending.pop(key, None)
+        if text is not None: self._draw_bar(key, text)
+        if self._bar and self._bar[0] == key: self._end_bar_line()
+        self.out.flush()
+
+    def _paint_bars(self):
+        wait = self._bar_drawn_at + PROGRESS_INTERVAL - time.perf_counter()
+        if wait > 0:
+            if not self._bar_retry:
+                self._bar_retry = True
+                self.after(int(wait * 1000) + 1, self._retry_bars)
+            return
+        pending, self._bar_pending = self._bar_pending, {}
+        for key, text in pending.items(): self._draw_bar(key, text)
+        self._bar_drawn_at = time.perf_counter()
+        self.out.flush()
+
+    def _retry_bars(self):
+        self._bar_retry = False
+        if self._bar_pending: self._paint_bars()
+
+    def _draw_bar(self, key, text):
+        self._flush_writes()
+        if self._bar and self._bar[0] == key:
+            self.out.write(f"\r{text}\x1b[K")
+        else:
+            self._end_bar_line()
+            if not self._at_line_start: self._emit("\n")
+            self.out.write(text)
+        self._bar = (key, text)
+        self._at_line_start = False
+
+    def _end_bar_line(self):
+        if self._bar is None: return
+        self._bar = None
+        self._emit("\n")
+
+    # ================= Tk 兼容接口 (main.py 用到的窗口方法) =================
+
+    def after(self, ms, fn, *args):
+        heapq.heappush(self._timers, (time.monotonic() + ms / 1000, next(self._timer_seq), fn, args))
+
+    def title(self, text):
+        if self.live: self.out.write(f"\x1b]0;{text}\x07")
+
+    def attributes(self, *args):
+        pass
+
+    def protocol(self, name, fn):
+        self._handlers[name] = fn
+
+    def update(self):
+        self.out.flush()
+
+    def quit(self):
+        self._running = False
+
+    # ================= 事件循环 =================
+
+    def mainloop(self):
+        self._running = True
+        signal.signal(signal.SIGINT, lambda *_: self.post_call(self._on_interrupt))
+        if hasattr(signal, "SIGTSTP"):
+            signal.signal(signal.SIGTSTP, lambda *_: self.post_call(self.on_suspend))
+        threading.Thread(target=self._read_input, daemon=True).start()
+        while self._running:
+            due, _, fn, args = self._timers[0]
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+            heapq.heappop(self._timers)
+            # 和 Tk 一样：回调出错只打印，不中断主循环
+            try: fn(*args)
+            except Exception: traceback.print_exc()
+        if not self._at_line_start: self.out.write("\n")
+        self.out.flush()
+
+    def _read_input(self):
+        # 直接读文件描述符，不占 sys.stdin 的缓冲锁：退出时这个线程还阻塞在读上，解释器也能正常收尾
+        decoder = codecs.getincrementaldecoder(sys.stdin.encoding or "utf-8")(errors="replace")
+        pending = ""
+        while True:
+            try: chunk = os.read(sys.stdin.fileno(), 4096)
+            except OSError: chunk = b""
+            if not chunk:
+                # stdin 关闭 (Ctrl-D / 管道读完) 等同于关闭窗口
+                return self.post_call(self._handlers.get("WM_DELETE_WINDOW", self.quit))
+            *lines, pending = (pending + decoder.decode(chunk)).split("\n")
+            for line in lines: self.post_call(self._on_line, line.rstrip("\r"))
+
+    def _on_line(self, line):
+        if sys.stdin.isatty():
+            # 终端已经回显了这一行和换行
+            self._lines += 1
+            self._at_line_start = True
+        else: self._emit(line + "\n")      # 管道输入没有回显，补上方便看日志
+        if self.input_locked: return        # 和窗口版一样，锁定期间的输入丢弃
+        self._submit(line.strip())
+
+    def _on_interrupt(self):
+        if self.on_interrupt(): return
+        if not self.input_locked:
+            # 和 bash 一样：放弃当前行，重新给提示符
+            self.write("^C\n")
+            self.new_prompt()
@@ -0,0 +1,31 @@
+# tests/test_career_sim.py
+import math
+
+from module.career_sim import _percentiles, format_report
+
+
+def _career(*hours):
+    """第 i 个值为达到 Lv.i+1 的训练小时 (天数取同值)"""
+    level_at = {0: (0.0, 0.0)}
+    for lv, h in enumerate(hours, 1): level_at[lv] = (h, h)
+    return {"level_at": level_at, "tier_at": {0: (0.0, 0.0)}}
+
+
+def test_percentiles_are_monotone_with_censoring():
+    # 高等级只有少数「快」玩家达成：只按达成者统计会出现 Lv.3 p50 < Lv.2 p50
+    careers = [_career(1, 50)] * 6 + [_career(1, 2, 3)] * 4
+    levels = _percentiles(careers, "level_at")
+    assert levels[3][0] == 0.4
+    for q in (1, 2, 3):
+        column = [levels[lv][q] for lv in (1, 2, 3)]
+        assert column == sorted(column)
+    assert levels[2][2] == 50 and math.isinf(levels[3][2])
+
+
+def test_report_marks_censored_cells():
+    careers = [_career(1, 5)] * 2 + [_career(2)] * 8
+    report = {"levels": _percentiles(careers, "level_at"), "tiers": _percentiles(careers, "tier_at"),
+              "careers": 10, "sessions": 3, "days": 2, "stuck": 0.0, "elapsed": 0.1}
+    text = format_report(report, 100)
+    lv2 = next(line for line in text.splitlines() if line.startswith("Lv.2 "))
+    assert "20.0%" in lv2 and lv2.split()[-4:] == ["5.0", ">100", ">100", "-"]
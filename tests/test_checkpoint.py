@@ -0,0 +1,48 @@
+# tests/test_checkpoint.py
+import json
+
+import pytest
+
+from module import storage
+
+SID = "20240101_120000_ab12"
+
+
+@pytest.fixture
+def ckpt_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    return tmp_path
+
+
+def _ckpt(**extra):
+    ckpt = {"session_id": SID, "model": "gpt", "epochs": 2, "learning_rate": 0.01,
+            "mins_per_epoch": 1.0, "seed": 7, "global_step": 50}
+    ckpt.update(extra)
+    return ckpt
+
+
+def test_roundtrip_and_clear(ckpt_dir):
+    storage.save_checkpoint(_ckpt())
+    assert storage.list_checkpoints() == [SID]
+    assert storage.load_checkpoint()["global_step"] == 50
+    storage.clear_checkpoint(SID)
+    assert storage.load_checkpoint(SID) is None
+
+
+@pytest.mark.parametrize("bad", ["../cyber_save", "..", "a/b", "20240101_120000_ab12/../x", ""])
+def test_bad_session_ids_never_leave_checkpoint_dir(ckpt_dir, bad):
+    (ckpt_dir / "cyber_save.json").write_text(json.dumps(_ckpt()), encoding='utf-8')
+    assert storage.load_checkpoint(bad) is None
+    with pytest.raises(ValueError):
+        storage._checkpoint_path(bad)
+    storage.clear_checkpoint(bad)
+    assert (ckpt_dir / "cyber_save.json").exists()
+
+
+@pytest.mark.parametrize("missing", storage.CHECKPOINT_KEYS)
+def test_incomplete_checkpoint_is_ignored(ckpt_dir, missing):
+    ckpt = _ckpt()
+    del ckpt[missing]
+    (ckpt_dir / "checkpoints").mkdir()
+    (ckpt_dir / "checkpoints" / f"{SID}.json").write_text(json.dumps(ckpt), encoding='utf-8')
+    assert storage.load_checkpoint(SID) is None
@@ -0,0 +1,66 @@
+# tests/test_dataset_store.py
+import numpy as np
+import pytest
+
+from module import dataset_store
+from module.dataset_store import EOS_TOKEN, BatchPrefetcher, MemmapDataset, build_dataset
+
+
+@pytest.fixture
+def dataset_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_store, "DATASET_DIR", str(tmp_path / "datasets"))
+    monkeypatch.setattr(dataset_store, "TASKS_DATA", {})
+    return tmp_path
+
+
+def _build(tmp_path, name="corpus", text="abcdefghij" * 20):
+    src = tmp_path / "src"
+    src.mkdir(exist_ok=True)
+    (src / "a.txt").write_text(text, encoding='utf-8')
+    (src / "skip.bin").write_bytes(b"\0\1")
+    return build_dataset(name, str(src))
+
+
+@pytest.mark.parametrize("name", ["", "..", "a/b", "../x", "-x", "a" * 65])
+def test_rejects_bad_names(dataset_dir, name):
+    with pytest.raises(ValueError):
+        dataset_store.dataset_path(name)
+
+
+def test_build_writes_index_and_tokens(dataset_dir):
+    index = _build(dataset_dir)
+    assert index["documents"] == 1 and index["total_tokens"] == 201
+    ds = MemmapDataset("corpus")
+    tokens = np.concatenate([np.asarray(s) for s in ds.shards])
+    assert tokens[-1] == EOS_TOKEN
+    assert bytes(tokens[:10].astype(np.uint8)) == b"abcdefghij"
+
+
+def test_sample_batch_is_contiguous(dataset_dir):
+    _build(dataset_dir, text="".join(chr(97 + i % 26) for i in range(300)))
+    ds = MemmapDataset("corpus")
+    batch = ds.sample_batch(np.random.default_rng(0), 8, 16)
+    assert batch.shape == (8, 17) and batch.dtype == np.int64
+    for row in batch:
+        letters = row[row != EOS_TOKEN]
+        assert np.all((np.diff(letters) - 1) % 26 == 0)     # 原文里连续的一段
+
+
+def test_sample_batch_too_short(dataset_dir):
+    _build(dataset_dir, text="abc")
+    with pytest.raises(ValueError):
+        MemmapDataset("corpus").sample_batch(np.random.default_rng(0), 1, 16)
+
+
+def test_prefetcher_serves_batches_and_closes(dataset_dir):
+    _build(dataset_dir)
+    prefetcher = BatchPrefetcher(MemmapDataset("corpus"), 4, 8, np.random.default_rng(1), depth=2)
+    try:
+        for _ in range(5):
+            assert prefetcher.next_batch().shape == (4, 9)
+        assert prefetcher.tokens_served == 5 * 4 * 9
+        with pytest.raises(ValueError):
+            prefetcher.next_batch(batch_size=2)
+    finally:
+        prefetcher.close()
+    assert not prefetcher.thread.is_alive()
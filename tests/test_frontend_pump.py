@@ -0,0 +1,93 @@
+# tests/test_frontend_pump.py
+import threading
+import time
+
+from module import frontend
+from module.frontend import Frontend
+
+
+class FakeFrontend(Frontend):
+    """只记录输出；after() 不真正定时，测试里手动调用 _pump()"""
+    def __init__(self):
+        self.out = []
+        self.inserts = 0
+        self.timers = []
+        self._setup_frontend()
+
+    def after(self, ms, fn, *args):
+        self.timers.append(fn)
+
+    def write(self, text, tag=None):
+        if self._write_buffer is not None:
+            self._write_buffer.append((text, tag))
+            return
+        self.write_many([(text, tag)])
+
+    def write_many(self, pieces):
+        self.inserts += 1
+        self.out.extend(pieces)
+
+
+def test_pump_keeps_order_and_batches_one_frame():
+    ui = FakeFrontend()
+    calls = []
+    ui.post_write("a")
+    ui.post_call(calls.append, len(ui.out))
+    ui.post_write("b", "dim")
+    ui._pump()
+    assert ui.out == [("a", None), ("b", "dim")]
+    assert ui.inserts == 1                  # 整帧一次提交
+    assert calls == [0]                     # call 执行时 "a" 还在缓冲里
+    assert ui.timers[-1] == ui._pump        # 泵会重新排下一帧
+
+
+def test_post_latest_coalesces():
+    ui = FakeFrontend()
+    seen = []
+    for i in range(100):
+        ui.post_latest("bar", seen.append, i)
+    assert len(ui._ui_queue) == 1
+    ui._pump()
+    assert seen == [99]
+
+
+def test_frame_char_budget(monkeypatch):
+    monkeypatch.setattr(frontend, "FRAME_CHARS", 10)
+    ui = FakeFrontend()
+    for _ in range(5): ui.post_write("x" * 6)
+    ui._pump()
+    assert len(ui.out) == 2                 # 超出字符预算的留到下一帧
+    ui._pump()
+    ui._pump()
+    assert len(ui.out) == 5
+
+
+def test_background_thread_blocks_when_queue_full(monkeypatch):
+    monkeypatch.setattr(frontend, "UI_QUEUE_MAX", 4)
+    ui = FakeFrontend()
+    done = threading.Event()
+
+    def producer():
+        for i in range(10): ui.post_write(str(i))
+        done.set()
+
+    t = threading.Thread(target=producer, daemon=True)
+    t.start()
+    time.sleep(0.2)
+    assert not done.is_set()                # 队列满：后台线程在等
+    assert len(ui._ui_queue) == 4
+    deadline = time.monotonic() + 5
+    while not done.is_set() and time.monotonic() < deadline:
+        ui._pump()
+        time.sleep(0.01)
+    ui._pump()
+    t.join(1)
+    assert done.is_set()
+    assert "".join(text for text, _ in ui.out) == "0123456789"
+
+
+def test_main_thread_never_blocks(monkeypatch):
+    monkeypatch.setattr(frontend, "UI_QUEUE_MAX", 2)
+    ui = FakeFrontend()
+    for i in range(5): ui.post_write(str(i))     # 主线程投递不等待
+    assert len(ui._ui_queue) == 5
@@ -0,0 +1,46 @@
+# tests/test_game_state.py
+from module.game_state import GameState, plain_snapshot, snapshot
+from module.state_types import IdSet
+
+
+def test_dirty_keys_and_notify():
+    state = GameState(level=1)
+    seen = []
+    state.subscribe(seen.append, keys={"level"})
+    state["level"] = 2
+    state["coins"] = 5
+    assert seen == [{"level"}]
+    assert state.take_dirty() == {"level", "coins"}
+    assert state.take_dirty() == set()
+
+
+def test_batch_notifies_once():
+    state = GameState()
+    seen = []
+    state.subscribe(seen.append)
+    with state.batch():
+        state["a"] = 1
+        state["b"] = 2
+    assert seen == [{"a", "b"}]
+
+
+def test_snapshot_is_deep():
+    state = GameState(inbox=[{"id": "1", "read": False}], received_mail_ids=IdSet(["001"]))
+    snap = state.snapshot()
+    state["inbox"][0]["read"] = True
+    state["received_mail_ids"].add("002")
+    assert snap["inbox"][0]["read"] is False
+    assert "002" not in snap["received_mail_ids"]
+
+
+def test_plain_snapshot():
+    state = GameState(level=3, received_mail_ids=IdSet(["x"]))
+    assert plain_snapshot(state, ["received_mail_ids", "missing"]) == {"received_mail_ids": {"ids": ["x"]}}
+    assert plain_snapshot(dict(state)) == {"level": 3, "received_mail_ids": {"ids": ["x"]}}
+
+
+def test_snapshot_of_plain_dict_is_deep():
+    data = {"inbox": [{"id": "1"}]}
+    snap = snapshot(data)
+    data["inbox"].append({"id": "2"})
+    assert len(snap["inbox"]) == 1
@@ -0,0 +1,49 @@
+# tests/test_headless.py
+import pytest
+
+from module.train import VirtualClock, run_headless
+
+GAME_DATA = {"gpu_level": 0, "level": 1, "focus_duration": 25, "strict_mode": False}
+OPTION = {"model": {"name": "Test-Net", "base_ops": 100, "difficulty": 1}, "mins_per_epoch": 0.5, "auto_epochs": 3}
+
+
+def test_virtual_clock_never_blocks():
+    clock = VirtualClock(start=10.0)
+    clock.sleep(3600)
+    clock.sleep(-5)
+    assert clock.now() == 3610.0
+
+
+def test_same_seed_same_session():
+    first = run_headless(GAME_DATA, OPTION, user_epochs=4, user_lr=0.002, seed=1234)
+    second = run_headless(GAME_DATA, OPTION, user_epochs=4, user_lr=0.002, seed=1234)
+    assert first["result"] == second["result"]
+    assert first["trace"] == second["trace"]
+    other = run_headless(GAME_DATA, OPTION, user_epochs=4, user_lr=0.002, seed=4321)
+    assert [t[3] for t in other["trace"]] != [t[3] for t in first["trace"]]
+
+
+def test_trace_covers_session_in_virtual_time():
+    run = run_headless(GAME_DATA, OPTION, user_epochs=4, seed=7)
+    trace = run["trace"]
+    assert len(trace) == 4 * 100
+    assert [t[1] for t in trace[::100]] == [1, 2, 3, 4]
+    assert trace[-1][1:3] == (4, 100)
+    # 每步耗时在基准的 ±10% 内抖动，总时长约为 epochs * mins_per_epoch
+    assert trace[-1][0] / 60000 == pytest.approx(4 * OPTION["mins_per_epoch"], rel=0.02)
+    assert all(b[0] > a[0] for a, b in zip(trace, trace[1:]))
+
+
+def test_result_has_fields_the_ui_reads():
+    result = run_headless(GAME_DATA, OPTION, seed=99)["result"]
+    for key in ("success", "is_mission", "rank_mult", "total_minutes"):
+        assert key in result
+    assert result["is_mission"] is False
+    assert result["total_minutes"] == pytest.approx(3 * OPTION["mins_per_epoch"])
+    assert result["seed"] == 99 and result["progress"] == 1.0
+
+
+def test_strict_mode_counts_guard_violations():
+    data = dict(GAME_DATA, strict_mode=True)
+    run = run_headless(data, OPTION, user_epochs=1, seed=5, guard=lambda: (True, "game.exe"))
+    assert run["result"]["violations"] == 7      # step 0, 15, ..., 90
@@ -0,0 +1,79 @@
+# tests/test_history_store.py
+import os
+
+import numpy as np
+import pytest
+
+from module.history_store import COLUMNS, HistoryStore
+
+DAY = 86400
+T0 = 1_700_000_000
+
+
+def _failing_meta_save(store, fail_on):
+    """第 fail_on 次 _save_meta 抛异常，模拟在那一步之前崩溃"""
+    real, calls = store._save_meta, [0]
+
+    def save():
+        calls[0] += 1
+        if calls[0] == fail_on: raise RuntimeError("crash")
+        real()
+    store._save_meta = save
+
+
+def test_append_and_query(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append("gpt", 3, 0.01, 25.0, 0.8, success=True, ts=T0)
+    store.append("gpt", 1, 0.01, 10.0, 0.6, ts=T0 + 2 * DAY)
+    store.append("cnn", 2, 0.02, 5.0, 0.5, violations=2, ts=T0 + 2 * DAY)
+
+    reopened = HistoryStore(str(tmp_path))
+    assert len(reopened) == 3
+    cols = reopened.columns()
+    assert list(cols["model"]) == [0, 0, 1]
+    assert reopened.daily_series(3, now=T0 + 2 * DAY) == [25.0, 0.0, 15.0]
+    total = reopened.last_days(3, now=T0 + 2 * DAY)
+    assert total["sessions"] == 3 and total["successes"] == 1 and total["violations"] == 2
+    assert reopened.per_model()["gpt"]["sessions"] == 2
+    assert reopened.per_model()["gpt"]["best"] == pytest.approx(0.8)
+
+
+def test_repair_truncates_uneven_columns(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    store.append("gpt", 1, 0.01, 1.0, 0.5, ts=T0)
+    with open(os.path.join(str(tmp_path), "ts.col"), 'ab') as f:
+        f.write(b"\0" * 8)                  # 崩溃前多写了一列
+
+    reopened = HistoryStore(str(tmp_path))
+    for name, dtype in COLUMNS.items():
+        assert os.path.getsize(reopened._col_path(name)) == np.dtype(dtype).itemsize
+
+
+@pytest.mark.parametrize("ts", [T0 + 60, T0 + 3 * DAY])     # 改写已有的一天 / 扩展文件
+def test_repair_rolls_back_uncommitted_rollup(tmp_path, ts):
+    store = HistoryStore(str(tmp_path))
+    store.append("gpt", 1, 0.01, 2.0, 0.5, success=True, ts=T0)
+    daily_size = os.path.getsize(store.daily_path)
+
+    crashing = HistoryStore(str(tmp_path))
+    _failing_meta_save(crashing, fail_on=2)   # daily.bin 已改写，行还没提交
+    with pytest.raises(RuntimeError):
+        crashing.append("gpt", 1, 0.01, 3.0, 0.7, ts=ts)
+
+    reopened = HistoryStore(str(tmp_path))
+    assert len(reopened) == 1
+    assert "rollup" not in reopened.meta
+    assert os.path.getsize(reopened.daily_path) == daily_size
+    assert reopened.last_days(5, now=T0 + 3 * DAY)["minutes"] == pytest.approx(2.0)
+    assert os.path.getsize(reopened._col_path("ts")) == 8
+
+
+def test_crash_before_rollup_leaves_row_uncommitted(tmp_path):
+    store = HistoryStore(str(tmp_path))
+    _failing_meta_save(store, fail_on=1)
+    with pytest.raises(RuntimeError):
+        store.append("gpt", 1, 0.01, 3.0, 0.7, ts=T0)
+
+    reopened = HistoryStore(str(tmp_path))
+    assert len(reopened) == 0
+    assert reopened.last_days(1, now=T0)["sessions"] == 0
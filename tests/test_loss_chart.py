@@ -0,0 +1,48 @@
+# tests/test_loss_chart.py
+import numpy as np
+
+from module.loss_chart import LossHistory, lttb, sparkline
+
+
+def test_lttb_keeps_endpoints_and_size():
+    y = np.sin(np.linspace(0, 20, 1000))
+    x, out = lttb(y, 50)
+    assert len(out) == 50
+    assert x[0] == 0 and x[-1] == 999
+    assert np.all(np.diff(x) > 0)
+
+
+def test_lttb_keeps_spike():
+    y = np.zeros(1000)
+    y[537] = 10.0
+    _, out = lttb(y, 20)
+    assert out.max() == 10.0
+
+
+def test_lttb_short_input_unchanged():
+    x, y = lttb([3.0, 1.0, 2.0], 10)
+    assert list(y) == [3.0, 1.0, 2.0] and list(x) == [0, 1, 2]
+
+
+def test_lttb_uneven_x():
+    x = np.concatenate([np.arange(100), np.arange(1000, 1010)]).astype(float)
+    y = np.arange(110, dtype=float)
+    ox, oy = lttb(y, 12, x)
+    assert ox[0] == 0 and ox[-1] == 1009
+    assert len(ox) <= 12 and np.all(np.diff(ox) > 0)
+
+
+def test_sparkline_width_and_flat():
+    line = sparkline(np.linspace(1, 0, 500), 40)
+    assert len(line) == 40 and line[0] == "█" and line[-1] == "▁"
+    assert sparkline([2.0] * 10, 5) == "▁" * 5
+    assert sparkline([], 5) == ""
+
+
+def test_loss_history_stays_bounded():
+    hist = LossHistory(capacity=64)
+    for step in range(10_000):
+        hist.append(step, 1.0 / (step + 1))
+    assert len(hist.y) <= 128
+    assert hist.x[0] == 0 and hist.x[-1] == 9999
+    assert 0 < len(hist.sparkline(30)) <= 30       # 按 x 分桶，空桶跳过
@@ -0,0 +1,78 @@
+# tests/test_resume.py
+import threading
+
+import pytest
+
+from module import session_trace, storage, tb_events
+from module.train import VirtualClock, _headless_ui, _run_training_loop
+
+SID = "20240101_120000_ab12"
+MODEL = {"name": "Resume-Net", "base_ops": 100, "difficulty": 1}
+
+
+@pytest.fixture
+def save_dirs(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    monkeypatch.setattr(session_trace, "TRACE_DIR", str(tmp_path / "traces"))
+    monkeypatch.setattr(tb_events, "RUNS_DIR", str(tmp_path / "runs"))
+    return tmp_path
+
+
+class StopAfter:
+    """最小的 TrainingJob 替身：完成 n 个 step 后按程序退出处理 (写断点、不结算)"""
+    share = 1.0
+    foreground = False
+    cancel_reason = "shutdown"
+
+    def __init__(self, n):
+        self.n = n
+        self.cancel_event = threading.Event()
+        self._progress = None
+
+    @property
+    def progress(self):
+        return self._progress
+
+    @progress.setter
+    def progress(self, value):
+        self._progress = value
+        if value[2] >= self.n: self.cancel_event.set()
+
+
+def _run(game_data, epochs=1, **kwargs):
+    trace = []
+    result = _run_training_loop(game_data, MODEL, epochs, 0.001, 0.1, _headless_ui(), clock=VirtualClock(),
+                                guard=lambda: (False, None), render_interval=None, trace=trace, seed=3,
+                                session_id=SID, checkpoint=True, **kwargs)
+    return result, trace
+
+
+def test_numpy_checkpoint_keeps_real_losses(save_dirs):
+    result, trace = _run({"train_backend": "numpy"}, job=StopAfter(5))
+    assert result is None
+    ckpt = storage.load_checkpoint(SID)
+    assert ckpt["backend"] == "numpy"
+    assert len(ckpt["losses"]) == ckpt["global_step"] == len(trace)
+    assert ckpt["losses"] == pytest.approx([t[3] for t in trace])
+
+
+def test_resume_restores_recorded_losses(save_dirs):
+    _, fresh = _run({})
+    recorded = [9.0 + i for i in range(40)]
+    ckpt = {"session_id": SID, "seed": 3, "model": MODEL, "epochs": 1, "learning_rate": 0.001,
+            "mins_per_epoch": 0.1, "global_step": 40, "current_loss": recorded[-1],
+            "focus_violation_count": 0, "violation_ticks": [], "avg_speed": None,
+            "backend": "numpy", "losses": recorded}
+    _, resumed = _run({}, resume=ckpt)
+    assert [t[2] for t in resumed] == list(range(41, 101))
+    losses = session_trace.load_trace(SID)["losses"]
+    assert losses[:40].tolist() == recorded
+    assert losses[40:].tolist() == pytest.approx([t[3] for t in fresh[40:]])
+
+
+def test_numpy_checkpoint_without_losses_is_refused(save_dirs):
+    ckpt = {"session_id": SID, "seed": 3, "model": MODEL, "epochs": 1, "learning_rate": 0.001,
+            "mins_per_epoch": 0.1, "global_step": 10, "current_loss": 1.0,
+            "focus_violation_count": 0, "violation_ticks": [], "backend": "numpy"}
+    with pytest.raises(ValueError, match="cannot resume"):
+        _run({}, resume=ckpt)
@@ -0,0 +1,82 @@
+# tests/test_save_db.py
+from module.game_state import GameState
+from module.save_db import SaveDB
+from module.state_types import IdSet, Inventory
+
+
+def _state():
+    return GameState({
+        "coins": 10,
+        "received_mail_ids": IdSet(["001", "m_1"]),
+        "completed_mission_ids": IdSet(),
+        "inventory": Inventory({"gpu": 1}),
+        "inbox": [{"id": "001", "type": "story", "read": False}],
+    })
+
+
+def _count(db, table):
+    return db.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_roundtrip(tmp_path):
+    path = str(tmp_path / "save.db")
+    db = SaveDB(path)
+    assert db.is_empty()
+    db.save(_state())
+    db.close()
+
+    loaded = SaveDB(path).load()
+    assert loaded["coins"] == 10
+    assert set(loaded["received_mail_ids"]) == {"001", "m_1"}
+    assert loaded["inventory"] == {"gpu": 1}
+    assert loaded["inbox"] == [{"id": "001", "type": "story", "read": False}]
+    assert "completed_mission_ids" not in loaded
+
+
+def test_dirty_keys_only_touch_their_tables(tmp_path):
+    db = SaveDB(str(tmp_path / "save.db"))
+    state = _state()
+    db.save(state)
+    state.take_dirty()
+
+    state["inbox"][0]["read"] = True
+    state["inbox"].append({"id": "002", "type": "mission", "read": False})
+    state["received_mail_ids"].add("002")     # 没有 touch：本次不应写入
+    state.touch("inbox")
+    db.save(state, state.take_dirty())
+
+    loaded = SaveDB(db.path).load()
+    assert [m["id"] for m in loaded["inbox"]] == ["001", "002"]
+    assert loaded["inbox"][0]["read"] is True
+    assert set(loaded["received_mail_ids"]) == {"001", "m_1"}
+
+
+def test_full_diff_inserts_updates_and_deletes(tmp_path):
+    db = SaveDB(str(tmp_path / "save.db"))
+    state = _state()
+    db.save(state)
+    state["inventory"].add("gpu")
+    state["inventory"].add("ram")
+    state["received_mail_ids"].discard("m_1")
+    state["inbox"] = []
+    del state["coins"]
+    db.save(state)
+
+    assert _count(db, "inbox") == 0
+    assert _count(db, "received_mails") == 1
+    loaded = SaveDB(db.path).load()
+    assert loaded["inventory"] == {"gpu": 2, "ram": 1}
+    assert "coins" not in loaded and "inbox" not in loaded
+
+
+def test_load_then_save_is_a_noop(tmp_path):
+    path = str(tmp_path / "save.db")
+    first = SaveDB(path)
+    first.save(_state())
+    first.close()
+
+    db = SaveDB(path)
+    data = db.load()
+    seq = db._seq
+    db.save(data)
+    assert db._seq == seq                      # 与库内容相同：没有插入任何行
@@ -0,0 +1,131 @@
+# tests/test_scheduler.py
+import threading
+
+import pytest
+
+from module.train import JobScheduler, VirtualClock
+
+GAME_DATA = {"gpu_level": 0, "level": 1, "strict_mode": False}
+
+
+class GatedClock(VirtualClock):
+    """虚拟时钟，但会话开头的第一次 sleep 阻塞到 gate 放行：任务停在 running 状态，便于观察调度"""
+    def __init__(self, name, started):
+        super().__init__()
+        self.name = name
+        self.started = started
+        self.gate = threading.Event()
+        self.entered = threading.Event()
+
+    def sleep(self, seconds):
+        if not self.entered.is_set():
+            self.started.append(self.name)
+            self.entered.set()
+            assert self.gate.wait(5)
+        super().sleep(seconds)
+
+
+class Harness:
+    def __init__(self, max_running=2):
+        self.scheduler = JobScheduler(max_running=max_running)
+        self.started = []
+        self.clocks = {}
+        self.results = {}
+        self.done = {}
+
+    def submit(self, name, priority=None, mission=False):
+        clock = self.clocks[name] = GatedClock(name, self.started)
+        self.done[name] = threading.Event()
+        model = {"name": name, "base_ops": 100, "difficulty": 1}
+        if mission: model["__mission_reqs"] = {}
+        run_kwargs = {"game_data": GAME_DATA, "model": model, "epochs": 1, "learning_rate": 0.001,
+                      "mins_per_epoch": 0.1, "seed": 1, "clock": clock, "guard": lambda: (False, None),
+                      "render_interval": None}
+        return self.scheduler.submit(run_kwargs, self.ui(name), priority=priority, foreground=False)
+
+    def ui(self, name):
+        noop = lambda *args: None
+
+        def finished(result):
+            self.results[name] = result
+            self.done[name].set()
+        return {"print": noop, "update_bar": noop, "set_mini_mode": noop, "finished": finished}
+
+    def release(self, name):
+        assert self.clocks[name].entered.wait(5)
+        self.clocks[name].gate.set()
+        assert self.done[name].wait(5)
+        for job in list(self.scheduler.jobs):
+            if job.name == name and job.thread: job.thread.join(5)
+
+    def running(self):
+        return sorted(j.name for j in self.scheduler.active_jobs() if j.state == "running")
+
+
+@pytest.fixture
+def harness():
+    h = Harness()
+    yield h
+    for clock in h.clocks.values(): clock.gate.set()
+    h.scheduler.shutdown(timeout=5)
+
+
+def test_queue_limit_and_start_order(harness):
+    harness.submit("a")
+    harness.submit("b")
+    harness.submit("low")
+    harness.submit("high", priority=3)
+    harness.submit("mission", mission=True)     # 任务合同默认优先级 2
+    assert harness.running() == ["a", "b"]
+    assert [j.state for j in harness.scheduler.active_jobs()][2:] == ["queued"] * 3
+
+    harness.release("a")
+    harness.release("b")
+    harness.release("high")
+    harness.release("mission")
+    harness.release("low")
+    assert harness.started == ["a", "b", "high", "mission", "low"]
+    assert all(r["success"] is not None and not r.get("killed") for r in harness.results.values())
+
+
+def test_shares_follow_priority(harness):
+    a = harness.submit("a", priority=1)
+    b = harness.submit("b", priority=3)
+    assert (a.share, b.share) == (0.25, 0.75)
+    harness.release("a")
+    assert b.share == 1.0
+
+
+def test_kill_queued_and_running(harness):
+    harness.submit("a")
+    harness.submit("b")
+    queued = harness.submit("c")
+    assert harness.scheduler.kill(f"%{queued.job_id}") is queued
+    assert harness.results["c"]["killed"] and queued.state == "killed"
+    assert harness.scheduler.kill(queued.job_id) is None        # 已结束的任务不能再 kill
+
+    running = harness.scheduler.get(1)
+    harness.scheduler.kill(1)
+    harness.release("a")
+    assert harness.results["a"]["killed"] is True
+    assert running.state == "killed"
+    assert "c" not in harness.started
+
+
+def test_kill_callback_runs_outside_the_lock(harness):
+    harness.submit("a")
+    harness.submit("b")
+    queued = harness.submit("c")
+    other = {}
+
+    def finished(result):
+        # UI 回调等待另一个线程访问调度器 (例如切回主线程刷新 jobs 列表)
+        t = threading.Thread(target=lambda: other.setdefault("jobs", harness.scheduler.active_jobs()))
+        t.start()
+        t.join(2)
+        other["alive"] = t.is_alive()
+
+    queued._real_ui = dict(queued._real_ui, finished=finished)
+    harness.scheduler.kill(queued.job_id)
+    assert other["alive"] is False
+    assert sorted(j.name for j in other["jobs"]) == ["a", "b"]
@@ -0,0 +1,75 @@
+# tests/test_session_trace.py
+import numpy as np
+import pytest
+
+from module import session_trace
+from module.train import run_headless
+
+SID = "20240101_120000_ab12"
+OPTION = {"model": {"name": "Trace-Net", "base_ops": 100, "difficulty": 1}, "mins_per_epoch": 0.5, "auto_epochs": 2}
+
+
+@pytest.fixture
+def trace_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_trace, "TRACE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def _headless_trace():
+    data = {"gpu_level": 0, "level": 1, "strict_mode": True}
+    run = run_headless(data, OPTION, seed=42, guard=lambda: (True, "game.exe"))
+    result = run["result"]
+    return {
+        "model": OPTION["model"]["name"], "seed": result["seed"], "epochs": result["epochs"],
+        "steps_per_epoch": 100, "mins_per_epoch": OPTION["mins_per_epoch"],
+        "learning_rate": result["learning_rate"], "losses": [t[3] for t in run["trace"]],
+        "violation_ticks": list(range(0, 200, 15)), "final_acc": result["accuracy"],
+        "is_mission": result["is_mission"], "success": result["success"], "is_crashed": result["crashed"],
+    }
+
+
+def test_roundtrip(trace_dir):
+    trace = _headless_trace()
+    path = session_trace.save_trace(SID, trace)
+    assert path == str(trace_dir / (SID + session_trace.TRACE_EXT))
+    loaded = session_trace.load_trace(SID)
+
+    assert loaded["losses"].tobytes() == np.asarray(trace["losses"], dtype='<f4').tobytes()
+    assert loaded["violation_ticks"].tobytes() == np.asarray(trace["violation_ticks"], dtype='<u4').tobytes()
+    for key in ("model", "seed", "epochs", "steps_per_epoch", "is_mission", "success", "is_crashed"):
+        assert loaded[key] == trace[key]
+    assert loaded["final_acc"] == pytest.approx(trace["final_acc"], rel=1e-6)
+    assert session_trace.list_traces() == [SID]
+
+
+def test_flags_roundtrip(trace_dir):
+    trace = dict(_headless_trace(), is_mission=True, success=False, is_crashed=True)
+    session_trace.save_trace(SID, trace)
+    loaded = session_trace.load_trace(SID)
+    assert (loaded["is_mission"], loaded["success"], loaded["is_crashed"]) == (True, False, True)
+
+
+def test_missing_trace(trace_dir):
+    assert session_trace.load_trace(SID) is None
+
+
+@pytest.mark.parametrize("cut", [0, 10, session_trace._HEADER.size + 3, -1])
+def test_truncated_file_raises_value_error(trace_dir, cut):
+    path = session_trace.save_trace(SID, _headless_trace())
+    with open(path, 'rb') as f: raw = f.read()
+    with open(path, 'wb') as f: f.write(raw[:cut])
+    with pytest.raises(ValueError):
+        session_trace.load_trace(SID)
+
+
+def test_bad_header_raises_value_error(trace_dir):
+    path = session_trace.save_trace(SID, _headless_trace())
+    with open(path, 'r+b') as f: f.write(b"XXXX")
+    with pytest.raises(ValueError, match="not a session trace"):
+        session_trace.load_trace(SID)
+
+
+@pytest.mark.parametrize("bad", ["../cyber_save", "last", ""])
+def test_bad_session_id(trace_dir, bad):
+    with pytest.raises(ValueError):
+        session_trace.load_trace(bad)
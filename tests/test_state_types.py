@@ -0,0 +1,58 @@
+# tests/test_state_types.py
+from module.state_types import BitSet, IdSet, Inventory, to_plain
+
+
+def test_bitset_roundtrip():
+    bits = BitSet([0, 3, 9, 200])
+    assert 3 in bits and 4 not in bits and -1 not in bits
+    assert len(bits) == 4
+    restored = BitSet.from_json(bits.to_json())
+    assert list(restored) == [0, 3, 9, 200] and len(restored) == 4
+
+
+def test_bitset_discard_and_trailing_zeros():
+    bits = BitSet([1, 100])
+    bits.discard(100)
+    bits.discard(100)
+    assert len(bits) == 1
+    assert bits.to_json() == "02"       # 尾部全零字节不写出
+
+
+def test_idset_numeric_ids_go_to_bitset():
+    ids = IdSet(["001", "m_7", "042", "abc"])
+    assert "042" in ids and "42" not in ids and "m_7" in ids
+    assert len(ids) == 4
+    plain = ids.to_json()
+    assert plain["ids"] == ["m_7", "abc"]
+    assert set(IdSet.from_json(plain)) == {"001", "042", "m_7", "abc"}
+
+
+def test_idset_reads_legacy_list():
+    ids = IdSet.from_json(["001", "x", "x"])
+    assert len(ids) == 2
+    assert IdSet.from_json(ids) is ids
+    assert len(IdSet.from_json(None)) == 0
+
+
+def test_inventory_counts():
+    inv = Inventory()
+    inv.add("gpu")
+    inv.add("gpu", 2)
+    assert inv.count("gpu") == 3
+    assert not inv.remove("gpu", 4)
+    assert inv.remove("gpu", 3)
+    assert "gpu" not in inv and len(inv) == 0
+
+
+def test_inventory_from_json_forms():
+    assert Inventory.from_json({"a": 2}).count("a") == 2
+    legacy = Inventory.from_json(["a", "b", "a"])       # 旧存档：物品列表
+    assert legacy.to_json() == {"a": 2, "b": 1}
+
+
+def test_to_plain_returns_fresh_json():
+    inv = Inventory({"a": 1})
+    plain = to_plain(inv)
+    plain["a"] = 5
+    assert inv.count("a") == 1
+    assert to_plain([1, 2]) == [1, 2]
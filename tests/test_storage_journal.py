@@ -0,0 +1,171 @@
+# tests/test_storage_journal.py
+import json
+import os
+import time
+
+import pytest
+
+from module import storage
+from module.state_types import IdSet, Inventory
+
+
+@pytest.fixture
+def save_dir(tmp_path, monkeypatch):
+    """存档路径指向临时目录，并重置模块里的落盘状态"""
+    monkeypatch.setattr(storage, "SAVE_FILE", str(tmp_path / "cyber_save.json"))
+    monkeypatch.setattr(storage, "JOURNAL_FILE", str(tmp_path / "cyber_save.journal"))
+    monkeypatch.setattr(storage, "SAVE_BACKEND", "json")
+    monkeypatch.setattr(storage, "_persisted", {})
+    monkeypatch.setattr(storage, "_journal_size", 0)
+    monkeypatch.setattr(storage, "_db", None)
+    return tmp_path
+
+
+def _reload():
+    storage._persisted.clear()
+    return storage.load_game_data()
+
+
+def test_record_roundtrip(save_dir):
+    with open(storage.JOURNAL_FILE, 'wb') as f:
+        f.write(storage._encode_record({"set": {"coins": 1}, "del": []}))
+        f.write(storage._encode_record({"set": {"coins": 2}, "del": ["old"]}))
+    records, valid = storage._read_journal()
+    assert [r["set"]["coins"] for r in records] == [1, 2]
+    assert valid == os.path.getsize(storage.JOURNAL_FILE)
+
+
+def test_save_and_reload(save_dir):
+    data = storage.load_game_data()
+    data["coins"] = 42
+    data["received_mail_ids"].add("001")
+    data["inventory"].add("gpu", 2)
+    storage.save_game_data(data, full=True)
+
+    loaded = _reload()
+    assert loaded["coins"] == 42
+    assert "001" in loaded["received_mail_ids"]
+    assert loaded["inventory"].count("gpu") == 2
+
+
+def test_only_changed_fields_are_journaled(save_dir):
+    data = storage.load_game_data()
+    storage.save_game_data(data, full=True)
+    data["coins"] = 7
+    storage.save_game_data(data)
+    records, _ = storage._read_journal()
+    assert records[-1] == {"set": {"coins": 7}, "del": []}
+    size = os.path.getsize(storage.JOURNAL_FILE)
+    storage.save_game_data(data, full=True)      # 没有变化：不追加
+    assert os.path.getsize(storage.JOURNAL_FILE) == size
+
+
+def test_deleted_field_is_replayed(save_dir):
+    data = storage.load_game_data()
+    data["temp"] = 1
+    storage.save_game_data(data, full=True)
+    del data["temp"]
+    storage.save_game_data(data)
+    assert "temp" not in _reload()
+
+
+def test_torn_tail_is_discarded(save_dir):
+    data = storage.load_game_data()
+    data["coins"] = 5
+    storage.save_game_data(data, full=True)
+    good = os.path.getsize(storage.JOURNAL_FILE)
+    record = storage._encode_record({"set": {"coins": 99}, "del": []})
+    with open(storage.JOURNAL_FILE, 'ab') as f:
+        f.write(record[:-3])                    # 写到一半时崩溃
+
+    loaded = _reload()
+    assert loaded["coins"] == 5
+    assert os.path.getsize(storage.JOURNAL_FILE) == good
+
+
+def test_bad_crc_stops_replay(save_dir):
+    with open(storage.JOURNAL_FILE, 'wb') as f:
+        f.write(storage._encode_record({"set": {"coins": 1}, "del": []}))
+        bad = bytearray(storage._encode_record({"set": {"coins": 2}, "del": []}))
+        bad[-1] ^= 0xFF
+        f.write(bytes(bad))
+    assert _reload()["coins"] == 1
+
+
+def test_compaction_writes_snapshot_and_empties_journal(save_dir, monkeypatch):
+    monkeypatch.setattr(storage, "JOURNAL_COMPACT_BYTES", 64)
+    data = storage.load_game_data()
+    storage.save_game_data(data, full=True)
+    data["inbox"] = [{"id": str(i), "body": "x" * 50} for i in range(5)]
+    storage.save_game_data(data)
+
+    assert os.path.getsize(storage.JOURNAL_FILE) == 0
+    with open(storage.SAVE_FILE, encoding='utf-8') as f:
+        snap = json.load(f)
+    assert len(snap["inbox"]) == 5
+    assert snap["received_mail_ids"] == IdSet().to_json()
+    assert snap["inventory"] == Inventory().to_json()
+    assert len(_reload()["inbox"]) == 5
+
+
+def test_corrupt_snapshot_recovers_from_journal(save_dir):
+    data = storage.load_game_data()
+    storage.save_game_data(data, full=True)     # 首次保存写快照
+    data["coins"] = 3
+    storage.save_game_data(data)
+    with open(storage.SAVE_FILE, 'w', encoding='utf-8') as f:
+        f.write("{broken")
+
+    loaded = _reload()
+    assert loaded["coins"] == 3
+    assert os.path.exists(storage.SAVE_FILE + ".corrupt")
+
+
+@pytest.fixture
+def saver(save_dir, monkeypatch):
+    """request_save 使用的后台写盘线程；合并窗口按用例设置"""
+    def make(delay):
+        coalescer = storage.SaveCoalescer(delay=delay)
+        monkeypatch.setattr(storage, "_saver", coalescer)
+        made.append(coalescer)
+        return coalescer
+    made = []
+    yield make
+    for coalescer in made: coalescer.close()
+
+
+def test_requests_in_window_coalesce_into_one_write(saver):
+    coalescer = saver(0.2)
+    data = storage.load_game_data()
+    storage.save_game_data(data, full=True)
+    for i in range(50):
+        data["coins"] = i
+        storage.request_save(data)
+    time.sleep(0.6)
+
+    records, _ = storage._read_journal()
+    assert records == [{"set": {"coins": 49}, "del": []}]
+    assert coalescer._pending is None
+
+
+def test_flush_writes_latest_pending_state(saver):
+    saver(60.0)                             # 窗口远长于用例：只有 flush 会写盘
+    data = storage.load_game_data()
+    storage.save_game_data(data, full=True)
+    data["coins"] = 1
+    storage.request_save(data)
+    data["coins"] = 2
+    storage.request_save(data)
+    assert storage._read_journal()[0] == []
+
+    storage.flush_saves()
+    assert _reload()["coins"] == 2
+
+
+def test_flush_with_data_catches_untouched_nested_changes(saver):
+    saver(60.0)
+    data = storage.load_game_data()
+    storage.save_game_data(data, full=True)
+    data["inventory"].add("gpu")            # 原地修改，没有 touch
+    storage.flush_saves(data)
+    assert _reload()["inventory"].count("gpu") == 1
@@ -0,0 +1,57 @@
+# tests/test_tb_events.py
+import os
+import struct
+
+from module import tb_events
+from module.tb_events import EventWriter, _masked_crc, crc32c, encode_event, tfrecord
+
+
+def _read_records(raw):
+    """按 TFRecord 帧拆包并校验两处 CRC"""
+    out, offset = [], 0
+    while offset < len(raw):
+        header = raw[offset:offset + 8]
+        (length,) = struct.unpack("<Q", header)
+        (hcrc,) = struct.unpack_from("<I", raw, offset + 8)
+        assert hcrc == _masked_crc(header)
+        payload = raw[offset + 12:offset + 12 + length]
+        (pcrc,) = struct.unpack_from("<I", raw, offset + 12 + length)
+        assert pcrc == _masked_crc(payload)
+        out.append(payload)
+        offset += 16 + length
+    return out
+
+
+def test_crc32c_check_value():
+    assert crc32c(b"123456789") == 0xE3069283       # CRC-32C 标准校验值
+    assert crc32c(b"") == 0
+
+
+def test_tfrecord_framing():
+    frame = tfrecord(b"hello")
+    assert len(frame) == 8 + 4 + 5 + 4
+    assert _read_records(frame) == [b"hello"]
+
+
+def test_encode_event_fields():
+    event = encode_event(1.5, step=300, scalars=[("loss", 0.25)])
+    assert event[:9] == b"\x09" + struct.pack("<d", 1.5)
+    assert event[9:12] == b"\x10\xac\x02"             # varint(300)
+    assert b"loss" in event and struct.pack("<f", 0.25) in event
+    header = encode_event(2.0, file_version="brain.Event:2")
+    assert header.endswith(b"\x1a\x0dbrain.Event:2")
+
+
+def test_writer_produces_valid_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tb_events, "RUNS_DIR", str(tmp_path))
+    writer = EventWriter("run1", flush_secs=0.05)
+    writer.add_scalar("loss", 1.0, 1)
+    writer.add_scalars({"loss": 0.5, "acc": 0.9}, 2)
+    writer.close()
+
+    assert os.path.dirname(writer.path) == str(tmp_path / "run1")
+    with open(writer.path, 'rb') as f:
+        records = _read_records(f.read())
+    assert len(records) == 3
+    assert b"brain.Event:2" in records[0]
+    assert b"acc" in records[2] and struct.pack("<f", 0.9) in records[2]